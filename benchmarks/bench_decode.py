@@ -0,0 +1,127 @@
+"""
+Benchmark audio decoding and resampling backends per file format.
+
+Writes the same synthetic recording in several formats and times decoding
+with the in-process soundfile backend against pydub (one ffmpeg subprocess
+per file), both to an AudioSegment and to a float array resampled to the
+target rate (soxr versus pydub's 'set_frame_rate').
+
+Example
+-------
+python benchmarks/bench_decode.py --minutes 5 --repeats 3
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+from pydub import AudioSegment
+
+from chatter.audio import _audiosegment_to_float, load_audio, load_audio_segment
+
+# File extension and soundfile subtype for each benchmarked format
+FORMATS = [
+    ("wav", "PCM_16"),
+    ("flac", "PCM_16"),
+    ("flac", "PCM_24"),
+    ("ogg", "VORBIS"),
+    ("mp3", "MPEG_LAYER_III"),
+    ("m4a", None),
+]
+
+
+def make_files(directory, minutes, sr, channels, seed=0):
+    """
+    Write a synthetic chirp recording in every format that can be encoded.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(minutes * 60 * sr)
+    t = np.arange(n) / sr
+    sig = 0.3 * np.sin(2 * np.pi * (2000 + 1000 * np.sin(2 * np.pi * 3 * t)) * t)
+    sig = sig + 0.02 * rng.standard_normal(n)
+    data = np.stack([sig * (0.9 + 0.05 * c) for c in range(channels)], axis=1)
+    data = data.astype(np.float32)
+
+    files = []
+    for ext, subtype in FORMATS:
+        path = Path(directory) / f"bench_{subtype or 'aac'}.{ext}"
+        try:
+            if subtype is None:
+                # AAC needs ffmpeg; encode through pydub
+                pcm = (data * 32767).astype(np.int16)
+                AudioSegment(
+                    pcm.tobytes(), frame_rate=sr, sample_width=2, channels=channels
+                ).export(path, format="ipod", codec="aac")
+            else:
+                # Write in blocks; large single writes crash libsndfile's Vorbis encoder
+                with sf.SoundFile(path, "w", sr, channels, subtype=subtype) as f:
+                    for start in range(0, n, sr):
+                        f.write(data[start : start + sr])
+        except Exception as e:
+            print(f"skipping {path.name}: {e}")
+            continue
+        files.append(path)
+    return files
+
+
+def best_time(fn, repeats):
+    """
+    Return the fastest of 'repeats' runs of 'fn' in seconds.
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def pydub_to_float(path, sr):
+    """
+    Reference path: decode with pydub, resample with 'set_frame_rate'.
+    """
+    audio = AudioSegment.from_file(path).set_frame_rate(sr)
+    return _audiosegment_to_float(audio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--minutes", type=float, default=2.0)
+    parser.add_argument("--input-sr", type=int, default=48000)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--sr", type=int, default=22050)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    audio_seconds = args.minutes * 60
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files = make_files(tmp_dir, args.minutes, args.input_sr, args.channels)
+
+        print(
+            f"{args.minutes:g} min, {args.channels} ch @ {args.input_sr} Hz; "
+            f"float rows resample to {args.sr} Hz; values are x realtime"
+        )
+        print(
+            f"{'file':<28}{'segment sf':>12}{'segment pydub':>15}"
+            f"{'float sf+soxr':>15}{'float pydub':>13}"
+        )
+        for path in files:
+            row = [
+                best_time(lambda: load_audio_segment(path), args.repeats),
+                best_time(
+                    lambda: load_audio_segment(path, backend="pydub"), args.repeats
+                ),
+                best_time(lambda: load_audio(path, sr=args.sr), args.repeats),
+                best_time(lambda: pydub_to_float(path, args.sr), args.repeats),
+            ]
+            speeds = "".join(
+                f"{audio_seconds / t:>{w}.0f}" for t, w in zip(row, (12, 15, 15, 13))
+            )
+            print(f"{path.name:<28}{speeds}")
+
+
+if __name__ == "__main__":
+    main()
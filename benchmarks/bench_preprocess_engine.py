@@ -0,0 +1,101 @@
+"""
+Benchmark the pydub and NumPy preprocessing engines.
+
+Runs 'preprocess_audio_data' (pydub engine) and 'preprocess_audio_array'
+(NumPy engine) on the same synthetic recording and reports wall time,
+peak traced memory, and the difference between the two outputs.
+
+Example
+-------
+python benchmarks/bench_preprocess_engine.py --minutes 10 --channels 2
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+from pydub import AudioSegment
+
+from chatter.config import make_config
+from chatter.audio import _audiosegment_to_float
+from chatter.data import preprocess_audio_array, preprocess_audio_data
+
+
+def make_recording(minutes, sr, channels, seed=0):
+    """
+    Build a synthetic int16 AudioSegment with chirps over background noise.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(minutes * 60 * sr)
+    t = np.arange(n) / sr
+    gate = np.sin(2 * np.pi * 1.5 * t) > 0.5
+    sig = 0.3 * np.sin(2 * np.pi * (2000 + 1000 * np.sin(2 * np.pi * 3 * t)) * t)
+    sig = sig * gate + 0.02 * rng.standard_normal(n)
+    data = np.stack([sig * (0.9 + 0.05 * c) for c in range(channels)], axis=1)
+    samples = (np.clip(data, -1, 1) * 32767).astype(np.int16)
+    return AudioSegment(
+        samples.tobytes(), frame_rate=sr, sample_width=2, channels=channels
+    )
+
+
+def measure(fn):
+    """
+    Run 'fn' once and return (result, seconds, peak traced MiB).
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--minutes", type=float, default=5.0)
+    parser.add_argument("--input-sr", type=int, default=44100)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--sr", type=int, default=22050)
+    parser.add_argument("--noisereduce", action="store_true")
+    args = parser.parse_args()
+
+    config = make_config(
+        {
+            "sr": args.sr,
+            "high_pass": 500,
+            "low_pass": 9000,
+            "use_noisereduce": args.noisereduce,
+        }
+    )
+    audio = make_recording(args.minutes, args.input_sr, args.channels)
+
+    np.random.seed(0)
+    out_pydub, t_pydub, mem_pydub = measure(
+        lambda: preprocess_audio_data(audio, config)
+    )
+    np.random.seed(0)
+    out_numpy, t_numpy, mem_numpy = measure(
+        lambda: preprocess_audio_array(
+            _audiosegment_to_float(audio), audio.frame_rate, config
+        )
+    )
+
+    diff = out_pydub.astype(np.float64) - out_numpy
+    rms_db = 20 * np.log10(np.sqrt(np.mean(diff**2)) / 32767 + 1e-12)
+
+    print(
+        f"{args.minutes:g} min, {args.channels} ch @ {args.input_sr} Hz -> {args.sr} Hz"
+    )
+    print(f"{'engine':<8}{'seconds':>10}{'peak MiB':>12}")
+    print(f"{'pydub':<8}{t_pydub:>10.2f}{mem_pydub:>12.1f}")
+    print(f"{'numpy':<8}{t_numpy:>10.2f}{mem_numpy:>12.1f}")
+    print(f"speedup: {t_pydub / t_numpy:.2f}x")
+    print(
+        f"max abs diff: {np.abs(diff).max():.0f} int16 steps, RMS diff: {rms_db:.1f} dBFS"
+    )
+
+
+if __name__ == "__main__":
+    main()
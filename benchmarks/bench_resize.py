@@ -0,0 +1,97 @@
+"""
+Benchmark batched unit spectrogram resizing against the per-unit path.
+
+Builds a synthetic mel spectrogram with many short units and times
+'slice_and_process_spectrograms' (one preallocated buffer and two matrix
+products with cached resize operators) against the previous per-unit
+workflow ('normalize_spec', 'pad_center_zero', and skimage's
+anti-aliased 'resize' for every unit). Also reports the largest
+difference between the two outputs.
+
+Example
+-------
+python benchmarks/bench_resize.py --units 2000 --repeats 3
+"""
+
+import argparse
+import time
+
+import librosa
+import numpy as np
+
+from chatter.config import make_config
+from chatter.data import slice_and_process_spectrograms
+from chatter.utils import downsample_spectrogram, normalize_spec, pad_center_zero
+
+
+def per_unit(full_spec, segments, config, max_unit_len_sec, min_unit_len_sec):
+    """
+    Reference path: process units one at a time, as before batching.
+    """
+    hop, sr = config["hop_length"], config["sr"]
+    starts = librosa.time_to_frames(segments[:, 0], sr=sr, hop_length=hop)
+    ends = librosa.time_to_frames(segments[:, 1], sr=sr, hop_length=hop)
+    max_length = librosa.time_to_frames(max_unit_len_sec, sr=sr, hop_length=hop)
+    min_length = librosa.time_to_frames(min_unit_len_sec, sr=sr, hop_length=hop)
+
+    specs = []
+    for start, end in zip(starts, ends):
+        spec = normalize_spec(
+            full_spec[:, start:end], config.get("simple_noise_floor", -60.0)
+        )
+        if not min_length <= spec.shape[1] <= max_length or not spec.any():
+            continue
+        padded = pad_center_zero(spec, max_length)
+        specs.append(
+            downsample_spectrogram(padded, config["target_shape"]).astype(np.float32)
+        )
+    return specs
+
+
+def best_time(fn, repeats):
+    """
+    Return the fastest of 'repeats' runs of 'fn' in seconds.
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--units", type=int, default=2000)
+    parser.add_argument("--max-unit-length", type=float, default=0.4)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    config = make_config()
+    sr, hop = config["sr"], config["hop_length"]
+    rng = np.random.default_rng(0)
+
+    # Units of random length, separated by short gaps
+    lengths = rng.uniform(0.03, args.max_unit_length, args.units)
+    onsets = np.cumsum(lengths + 0.05) - lengths
+    segments = np.stack([onsets, onsets + lengths], axis=1)
+    n_frames = int(segments[-1, 1] * sr / hop) + 2
+    full_spec = rng.uniform(-80, 0, (config["n_mels"], n_frames)).astype(np.float32)
+    call = (full_spec, segments, config, args.max_unit_length, 0.02)
+
+    reference = per_unit(*call)
+    batched, _, _ = slice_and_process_spectrograms(*call)
+    diff = max(np.abs(a - b).max() for a, b in zip(reference, batched))
+
+    t_ref = best_time(lambda: per_unit(*call), args.repeats)
+    t_new = best_time(lambda: slice_and_process_spectrograms(*call), args.repeats)
+    print(
+        f"{len(batched)} units, {config['n_mels']} mels -> "
+        f"{tuple(config['target_shape'])}; max abs difference {diff:.2e}"
+    )
+    print(f"{'per-unit':<10}{t_ref:>8.3f} s")
+    print(f"{'batched':<10}{t_new:>8.3f} s  ({t_ref / t_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
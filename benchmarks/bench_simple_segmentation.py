@@ -0,0 +1,128 @@
+"""
+Benchmark compiled simple-segmentation kernels against the NumPy workflow.
+
+Builds noisy frame-wise RMS levels with tens of thousands of runs and times
+'find_active_units' (one compiled pass) and 'find_active_units_batch' (many
+files in one parallel call) against the previous workflow (NumPy run
+extraction, a Python loop merging short silences, and a list comprehension
+filtering lengths). Also checks that the outputs are identical.
+
+Example
+-------
+python benchmarks/bench_simple_segmentation.py --frames 2000000 --files 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from chatter.config import make_config
+from chatter.runs import find_active_units, find_active_units_batch
+
+
+def reference(rms_db, n_samples, sr, config):
+    """
+    Reference path: the NumPy and Python workflow used before the kernels.
+    """
+    hop = config["hop_length"]
+    threshold = max(
+        float(config["simple_silence_threshold_db"]), config["simple_noise_floor"]
+    )
+    active = np.where(rms_db > threshold)[0]
+    if not len(active):
+        return np.zeros((0, 2))
+    breaks = np.where(np.diff(active) > 1)[0]
+    frames = np.vstack(
+        [
+            active[np.concatenate(([0], breaks + 1))],
+            active[np.concatenate((breaks, [len(active) - 1]))] + 1,
+        ]
+    ).T
+    intervals = frames.astype(float) * hop / float(sr)
+    intervals[:, 1] = np.minimum(intervals[:, 1], n_samples / float(sr))
+
+    merged = []
+    current_start, current_end = intervals[0]
+    for start, end in intervals[1:]:
+        if start - current_end < config["simple_min_silence_length"]:
+            current_end = end
+        else:
+            merged.append([current_start, current_end])
+            current_start, current_end = start, end
+    merged.append([current_start, current_end])
+
+    kept = [
+        [start, end]
+        for start, end in merged
+        if config["simple_min_unit_length"]
+        <= end - start
+        <= config["simple_max_unit_length"]
+    ]
+    return np.array(kept, dtype=float).reshape(-1, 2)
+
+
+def best_time(fn, repeats):
+    """
+    Return the fastest of 'repeats' runs of 'fn' in seconds.
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=2_000_000)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    config = make_config()
+    sr, hop = config["sr"], config["hop_length"]
+    rng = np.random.default_rng(0)
+
+    # Noise hovering around the threshold produces many short runs
+    threshold = config["simple_silence_threshold_db"]
+    rms = rng.normal(threshold, 6, args.frames).astype(np.float32)
+    files = np.array_split(rms, args.files)
+    n_samples = [len(f) * hop for f in files]
+    n_runs = int(np.count_nonzero(np.diff((rms > threshold).astype(np.int8)) == 1))
+
+    # Compile before timing
+    find_active_units(rms[:10], 10 * hop, sr, config)
+    find_active_units_batch(files[:2], n_samples[:2], sr, config)
+
+    expected = [reference(f, n, sr, config) for f, n in zip(files, n_samples)]
+    single = [find_active_units(f, n, sr, config) for f, n in zip(files, n_samples)]
+    batched = find_active_units_batch(files, n_samples, sr, config)
+    identical = all(
+        np.array_equal(a, b) and np.array_equal(a, c)
+        for a, b, c in zip(expected, single, batched)
+    )
+
+    t_ref = best_time(
+        lambda: [reference(f, n, sr, config) for f, n in zip(files, n_samples)],
+        args.repeats,
+    )
+    t_single = best_time(
+        lambda: [find_active_units(f, n, sr, config) for f, n in zip(files, n_samples)],
+        args.repeats,
+    )
+    t_batch = best_time(
+        lambda: find_active_units_batch(files, n_samples, sr, config), args.repeats
+    )
+    print(
+        f"{args.frames} frames in {args.files} files, about {n_runs} runs; "
+        f"{sum(len(u) for u in expected)} units; identical: {identical}"
+    )
+    print(f"{'numpy':<10}{t_ref:>8.3f} s")
+    print(f"{'compiled':<10}{t_single:>8.3f} s  ({t_ref / t_single:.1f}x)")
+    print(f"{'batched':<10}{t_batch:>8.3f} s  ({t_ref / t_batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Benchmark spectrogram store backends, compression filters, and chunk shapes.
+
+Writes the same unit spectrograms with 'spectrogram_writer' for every
+combination of HDF5 compression settings and units per chunk, and once to a
+flat memory-mapped '.npy' store, and reports write throughput, the mean latency of random 'SpectrogramDataset.__getitem__'
+calls, sequential read throughput, and the size on disk (with the JSON header of
+a flat store). Units are
+synthetic (zero-padded, mostly low-energy background with a few bright
+ridges, like segmented calls) unless '--source' names an existing store.
+
+Example
+-------
+python benchmarks/bench_storage.py --units 5000 --chunks 1 16 64
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import h5py
+import numpy as np
+
+from chatter.config import make_config
+from chatter.data import SpectrogramDataset
+from chatter.storage import (
+    HDF5PLUGIN_AVAILABLE,
+    SpectrogramReader,
+    quantize_units,
+    spectrogram_writer,
+)
+
+# (label, compression, level, shuffle)
+FILTERS = [
+    ("none", None, None, None),
+    ("lzf", "lzf", None, None),
+    ("gzip-1", "gzip", 1, None),
+    ("gzip-4", "gzip", 4, None),
+    ("gzip-4+shuf", "gzip", 4, "byte"),
+    ("gzip-9", "gzip", 9, None),
+    ("blosc-lz4", "blosc", 5, None),
+    ("blosc-lz4+bit", "blosc", 5, "bit"),
+]
+
+
+def synthetic_units(n_units, shape, seed=0):
+    """
+    Zero-padded units of background noise with a few bright ridges.
+    """
+    rng = np.random.default_rng(seed)
+    height, width = shape
+    units = np.zeros((n_units, height, width), dtype=np.float32)
+    rows = np.arange(height)[:, None]
+    for unit in units:
+        n_cols = rng.integers(width // 6, width + 1)
+        left = (width - n_cols) // 2
+        body = rng.gamma(1.0, 0.04, (height, n_cols))
+        for _ in range(rng.integers(1, 4)):
+            center = rng.uniform(0.2, 0.8) * height + np.cumsum(
+                rng.normal(0, 0.6, n_cols)
+            )
+            body += rng.uniform(0.5, 1.0) * np.exp(-0.5 * ((rows - center) / 2.0) ** 2)
+        unit[:, left : left + n_cols] = np.clip(body, 0, 1)
+    return quantize_units(units)
+
+
+def write_store(path, units, config, block=64):
+    """
+    Write units in per-file sized blocks; return the elapsed seconds.
+    """
+    start = time.perf_counter()
+    with spectrogram_writer(path, config) as writer:
+        for i in range(0, len(units), block):
+            writer.append(units[i : i + block])
+    return time.perf_counter() - start
+
+
+def random_read_ms(path, n_units, n_reads, seed=0):
+    """
+    Mean latency of random 'SpectrogramDataset.__getitem__' calls in ms.
+    """
+    dataset = SpectrogramDataset(path, range(n_units))
+    order = np.random.default_rng(seed).integers(0, n_units, n_reads)
+    dataset[0]
+    start = time.perf_counter()
+    for i in order:
+        dataset[i]
+    return (time.perf_counter() - start) / n_reads * 1e3
+
+
+def sequential_read_seconds(path, block=1024):
+    """
+    Seconds to read the whole dataset in contiguous blocks.
+    """
+    start = time.perf_counter()
+    with SpectrogramReader(path) as data:
+        for i in range(0, data.shape[0], block):
+            np.array(data[i : i + block])
+    return time.perf_counter() - start
+
+
+def store_size(path):
+    """
+    Size of a store on disk in MB, with the JSON header of a flat store.
+    """
+    header = path.with_name(f"{path.name}.json")
+    return sum(os.path.getsize(p) for p in (path, header) if p.exists()) / 1e6
+
+
+def bench(path, units, config, n_reads):
+    """
+    Return (write, random read, sequential read) timings of one store.
+    """
+    t_write = write_store(path, units, config)
+    t_random = random_read_ms(path, len(units), n_reads)
+    t_seq = sequential_read_seconds(path)
+    return t_write, t_random, t_seq
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--units", type=int, default=5000)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--source", type=Path, default=None)
+    args = parser.parse_args()
+
+    config = make_config()
+    if args.source is not None:
+        with h5py.File(args.source, "r") as hf:
+            units = quantize_units(hf["spectrograms"][: args.units])
+    else:
+        units = synthetic_units(args.units, tuple(config["target_shape"]))
+    config["target_shape"] = units.shape[1:]
+    n_mb = units.nbytes / 1e6
+    print(f"{len(units)} units of {units.shape[1:]} ({n_mb:.0f} MB raw)")
+    print(
+        f"{'filter':<15}{'chunk':>6}{'write MB/s':>12}{'random ms':>11}"
+        f"{'seq MB/s':>10}{'size MB':>9}{'ratio':>7}"
+    )
+
+    filters = [f for f in FILTERS if f[1] != "blosc" or HDF5PLUGIN_AVAILABLE]
+    runs = [(f, chunk, "h5") for f in filters for chunk in args.chunks]
+    runs.append((("flat-npy", None, None, None), "-", "npy"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for (label, compression, level, shuffle), chunk, suffix in runs:
+            config.update(
+                spectrogram_compression=compression,
+                spectrogram_compression_level=level,
+                spectrogram_shuffle=shuffle,
+                spectrogram_chunks=chunk if suffix == "h5" else 1,
+            )
+            path = Path(tmp) / f"{label}-{chunk}.{suffix}"
+            t_write, t_random, t_seq = bench(path, units, config, args.reads)
+            size = store_size(path)
+            print(
+                f"{label:<15}{chunk:>6}{n_mb / t_write:>12.0f}{t_random:>11.3f}"
+                f"{n_mb / t_seq:>10.0f}{size:>9.1f}{n_mb / size:>7.1f}"
+            )
+    if not HDF5PLUGIN_AVAILABLE:
+        print("hdf5plugin not installed; Blosc filters skipped")
+
+
+if __name__ == "__main__":
+    main()
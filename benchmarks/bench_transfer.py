@@ -0,0 +1,107 @@
+"""
+Benchmark returning unit spectrograms from workers through shared memory.
+
+Builds synthetic worker results (metadata plus float32 unit spectrograms)
+and compares two ways of handing them to the parent: pickling the float32
+list, as before, and quantizing to uint8 in the worker and passing a
+'SharedUnits' handle. For each, reports the bytes crossing the process
+boundary, the parent CPU time to unpickle a result and copy its units into
+a write buffer, and the worker CPU time to prepare the result.
+
+Example
+-------
+python benchmarks/bench_transfer.py --results 50 --units 200 --repeats 3
+"""
+
+import argparse
+import pickle
+import time
+
+import numpy as np
+
+from chatter.config import make_config
+from chatter.storage import quantize_units, share_units
+
+
+def best_time(fn, repeats):
+    """
+    Return the smallest process CPU time of 'repeats' runs of 'fn' in seconds.
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.process_time()
+        fn()
+        times.append(time.process_time() - start)
+    return min(times)
+
+
+def parent_pickled(payloads, out):
+    """
+    Old path: unpickle float32 lists, then quantize them for writing.
+    """
+    offset = 0
+    for payload in payloads:
+        metadata, specs, drops = pickle.loads(payload)
+        out[offset : offset + len(specs)] = quantize_units(specs)
+        offset += len(specs)
+
+
+def parent_shared(payloads, out):
+    """
+    New path: unpickle handles and copy each shared block out once.
+    """
+    offset = 0
+    for payload in payloads:
+        metadata, units, drops = pickle.loads(payload)
+        units.copy_into(out[offset : offset + len(units)])
+        offset += len(units)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--results", type=int, default=50)
+    parser.add_argument("--units", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    config = make_config()
+    shape = tuple(config["target_shape"])
+    rng = np.random.default_rng(0)
+    results = [
+        (
+            [{"onset": float(i), "offset": float(i) + 0.1} for i in range(args.units)],
+            list(rng.uniform(0, 1, (args.units, *shape)).astype(np.float32)),
+            {"max_length": 0, "min_length": 0, "empty": 0},
+        )
+        for _ in range(args.results)
+    ]
+    out = np.empty((args.results * args.units, *shape), dtype=np.uint8)
+
+    # Worker side of each path
+    t_work_old = best_time(lambda: [pickle.dumps(r) for r in results], args.repeats)
+    pickled = [pickle.dumps(r) for r in results]
+    start = time.process_time()
+    shared = [pickle.dumps((m, share_units(s, config), d)) for m, s, d in results]
+    t_work_new = time.process_time() - start
+
+    # Parent side; the shared blocks are freed as they are read, so the
+    # shared path runs once
+    t_old = best_time(lambda: parent_pickled(pickled, out), args.repeats)
+    expected = out.copy()
+    start = time.process_time()
+    parent_shared(shared, out)
+    t_new = time.process_time() - start
+    assert np.array_equal(out, expected)
+
+    n_old, n_new = sum(map(len, pickled)), sum(map(len, shared))
+    print(f"{args.results} results x {args.units} units of {shape}")
+    print(f"{'':<10}{'IPC MB':>10}{'worker s':>10}{'parent s':>10}")
+    print(f"{'pickled':<10}{n_old / 1e6:>10.1f}{t_work_old:>10.3f}{t_old:>10.3f}")
+    print(
+        f"{'shared':<10}{n_new / 1e6:>10.3f}{t_work_new:>10.3f}{t_new:>10.3f}"
+        f"  ({n_old / n_new:.0f}x fewer bytes, {t_old / t_new:.1f}x parent CPU)"
+    )
+
+
+if __name__ == "__main__":
+    main()
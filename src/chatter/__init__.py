@@ -9,6 +9,8 @@ Main Classes
 ------------
 Analyzer
     Audio preprocessing, segmentation, and spectrogram creation.
+AudioCatalog
+    On-disk index of a dataset's audio files and header metadata.
 Trainer
     Variational autoencoder training and feature extraction.
 FeatureProcessor
@@ -62,6 +64,7 @@ __email__ = "masonyoungblood@gmail.com"
 # Public API
 __all__ = [
     "Analyzer",
+    "AudioCatalog",
     "Trainer",
     "FeatureProcessor",
     "get_default_config",
@@ -82,6 +85,7 @@ warnings.filterwarnings(
 
 # Main user-facing classes and functions
 from .analyzer import Analyzer  # noqa: E402
+from .catalog import AudioCatalog  # noqa: E402
 from .trainer import Trainer  # noqa: E402
 from .features import FeatureProcessor  # noqa: E402
 from .config import get_default_config, make_config  # noqa: E402
@@ -12,25 +12,77 @@ import matplotlib.pyplot as plt  # noqa: E402
 import matplotlib.patches as patches  # noqa: E402
 import librosa  # noqa: E402
 import librosa.display  # noqa: E402
-import h5py  # noqa: E402
 from tqdm import tqdm  # noqa: E402
 from pathlib import Path  # noqa: E402
+import time  # noqa: E402
+import itertools  # noqa: E402
+import tempfile  # noqa: E402
+import contextlib  # noqa: E402
 from concurrent.futures import ProcessPoolExecutor, as_completed  # noqa: E402
-from os import cpu_count  # noqa: E402
 from types import SimpleNamespace  # noqa: E402
-from pydub import AudioSegment  # noqa: E402
 
 # Import local modules
+from .audio import (  # noqa: E402
+    audio_info,
+    load_audio,
+    load_audio_segment,
+    open_seekable,
+    resample,
+)
 from .data import (  # noqa: E402
-    _extract_species_worker,
-    _preprocess_wav_worker,
+    _init_worker,
+    _build_noise_profile_worker,
+    _birdnet_labels_worker,
+    _detect_species_files_worker,
+    _export_species_clips_worker,
+    _preprocess_files_worker,
+    _preprocess_and_segment_worker,
     _process_file_for_segmentation_worker,
     _process_presegmented_file_worker,
+    _power_reference_worker,
+    _pykanto_image_segments_worker,
+    _pykanto_window_image_worker,
+    _segment_window_worker,
+    _shared_units_worker,
+    _sharded_units_worker,
+    _stitch_window_results,
+    _sweep_segmentation_worker,
     segment_file,
     segment_file_simple,
     preprocess_audio_data,
     compute_spectrogram,
 )
+from .catalog import AudioCatalog, resolve_audio_files  # noqa: E402
+from .detections import DetectionStore, default_detections_path  # noqa: E402
+from .manifest import (  # noqa: E402
+    PREPROCESS_CONFIG_KEYS,
+    PreprocessManifest,
+    SegmentationCheckpoint,
+    config_hash,
+    default_checkpoint_path,
+    default_manifest_path,
+    file_content_hash,
+)
+from .noise import (  # noqa: E402
+    assign_noise_groups,
+    default_noise_profile_dir,
+    noise_profile_path,
+)
+from .storage import (  # noqa: E402
+    ShardedStore,
+    default_shard_dir,
+    is_flat_store,
+    receive_units,
+    spectrogram_writer,
+)
+from .parallel import (  # noqa: E402
+    TaskTimeline,
+    candidate_splits,
+    iter_completed,
+    longest_first,
+    resolve_thread_budget,
+    split_windows,
+)
 from .utils import chunker  # noqa: E402
 from .config import set_plot_style  # noqa: E402
 
@@ -56,10 +108,22 @@ class Analyzer:
     n_jobs : int
         Number of parallel worker processes used for preprocessing and
         segmentation steps.
+    threads_per_job : int
+        Number of threads each worker process may use inside native
+        libraries (BLAS/OpenMP, torch, numba, noisereduce).
+
+    Notes
+    -----
+    All stages share one process pool that lives as long as the Analyzer.
+    Each worker receives the configuration, mel filterbank, and denoising
+    model once, when it starts, so tasks only carry their own arguments.
+    The pool is rebuilt automatically when 'config' or the thread budget
+    changes, and can be released early with 'close()' or by using the
+    Analyzer as a context manager.
     """
 
     # Initialize analyzer
-    def __init__(self, config, n_jobs=-1):
+    def __init__(self, config, n_jobs=-1, threads_per_job=None):
         """
         Initialize the Analyzer with a configuration and optional parallelism.
 
@@ -69,7 +133,13 @@ class Analyzer:
             Configuration dictionary containing all pipeline parameters.
         n_jobs : int, optional
             Number of parallel jobs to run for preprocessing and segmentation.
-            If set to -1, all available CPU cores are used. The default is -1.
+            If set to -1, as many processes as fit in the available CPU cores
+            given 'threads_per_job' are used. The default is -1.
+        threads_per_job : int, optional
+            Number of threads each worker process may use inside native
+            libraries. If None, the available cores are divided evenly
+            between the worker processes, so that 'n_jobs * threads_per_job'
+            does not exceed the core count. The default is None.
         """
         # Store configuration
         self.config = dict(config)
@@ -78,18 +148,391 @@ class Analyzer:
         if "skip_noise" not in self.config:
             self.config["skip_noise"] = 3.0
 
-        # Determine number of parallel workers
-        if n_jobs == -1:
-            self.n_jobs = cpu_count()
-        else:
-            self.n_jobs = n_jobs
+        # Split the cores into worker processes and threads per process
+        self._pool = None
+        self._pool_key = None
+        self.set_thread_budget(n_jobs, threads_per_job)
+
+    # Enter context
+    def __enter__(self):
+        return self
+
+    # Exit context
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Set thread budget
+    def set_thread_budget(self, n_jobs=-1, threads_per_job=None):
+        """
+        Set the number of worker processes and threads per process.
+
+        Parameters
+        ----------
+        n_jobs : int, optional
+            Number of worker processes, or -1 to fill the available cores.
+            The default is -1.
+        threads_per_job : int, optional
+            Threads per worker process, or None to divide the available
+            cores evenly. The default is None.
+        """
+        self.close()
+        self.n_jobs, self.threads_per_job = resolve_thread_budget(
+            n_jobs, threads_per_job
+        )
+        self.config["threads_per_job"] = self.threads_per_job
 
         # Print number of cores
-        print(f"Using {self.n_jobs} cores for parallel processing")
+        print(
+            f"Using {self.n_jobs} cores for parallel processing "
+            f"({self.threads_per_job} threads per process)"
+        )
 
-    # Extract species clips
-    def extract_species_clips(
+    # Shut down worker pool
+    def close(self, wait=True):
+        """
+        Shut down the persistent worker pool, if one is running.
+
+        Parameters
+        ----------
+        wait : bool, optional
+            If True, wait for running tasks to finish. Queued tasks are
+            cancelled either way. The default is True.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+            self._pool_key = None
+
+    # Borrow persistent process pool
+    @contextlib.contextmanager
+    def _executor(self):
+        """
+        Yield the persistent process pool, starting or rebuilding it if needed.
+
+        Workers are started with '_init_worker', which applies the thread
+        budget and installs the current configuration. Tasks submitted to
+        this pool should pass None as their configuration. If the block
+        raises (including KeyboardInterrupt), queued tasks are cancelled and
+        the pool is discarded.
+
+        Yields
+        ------
+        concurrent.futures.ProcessPoolExecutor
+            Pool of 'self.n_jobs' initialized workers.
+        """
+        # Rebuild the pool if its workers hold stale settings or have died
+        key = (config_hash(self.config, self.config), self.n_jobs, self.threads_per_job)
+        if self._pool is not None and (
+            self._pool_key != key or getattr(self._pool, "_broken", False)
+        ):
+            self.close()
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.n_jobs,
+                initializer=_init_worker,
+                initargs=(dict(self.config), self.threads_per_job),
+            )
+            self._pool_key = key
+
+        try:
+            yield self._pool
+        except BaseException:
+            self.close(wait=False)
+            raise
+
+    # Build or reuse cached per-group noise profiles
+    def _noise_profiles(self, raw_files, input_dir, output_path):
+        """
+        Map each file to its group's cached noise profile, building any
+        profiles that are missing.
+
+        Profiles are only used for stationary noise reduction ('static' and
+        'use_noisereduce'), for files grouped by 'noise_profile_groups'.
+        Missing profiles are estimated in parallel from up to
+        'noise_profile_files' recordings spread across each group and stored
+        in 'noise_profile_dir' (by default next to 'output_path'), keyed by
+        group and the settings that affect them.
+
+        Parameters
+        ----------
+        raw_files : list of Path
+            Audio files about to be processed.
+        input_dir : Path
+            Root directory of 'raw_files'.
+        output_path : Path
+            Processed directory or HDF5 file the run writes to.
+
+        Returns
+        -------
+        dict
+            Mapping from file to profile path (as str) for grouped files.
+        """
+        groups = assign_noise_groups(
+            raw_files, input_dir, self.config.get("noise_profile_groups")
+        )
+        if not groups:
+            return {}
+        if not (self.config.get("use_noisereduce", True) and self.config["static"]):
+            print("--- Noise profiles require stationary noisereduce; ignoring ---")
+            return {}
+
+        # Collect the members of each group
+        members = {}
+        for raw_file, group in groups.items():
+            members.setdefault(group, []).append(raw_file)
+
+        profile_dir = self.config.get("noise_profile_dir")
+        if profile_dir is None:
+            profile_dir = default_noise_profile_dir(output_path)
+        profiles = {
+            group: noise_profile_path(profile_dir, group, self.config)
+            for group in members
+        }
+
+        # Estimate missing profiles from files spread across each group
+        missing = [group for group, path in profiles.items() if not path.exists()]
+        if missing:
+            print(f"--- Building noise profiles for {len(missing)} groups ---")
+            n_files = max(int(self.config.get("noise_profile_files", 8)), 1)
+            with self._executor() as executor:
+                futures = {}
+                for group in missing:
+                    files = sorted(members[group])
+                    picks = np.unique(np.linspace(0, len(files) - 1, n_files).round())
+                    sample = [files[int(i)] for i in picks]
+                    futures[
+                        executor.submit(
+                            _build_noise_profile_worker, sample, profiles[group], None
+                        )
+                    ] = group
+                for future in tqdm(
+                    as_completed(futures), total=len(futures), desc="Noise profiles"
+                ):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"Noise profile for '{futures[future]}' failed: {e}")
+
+        # Files whose group has no profile fall back to per-file statistics
+        return {
+            raw_file: str(profiles[group])
+            for raw_file, group in groups.items()
+            if profiles[group].exists()
+        }
+
+    # Read header metadata from a catalog or the file itself
+    @staticmethod
+    def _header(path, catalog=None):
+        """
+        Return the header metadata of a file, preferring a catalog entry.
+
+        Parameters
+        ----------
+        path : Path
+            Audio file.
+        catalog : AudioCatalog, optional
+            Catalog to look the file up in before reading its header.
+
+        Returns
+        -------
+        types.SimpleNamespace
+            Result of 'audio_info' (or the equivalent catalog entry).
+        """
+        info = catalog.info(path) if catalog is not None else None
+        return info if info is not None else audio_info(path)
+
+    # Read durations from file headers
+    @staticmethod
+    def _durations(files, catalog=None):
+        """
+        Read the duration of each file from its header, without decoding.
+
+        Parameters
+        ----------
+        files : list of Path
+            Audio files.
+        catalog : AudioCatalog, optional
+            Catalog holding the durations of (some of) the files, so that
+            their headers are not read again.
+
+        Returns
+        -------
+        list of float or None
+            Duration in seconds of each file, or None if it cannot be read.
+        """
+        durations = []
+        for path in files:
+            try:
+                durations.append(Analyzer._header(path, catalog).duration)
+            except Exception:
+                durations.append(None)
+        return durations
+
+    # Plan windows for splitting long files during segmentation
+    def _segmentation_windows(self, processed_file, simple, catalog=None):
+        """
+        Plan the segmentation tasks of one preprocessed file.
+
+        Files longer than 'split_seconds' are cut into windows whose cores
+        are at most 'split_seconds' long, with 'split_overlap_seconds' (at
+        least twice the maximum unit length) of context on each side. Window
+        boundaries fall on STFT frames, so unit spectrograms match those of
+        the whole file.
+
+        Parameters
+        ----------
+        processed_file : Path
+            Preprocessed WAV file.
+        simple : bool
+            Whether the simple segmentation method (and its maximum unit
+            length) is used.
+        catalog : AudioCatalog, optional
+            Catalog to read the file's header metadata from.
+
+        Returns
+        -------
+        list of tuple
+            (window, seconds) per task: 'window' is None for the whole file
+            or a (start, stop, core_start, core_stop) sample range, and
+            'seconds' is the task's duration (None if unknown).
+        """
+        try:
+            info = self._header(processed_file, catalog)
+        except Exception:
+            return [(None, None)]
+
+        split_seconds = self.config.get("split_seconds")
+        if not split_seconds or info.duration <= split_seconds:
+            return [(None, info.duration)]
+
+        sr = info.samplerate
+        max_unit = self.config[
+            "simple_max_unit_length" if simple else "pykanto_max_unit_length"
+        ]
+        overlap = max(self.config.get("split_overlap_seconds", 1.0), 2 * max_unit)
+        windows = split_windows(
+            info.frames,
+            int(split_seconds * sr),
+            int(overlap * sr),
+            align=self.config["hop_length"],
+        )
+        return [(w, (w[1] - w[0]) / sr) for w in windows]
+
+    # Detect species and store every detection
+    def detect_species(
+        self, input_dir, detections_path, batch_size=None, files_per_task=8
+    ):
+        """
+        Run BirdNET on new audio files and store their detections.
+
+        Every detection above the table's confidence floor (set from
+        'birdnet_min_confidence' when the table is created) is written to a
+        columnar HDF5 detection table keyed by file content hash, so clips
+        for any species and threshold can later be exported with
+        'export_species_clips' without running the model again. Paths whose
+        size and modification time are unchanged are skipped; other files
+        are hashed in parallel, and only contents not already in the table
+        are analyzed, so renamed or copied recordings are not rescored.
+
+        Parameters
+        ----------
+        input_dir : str, Path, or AudioCatalog
+            The root directory to search for audio files, or its catalog.
+        detections_path : str or Path
+            The HDF5 detection table to create or update.
+        batch_size : int, optional
+            Maximum number of tasks submitted to the pool at once. If None, a
+            default value of 'n_jobs * 2' is used.
+        files_per_task : int, optional
+            Number of files handed to a worker in one task; their windows
+            share interpreter invocations. The default is 8.
+
+        Returns
+        -------
+        DetectionStore
+            The updated detection table.
+        """
+        # Set default batch size
+        if batch_size is None:
+            batch_size = self.n_jobs * 2
+
+        # Find all audio files recursively, or take them from a catalog
+        input_dir, files, catalog = resolve_audio_files(input_dir)
+        store = DetectionStore(
+            detections_path, self.config.get("birdnet_min_confidence", 0.1)
+        )
+
+        # Skip paths recorded with their current size and modification time
+        keys = {f: f.relative_to(input_dir).as_posix() for f in files}
+        pending = [f for f in files if not store.known_path(keys[f], f)]
+        print(f"--- Found {len(files)} audio files, {len(pending)} new or changed ---")
+        if not pending:
+            return store
+
+        with self._executor() as executor:
+            # Hash new or changed files, then only analyze unseen contents
+            hashes = dict(
+                zip(pending, executor.map(file_content_hash, pending, chunksize=16))
+            )
+            labels = store.labels or executor.submit(_birdnet_labels_worker).result()
+            if labels is None:
+                print("--- BirdNET not available, skipping species detection ---")
+                return store
+
+            store.open(labels)
+            try:
+                copies = {}
+                for path in pending:
+                    content_hash = hashes[path]
+                    if store.known_hash(content_hash):
+                        store.add_path(keys[path], path, content_hash)
+                    else:
+                        copies.setdefault(content_hash, []).append(path)
+                to_detect = [paths[0] for paths in copies.values()]
+                print(f"--- Running BirdNET on {len(to_detect)} files ---")
+
+                # Prepare tasks, longest files first
+                to_detect = longest_first(
+                    to_detect, self._durations(to_detect, catalog)
+                )
+                # Keep detections down to the floor the table was created
+                # with, which may be below 'birdnet_min_confidence'
+                tasks = (
+                    (
+                        group,
+                        _detect_species_files_worker,
+                        (group, None, store.min_confidence),
+                    )
+                    for group in chunker(to_detect, files_per_task)
+                )
+
+                # Append results as tasks complete
+                pbar = tqdm(total=len(to_detect), desc="Detecting species")
+                for group, future in iter_completed(executor, tasks, batch_size):
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        print(f"A species detection task generated an exception: {e}")
+                        results = [None] * len(group)
+                    for path, result in zip(group, results):
+                        if result is None:
+                            continue
+                        content_hash = hashes[path]
+                        store.add_file(content_hash, *result)
+                        for copy in copies[content_hash]:
+                            store.add_path(keys[copy], copy, content_hash)
+                    pbar.update(len(group))
+                pbar.close()
+            finally:
+                store.close()
+
+        print(f"\n--- Species detection complete. Detections saved to {store.path} ---")
+        return store
+
+    # Export clips from stored detections
+    def export_species_clips(
         self,
+        detections_path,
         input_dir,
         output_dir,
         species,
@@ -98,87 +541,85 @@ class Analyzer:
         batch_size=None,
     ):
         """
-        Recursively find audio files, detect a species, and export clips.
+        Export clips of one or more species from a stored detection table.
 
-        This method scans an input directory for audio files, runs BirdNET to
-        detect a specific species, and saves the resulting audio clips to an
-        output directory that mirrors the input's structure. The process is
-        executed in parallel across multiple CPU cores.
+        Only the detection table written by 'detect_species' is read to
+        select clips, so any list of species and thresholds can be exported
+        without running BirdNET again. Adjacent detections of a species are
+        merged, buffered, and saved to an output directory that mirrors the
+        input's structure; each source file is decoded once for all species.
 
         Parameters
         ----------
-        input_dir : str or Path
-            The root directory to search for audio files.
+        detections_path : str or Path
+            The HDF5 detection table.
+        input_dir : str, Path, or AudioCatalog
+            The root directory the detections were computed for, or its
+            catalog.
         output_dir : str or Path
             The root directory where the output clips will be saved.
-        species : str
-            The common name of the target species to detect (e.g., "House Finch").
-        confidence_threshold : float, optional
-            The minimum confidence level (0-1) for a detection to be included.
-            The default is 0.5.
+        species : str or list of str
+            Common names of the species to export (e.g., "House Finch").
+        confidence_threshold : float or dict, optional
+            The minimum confidence level (0-1) for a detection to be included,
+            or a dict mapping each species to its own threshold. Thresholds
+            below the table's 'birdnet_min_confidence' raise a ValueError. The
+            default is 0.5.
         buffer_seconds : float, optional
             The number of seconds to add to the start and end of each detected
             clip. The default is 1.0.
         batch_size : int, optional
-            Number of files to process per batch in each parallel submission.
-            If None, a default value of 'n_jobs * 2' is used.
+            Maximum number of tasks submitted to the pool at once. If None, a
+            default value of 'n_jobs * 2' is used.
         """
         # Set default batch size
         if batch_size is None:
             batch_size = self.n_jobs * 2
 
         # Convert paths to pathlib objects
+        if isinstance(input_dir, AudioCatalog):
+            input_dir = input_dir.root
         input_dir = Path(input_dir)
         output_dir = Path(output_dir)
+        if not Path(detections_path).exists():
+            raise FileNotFoundError(f"Detection table not found: {detections_path}")
+        store = DetectionStore(detections_path)
+
+        # Select the intervals of every species per file
+        species = [species] if isinstance(species, str) else list(species)
+        common_names = {label.split("_")[1] for label in store.labels}
+        selected = {}
+        for name in species:
+            if name not in common_names:
+                print(f"--- No BirdNET label for '{name}', skipping ---")
+                continue
+            if isinstance(confidence_threshold, dict):
+                if name not in confidence_threshold:
+                    raise ValueError(f"No confidence threshold given for '{name}'")
+                threshold = confidence_threshold[name]
+            else:
+                threshold = confidence_threshold
+            for key, intervals in store.select(name, threshold).items():
+                selected.setdefault(key, {})[name] = intervals
+
+        print(f"--- Exporting clips from {len(selected)} files ---")
+        tasks = (
+            (
+                key,
+                _export_species_clips_worker,
+                (input_dir / key, input_dir, output_dir, intervals, buffer_seconds),
+            )
+            for key, intervals in selected.items()
+        )
 
-        # Find all audio files recursively
-        supported_formats = [
-            ".wav",
-            ".mp3",
-            ".flac",
-            ".ogg",
-            ".m4a",
-            ".WAV",
-            ".MP3",
-            ".FLAC",
-            ".OGG",
-            ".M4A",
-        ]
-        files_to_process = []
-
-        for fmt in supported_formats:
-            files_to_process.extend(input_dir.rglob(f"*{fmt}"))
-
-        # Print number of found files
-        print(f"--- Found {len(files_to_process)} audio files to process ---")
-
-        # Initialize progress bar
-        pbar = tqdm(total=len(files_to_process), desc=f"Detecting '{species}'")
-
-        # Process files in parallel batches
-        with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
-            # Prepare arguments for the worker function
-            tasks = [
-                (
-                    path,
-                    input_dir,
-                    output_dir,
-                    species,
-                    confidence_threshold,
-                    buffer_seconds,
-                )
-                for path in files_to_process
-            ]
-
-            # Submit tasks to the executor
-            futures = [executor.submit(_extract_species_worker, task) for task in tasks]
-
-            # Collect results as they complete
-            for future in as_completed(futures):
+        # Process files in parallel, topping up the pool as tasks complete
+        pbar = tqdm(total=len(selected), desc="Exporting clips")
+        with self._executor() as executor:
+            for key, future in iter_completed(executor, tasks, batch_size):
                 try:
                     future.result()
                 except Exception as e:
-                    print(f"A species extraction task generated an exception: {e}")
+                    print(f"A clip export task generated an exception: {e}")
                 pbar.update(1)
 
         # Close the progress bar
@@ -187,28 +628,135 @@ class Analyzer:
             f"\n--- Species clip extraction complete. Clips saved to {output_dir} ---"
         )
 
+    # Extract species clips
+    def extract_species_clips(
+        self,
+        input_dir,
+        output_dir,
+        species,
+        confidence_threshold=0.5,
+        buffer_seconds=1.0,
+        batch_size=None,
+        files_per_task=8,
+        detections_path=None,
+    ):
+        """
+        Recursively find audio files, detect a species, and export clips.
+
+        This method runs 'detect_species' to update a detection table with
+        any files not analyzed before, then 'export_species_clips' to save
+        the clips of the requested species to an output directory that
+        mirrors the input's structure. Rerunning with other species or
+        thresholds only repeats the export step.
+
+        Parameters
+        ----------
+        input_dir : str, Path, or AudioCatalog
+            The root directory to search for audio files, or its catalog.
+        output_dir : str or Path
+            The root directory where the output clips will be saved.
+        species : str or list of str
+            Common names of the target species (e.g., "House Finch").
+        confidence_threshold : float or dict, optional
+            The minimum confidence level (0-1) for a detection to be included,
+            or a dict mapping each species to its own threshold. The default
+            is 0.5.
+        buffer_seconds : float, optional
+            The number of seconds to add to the start and end of each detected
+            clip. The default is 1.0.
+        batch_size : int, optional
+            Maximum number of tasks submitted to the pool at once. If None, a
+            default value of 'n_jobs * 2' is used.
+        files_per_task : int, optional
+            Number of files handed to a worker in one task; their windows
+            share interpreter invocations. The default is 8.
+        detections_path : str or Path, optional
+            The HDF5 detection table. Defaults to
+            '<output_dir name>_detections.h5' next to 'output_dir'.
+        """
+        if detections_path is None:
+            detections_path = default_detections_path(output_dir)
+
+        store = self.detect_species(
+            input_dir, detections_path, batch_size, files_per_task
+        )
+        if not store.path.exists():
+            return
+        self.export_species_clips(
+            detections_path,
+            input_dir,
+            output_dir,
+            species,
+            confidence_threshold,
+            buffer_seconds,
+            batch_size,
+        )
+
     # Preprocess directory
-    def preprocess_directory(self, input_dir, processed_dir, batch_size=None):
+    def preprocess_directory(
+        self,
+        input_dir,
+        processed_dir,
+        batch_size=None,
+        incremental=True,
+        hash_contents=False,
+        manifest_path=None,
+        files_per_task=1,
+    ):
         """
         Preprocess all audio files in a directory and its subdirectories.
 
         This method performs batch preprocessing of audio files by calling
-        '_preprocess_wav_worker' in parallel. All supported audio file formats
+        '_preprocess_files_worker' in parallel. All supported audio file formats
         are discovered recursively under 'input_dir', preprocessed, and saved
         as standardized WAV files under 'processed_dir', preserving the directory
         structure.
 
+        When 'incremental' is True, a manifest stored next to 'processed_dir'
+        records the size, modification time (and optionally content hash) of
+        every processed input along with a hash of the preprocessing-relevant
+        configuration keys. Files that are unchanged since they were last
+        processed with the same settings are skipped, so reruns only process
+        new or stale files and an interrupted run resumes where it stopped.
+
+        When 'noise_profile_groups' is set and noise reduction is stationary,
+        a noise profile is estimated once per recorder group, cached on disk,
+        and reused for every file in the group instead of estimating noise
+        statistics from each file.
+
+        Files are submitted longest first, using durations read from their
+        headers, and the time workers spend idle at the end of the run is
+        reported.
+
         Parameters
         ----------
-        input_dir : str or Path
-            Directory containing raw audio files in various formats.
+        input_dir : str, Path, or AudioCatalog
+            Directory containing raw audio files in various formats, or its
+            catalog (see 'AudioCatalog').
         processed_dir : str or Path
             Directory in which to save preprocessed WAV files. The directory
             structure mirrors that of 'input_dir'.
         batch_size : int, optional
-            Number of files to process per batch in each parallel submission.
-            If None, a default value of 'n_jobs * 2' is used. The default is
-            None.
+            Maximum number of tasks submitted to the pool at once; a new task
+            is submitted as soon as a running one completes. If None, a
+            default value of 'n_jobs * 2' is used. The default is None.
+        incremental : bool, optional
+            If True, skip files recorded as up to date in the manifest and
+            record each newly processed file. If False, reprocess every file
+            and leave the manifest untouched. The default is True.
+        hash_contents : bool, optional
+            If True, store a content hash for each input and use it to avoid
+            reprocessing files whose modification time changed but whose
+            contents did not. The default is False.
+        manifest_path : str or Path, optional
+            Location of the manifest. If None, '<processed_dir>_manifest.jsonl'
+            is created alongside 'processed_dir'. The default is None.
+        files_per_task : int, optional
+            Number of files handed to a worker in one task. Files in the same
+            task share batched biodenoising forward passes (see
+            'biodenoising_batch_size'), which speeds up denoising of many
+            short files at the cost of holding the whole group in memory.
+            The default is 1.
 
         Returns
         -------
@@ -221,64 +769,241 @@ class Analyzer:
             batch_size = self.n_jobs * 2
 
         # Convert paths to pathlib objects
-        input_dir = Path(input_dir)
         processed_dir = Path(processed_dir)
 
-        # Find all audio files recursively
-        supported_formats = [
-            ".wav",
-            ".mp3",
-            ".flac",
-            ".ogg",
-            ".m4a",
-            ".WAV",
-            ".MP3",
-            ".FLAC",
-            ".OGG",
-            ".M4A",
-        ]
-        raw_files = []
-
-        for fmt in supported_formats:
-            raw_files.extend(input_dir.rglob(f"*{fmt}"))
+        # Find all audio files recursively, or take them from a catalog
+        input_dir, raw_files, catalog = resolve_audio_files(input_dir)
 
         # Print number of found files
         print(f"--- Found {len(raw_files)} audio files to preprocess ---")
 
-        # Initialize progress bar
-        pbar = tqdm(total=len(raw_files), desc="Preprocessing audio")
-
-        # Process files in parallel batches
-        with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
-            for file_batch in chunker(raw_files, batch_size):
-                futures = []
-                for raw_file in file_batch:
-                    relative_path = raw_file.relative_to(input_dir)
-                    output_path = (processed_dir / relative_path).with_suffix(".wav")
+        # Pair each input with its output path
+        jobs = []
+        for raw_file in raw_files:
+            relative_path = raw_file.relative_to(input_dir)
+            output_path = (processed_dir / relative_path).with_suffix(".wav")
+            jobs.append((raw_file, str(relative_path), output_path))
+
+        # Skip files that are already up to date according to the manifest
+        manifest = None
+        if incremental:
+            if manifest_path is None:
+                manifest_path = default_manifest_path(processed_dir)
+            manifest = PreprocessManifest(
+                manifest_path, self.config, hash_contents=hash_contents
+            )
+            jobs = [job for job in jobs if manifest.is_stale(*job)]
+            n_skipped = len(raw_files) - len(jobs)
+            if n_skipped:
+                print(f"--- Skipping {n_skipped} up-to-date files (manifest) ---")
+
+        # Reuse one noise profile per recorder group, if configured
+        noise_profiles = self._noise_profiles(raw_files, input_dir, processed_dir)
+
+        # Start the longest files first so that none runs alone at the end
+        jobs = longest_first(jobs, self._durations([job[0] for job in jobs], catalog))
+        tasks = (
+            (
+                group,
+                _preprocess_files_worker,
+                (
+                    [
+                        (raw_file, output_path, noise_profiles.get(raw_file))
+                        for raw_file, _, output_path in group
+                    ],
+                    None,
+                ),
+            )
+            for group in chunker(jobs, files_per_task)
+        )
 
-                    futures.append(
-                        executor.submit(
-                            _preprocess_wav_worker,
-                            raw_file,
-                            output_path,
-                            self.config,
-                        ),
-                    )
+        # Initialize progress bar
+        pbar = tqdm(total=len(jobs), desc="Preprocessing audio")
+        timeline = TaskTimeline(self.n_jobs)
 
-                # Collect results as they complete
-                for future in as_completed(futures):
+        # Process files in parallel, topping up the pool as tasks complete
+        try:
+            with self._executor() as executor:
+                for group, future in iter_completed(
+                    executor, tasks, batch_size, timeline
+                ):
                     try:
-                        future.result()
+                        succeeded = future.result()
+                        if manifest is not None:
+                            for job, ok in zip(group, succeeded):
+                                if ok:
+                                    manifest.record(*job)
                     except Exception as e:
                         print(f"A preprocessing task generated an exception: {e}")
-                    pbar.update(1)
+                    pbar.update(len(group))
+        finally:
+            # Persist the manifest even if the run is interrupted
+            if manifest is not None:
+                manifest.compact()
 
         # Close the progress bar
         pbar.close()
+        print(f"--- {timeline.report()} ---")
         print(
             f"\n--- Preprocessing complete. Standardized WAV audio saved to {processed_dir} ---"
         )
 
+    # Autotune thread budget
+    def autotune_thread_budget(
+        self,
+        input_dir,
+        n_files=None,
+        splits=None,
+        files_per_task=1,
+        apply=True,
+    ):
+        """
+        Measure preprocessing throughput for several process/thread splits.
+
+        A sample of files from 'input_dir' is preprocessed into a temporary
+        directory once per split, and the throughput in files per second is
+        recorded. Nothing is written to the real output directory and the
+        manifest is not touched.
+
+        Parameters
+        ----------
+        input_dir : str, Path, or AudioCatalog
+            Directory containing raw audio files in various formats, or its
+            catalog.
+        n_files : int, optional
+            Number of files to sample. If None, twice the largest process
+            count among the splits is used. The default is None.
+        splits : list of tuple of int, optional
+            Candidate (n_jobs, threads_per_job) pairs. If None, every
+            power-of-two thread count that fills the available cores is
+            tried. The default is None.
+        files_per_task : int, optional
+            Number of files handed to a worker in one task, as in
+            'preprocess_directory'. The default is 1.
+        apply : bool, optional
+            If True, adopt the fastest split for later calls; otherwise
+            restore the current one. The default is True.
+
+        Returns
+        -------
+        pd.DataFrame or None
+            One row per split with 'n_jobs', 'threads_per_job', 'seconds',
+            'files_per_second', and 'n_failed', sorted from fastest to
+            slowest. None if no audio files are found.
+        """
+        # Find all audio files in directory recursively, or in a catalog
+        input_dir, files, _ = resolve_audio_files(input_dir)
+
+        # Check that files were found
+        if not files:
+            print(f"Error: No audio files found in {input_dir}")
+            return None
+
+        # Draw a fixed sample shared by every split
+        if splits is None:
+            splits = candidate_splits()
+        if n_files is None:
+            n_files = 2 * max(n_jobs for n_jobs, _ in splits)
+        if len(files) > n_files:
+            rng = np.random.default_rng(0)
+            files = [
+                files[i] for i in sorted(rng.choice(len(files), n_files, replace=False))
+            ]
+
+        # Warm the page cache so every split reads from memory
+        for f in files:
+            f.read_bytes()
+
+        print(f"--- Timing {len(splits)} thread budgets on {len(files)} files ---")
+        original = (self.n_jobs, self.threads_per_job)
+        results = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            jobs = [(f, Path(tmp_dir) / f"{i}.wav") for i, f in enumerate(files)]
+            for n_jobs, threads_per_job in splits:
+                self.n_jobs, self.threads_per_job = n_jobs, threads_per_job
+                self.config["threads_per_job"] = threads_per_job
+
+                # Time pool startup and processing together, as in a real run
+                n_succeeded = 0
+                start = time.perf_counter()
+                with self._executor() as executor:
+                    futures = [
+                        executor.submit(_preprocess_files_worker, group, None)
+                        for group in chunker(jobs, files_per_task)
+                    ]
+                    for future in as_completed(futures):
+                        n_succeeded += sum(future.result())
+                seconds = time.perf_counter() - start
+
+                results.append(
+                    {
+                        "n_jobs": n_jobs,
+                        "threads_per_job": threads_per_job,
+                        "seconds": seconds,
+                        "files_per_second": len(files) / seconds,
+                        "n_failed": len(files) - n_succeeded,
+                    }
+                )
+                print(
+                    f"   {n_jobs:>4} processes x {threads_per_job:<3} threads: "
+                    f"{len(files) / seconds:.2f} files/s"
+                )
+
+        results = pd.DataFrame(results).sort_values(
+            "files_per_second", ascending=False, ignore_index=True
+        )
+
+        # Adopt the fastest split or restore the previous one
+        if apply:
+            best = results.iloc[0]
+            self.set_thread_budget(int(best["n_jobs"]), int(best["threads_per_job"]))
+        else:
+            self.set_thread_budget(*original)
+
+        return results
+
+    # Load a mono clip at the configured sample rate
+    def _load_clip(self, input_path, offset, duration):
+        """
+        Decode a clip of a file as mono audio resampled to config['sr'].
+
+        WAV, FLAC, and similar files are read from the clip's first frame
+        and only the clip is resampled; other formats are decoded whole.
+
+        Parameters
+        ----------
+        input_path : Path
+            Audio file to read.
+        offset : float
+            Start of the clip in seconds.
+        duration : float
+            Length of the clip in seconds.
+
+        Returns
+        -------
+        tuple of (np.ndarray, int)
+            Mono float32 clip and its sample rate.
+        """
+        sr = self.config["sr"]
+        backend = self.config.get("audio_backend", "auto")
+
+        # Formats that need pydub are decoded whole, then sliced
+        f = open_seekable(input_path, backend)
+        if f is None:
+            y, _ = load_audio(input_path, sr=sr, backend=backend)
+            start = int(round(offset * sr))
+            return y[:, start : start + int(round(duration * sr))].mean(axis=0), sr
+
+        # Otherwise read only the clip's frames, clipped as 'load_audio' does
+        with f:
+            native_sr = f.samplerate
+            f.seek(min(int(round(offset * native_sr)), f.frames))
+            y = f.read(
+                int(round(duration * native_sr)), dtype="float32", always_2d=True
+            ).T
+        np.clip(y, -1.0, 1.0, out=y)
+        return resample(y, native_sr, sr).mean(axis=0), sr
+
     # Demo preprocessing
     def demo_preprocessing(self, input_dir):
         """
@@ -290,31 +1015,14 @@ class Analyzer:
 
         Parameters
         ----------
-        input_dir : str or Path
-            Directory containing audio files to process.
+        input_dir : str, Path, or AudioCatalog
+            Directory containing audio files to process, or its catalog.
         """
         # Apply plot style
         set_plot_style(SimpleNamespace(**self.config))
-        input_dir = Path(input_dir)
 
-        # Find all audio files in directory recursively
-        supported_formats = [
-            ".wav",
-            ".mp3",
-            ".flac",
-            ".ogg",
-            ".m4a",
-            ".WAV",
-            ".MP3",
-            ".FLAC",
-            ".OGG",
-            ".M4A",
-        ]
-        files = [
-            f
-            for f in input_dir.rglob("*")
-            if f.suffix.lower() in supported_formats and f.is_file()
-        ]
+        # Find all audio files in directory recursively, or in a catalog
+        input_dir, files, _ = resolve_audio_files(input_dir)
 
         # Check that files were found
         if not files:
@@ -331,10 +1039,12 @@ class Analyzer:
         clip_duration_sec = self.config.get("plot_clip_duration", 10.0)
 
         # Determine file duration and find interesting segments
-        # Load with librosa first to find onset and offset activity
+        # Load the full file first to find onset and offset activity
+        backend = self.config.get("audio_backend", "auto")
         try:
             # Load full audio to scan structure; native sample rate is usually faster
-            y_scan, sr_scan = librosa.load(str(input_path), sr=None)
+            y_scan, sr_scan = load_audio(input_path, backend=backend)
+            y_scan = y_scan.mean(axis=0)
             total_duration = librosa.get_duration(y=y_scan, sr=sr_scan)
         except Exception as e:
             print(f"Error scanning file duration: {e}")
@@ -375,8 +1085,8 @@ class Analyzer:
 
         # Processing pipeline
 
-        # Load audio file using pydub
-        audio = AudioSegment.from_file(input_path)
+        # Load audio file as a pydub AudioSegment
+        audio = load_audio_segment(input_path, backend=backend)
 
         # Apply slicing before processing to save time on heavy operations like noise reduction
         start_ms = int(start_offset * 1000)
@@ -405,12 +1115,7 @@ class Analyzer:
 
         # Load original using librosa for visual comparison
         # Use the same offset and duration as the processed clip
-        y_orig, sr_orig = librosa.load(
-            str(input_path),
-            sr=self.config["sr"],
-            offset=start_offset,
-            duration=clip_duration_sec,
-        )
+        y_orig, sr_orig = self._load_clip(input_path, start_offset, clip_duration_sec)
 
         # Generate spectrograms
         spec_orig = compute_spectrogram(y_orig, sr_orig, self.config)
@@ -462,6 +1167,7 @@ class Analyzer:
         simple=False,
         batch_size=None,
         presegment_csv=None,
+        resume=False,
     ):
         """
         Segment files and save spectrograms, optionally from a pre-segmented CSV.
@@ -473,22 +1179,49 @@ class Analyzer:
         If `presegment_csv` is None, it scans a directory of preprocessed WAV
         files, segments each file into syllable-like acoustic units using
         internal methods, converts segments into spectrograms, and stores them.
+        Files are submitted longest first (durations are read from their
+        headers). Files longer than 'split_seconds' are segmented in
+        overlapping windows on several workers and stitched back together;
+        their units are then numbered consecutively by onset in 'unit_index'.
+        Windows are converted to decibels relative to the maximum power of
+        the whole file, found in a first pass over it, so that thresholds and
+        noise floors apply as in a whole-file run.
+
+        If 'spectrogram_shards' is set in the configuration, each worker
+        appends its units to its own shard file in '<h5 stem>_shards' and
+        'h5_path' becomes an HDF5 virtual dataset joining the shards, read
+        like a regular file; 'h5_index' values are assigned when the shards
+        are joined at the end of the run. Shards need an HDF5 'h5_path'.
+
+        Every 'checkpoint_seconds' (configuration, default 60), written units
+        are flushed and a checkpoint next to the HDF5 file records the
+        committed files, HDF5 length, and metadata rows. With 'resume=True',
+        an interrupted run with the same settings continues from its last
+        checkpoint: the HDF5 file is reopened, units written after the
+        checkpoint are discarded, and committed files are skipped. The
+        checkpoint is removed once the metadata CSV is written.
 
         Parameters
         ----------
-        processed_dir : str or Path
-            Directory containing preprocessed WAV files.
+        processed_dir : str, Path, or AudioCatalog
+            Directory containing preprocessed WAV files, or its catalog.
         h5_path : str or Path
-            Path to the output HDF5 file for spectrograms.
+            Path to the output HDF5 file for spectrograms, or to a flat
+            memory-mapped '.npy' store.
         csv_path : str or Path
             Path to the CSV file for unit metadata.
         simple : bool, optional
             If True, use simple amplitude-based segmentation. Default is False.
         batch_size : int, optional
-            Number of files to process per batch in parallel. Default is 'n_jobs'.
+            Maximum number of tasks in flight, and of results waiting for the
+            HDF5 writer. Default is 'n_jobs * 2'.
         presegment_csv : str or Path, optional
             Path to a CSV file with pre-defined segmentations. If provided,
             internal segmentation is skipped. Default is None.
+        resume : bool, optional
+            If True, continue an interrupted run from its checkpoint, if one
+            exists for the same settings. Otherwise the output is rebuilt
+            from scratch. Default is False.
 
         Returns
         -------
@@ -497,147 +1230,105 @@ class Analyzer:
         """
         # Set default batch size and prepare paths
         if batch_size is None:
-            batch_size = self.n_jobs
+            batch_size = self.n_jobs * 2
 
-        processed_dir, h5_path, csv_path = (
-            Path(processed_dir),
-            Path(h5_path),
-            Path(csv_path),
+        h5_path, csv_path = Path(h5_path), Path(csv_path)
+
+        # Find preprocessed WAV files, or take them from a catalog
+        processed_dir, processed_files, catalog = resolve_audio_files(
+            processed_dir, (".wav",)
         )
 
         # Create directories if needed
         h5_path.parent.mkdir(parents=True, exist_ok=True)
         csv_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Enforce uint8 for efficient storage
-        h5_np_dtype = np.uint8
-
-        # Initialize list for all units and futures
-        all_units_data = []
-        futures = {}
+        # Initialize list of tasks and counters
+        tasks, n_windows = [], {}
         total_skipped_segments = 0
         total_attempted_segments = 0
         total_segmented_files = 0
 
-        # Create HDF5 file and set up parallel processing tasks
-        with h5py.File(h5_path, "w", libver="latest") as hf:
-            # Create dataset
-            spec_dataset = hf.create_dataset(
-                "spectrograms",
-                shape=(0, *self.config["target_shape"]),
-                maxshape=(None, *self.config["target_shape"]),
-                dtype=h5_np_dtype,
-                chunks=(1, *self.config["target_shape"]),
+        # Pick up committed files, units, and rows of an interrupted run
+        checkpoint = self._open_checkpoint(
+            h5_path,
+            {
+                "simple": simple,
+                "presegment_csv": str(presegment_csv) if presegment_csv else None,
+            },
+            resume,
+        )
+
+        # If there is presegmented data
+        if presegment_csv:
+            print(f"\n--- Loading pre-segmented data from {presegment_csv} ---")
+            preseg_df = pd.read_csv(presegment_csv)
+
+            # Check required columns
+            required = ["source_file", "onset", "offset"]
+            if not all(col in preseg_df.columns for col in required):
+                raise ValueError(f"presegment_csv must contain columns: {required}")
+
+            # Group by source file
+            grouped = preseg_df.groupby("source_file")
+            pbar = tqdm(
+                total=len(grouped), desc="Generating pre-segmented spectrograms"
             )
 
-            # Start executor
-            with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
-                # If there is presegmented data
-                if presegment_csv:
-                    print(f"\n--- Loading pre-segmented data from {presegment_csv} ---")
-                    preseg_df = pd.read_csv(presegment_csv)
-
-                    # Check required columns
-                    required = ["source_file", "onset", "offset"]
-                    if not all(col in preseg_df.columns for col in required):
-                        raise ValueError(
-                            f"presegment_csv must contain columns: {required}"
+            # Iterate groups
+            for source_file, group_df in grouped:
+                full_path = processed_dir / source_file
+                name = full_path.relative_to(processed_dir).as_posix()
+                total_attempted_segments += len(group_df)
+                if name in checkpoint.files:
+                    pbar.update(1)
+                    continue
+
+                if full_path.exists():
+                    tasks.append(
+                        (
+                            name,
+                            _process_presegmented_file_worker,
+                            (full_path, group_df, None),
                         )
-
-                    # Group by source file
-                    grouped = preseg_df.groupby("source_file")
-                    pbar = tqdm(
-                        total=len(grouped), desc="Generating pre-segmented spectrograms"
                     )
-
-                    # Iterate groups
-                    for source_file, group_df in grouped:
-                        full_path = processed_dir / source_file
-                        total_attempted_segments += len(group_df)
-
-                        if full_path.exists():
-                            futures[
-                                executor.submit(
-                                    _process_presegmented_file_worker,
-                                    full_path,
-                                    group_df,
-                                    self.config,
-                                )
-                            ] = full_path
-                        else:
-                            print(
-                                f"Warning: Could not find file for pre-segmentation: {full_path}"
-                            )
-                            pbar.update(1)
-
-                # If there is no presegmented data
                 else:
-                    processed_files = list(processed_dir.rglob("*.wav"))
-                    method = (
-                        "simple (amplitude-based)"
-                        if simple
-                        else "pykanto (image-based)"
-                    )
                     print(
-                        f"\n--- Found {len(processed_files)} files to segment using {method} method ---"
-                    )
-                    total_segmented_files = len(processed_files)
-
-                    pbar = tqdm(
-                        total=len(processed_files),
-                        desc="Segmenting and saving spectrograms",
+                        f"Warning: Could not find file for pre-segmentation: {full_path}"
                     )
+                    pbar.update(1)
 
-                    # Iterate files
-                    for pf in processed_files:
-                        task = (pf, pf.relative_to(processed_dir), self.config, simple)
-                        futures[
-                            executor.submit(
-                                _process_file_for_segmentation_worker, *task
-                            )
-                        ] = pf
-
-                # Write output files
-                # Initialize statistics for dropped segments
-                total_dropped_stats = {
-                    "max_length": 0,
-                    "min_length": 0,
-                    "empty": 0,
-                    "no_units": 0,
-                }
+        # If there is no presegmented data
+        else:
+            method = "simple (amplitude-based)" if simple else "pykanto (image-based)"
+            print(
+                f"\n--- Found {len(processed_files)} files to segment using {method} method ---"
+            )
+            total_segmented_files = len(processed_files)
 
-                for future in as_completed(futures):
-                    try:
-                        metadata, specs, drops = future.result()
-
-                        # Accumulate drop statistics
-                        if drops:
-                            for k, v in drops.items():
-                                total_dropped_stats[k] = (
-                                    total_dropped_stats.get(k, 0) + v
-                                )
-
-                        if metadata:
-                            # Convert spectrograms to array and enforce scaling
-                            arr = np.array(specs, dtype=np.float32)
-                            arr = np.rint(np.clip(arr, 0.0, 1.0) * 255.0).astype(
-                                np.uint8
-                            )
-
-                            # Resize dataset and write data
-                            current_size = spec_dataset.shape[0]
-                            spec_dataset.resize(current_size + len(arr), axis=0)
-                            spec_dataset[current_size:] = arr
-
-                            # Update metadata with HDF5 index
-                            for i, meta_item in enumerate(metadata):
-                                meta_item["h5_index"] = current_size + i
-                            all_units_data.extend(metadata)
+            pbar = tqdm(
+                total=len(processed_files),
+                desc="Segmenting and saving spectrograms",
+            )
+            files = [(pf, pf.relative_to(processed_dir)) for pf in processed_files]
+            if checkpoint.files:
+                files = [
+                    (pf, relative_path)
+                    for pf, relative_path in files
+                    if relative_path.as_posix() not in checkpoint.files
+                ]
+                pbar.update(total_segmented_files - len(files))
+
+            # Split long files into windows, then start the longest tasks
+            # first so that none runs alone at the end
+            tasks, durations, n_windows = self._segmentation_tasks(
+                files, simple, catalog, h5_path.parent
+            )
+            tasks = longest_first(tasks, durations)
 
-                    except Exception as e:
-                        print(f"Error processing file {futures[future]}: {e}")
-                    pbar.update(1)
-                pbar.close()
+        all_units_data, total_dropped_stats, failed = self._write_units(
+            tasks, h5_path, checkpoint, batch_size, pbar, n_windows
+        )
 
         # If presegmented, calculate skipped segments
         if presegment_csv:
@@ -689,15 +1380,428 @@ class Analyzer:
                     print(
                         f"   - {unexplained} Segments ({pct:.1f}%) were dropped due to processing errors or other issues"
                     )
-        else:
-            # For internally segmented data, summarize files where no units
-            # were found. This replaces noisy per-file UserWarnings.
-            no_units_files = total_dropped_stats.get("no_units", 0)
-            if no_units_files > 0 and total_segmented_files > 0:
-                pct = (no_units_files / total_segmented_files) * 100
-                print(
-                    f"\nWarning: {no_units_files} files ({pct:.1f}%) had no units matching the segmentation criteria."
+
+        return self._save_units(
+            all_units_data,
+            total_dropped_stats,
+            len(failed),
+            total_segmented_files,
+            h5_path,
+            csv_path,
+            checkpoint,
+        )
+
+    # Open the checkpoint of a segmentation run
+    def _open_checkpoint(self, h5_path, mode, resume):
+        """
+        Open the checkpoint of a run writing units to 'h5_path'.
+
+        Parameters
+        ----------
+        h5_path : Path
+            Output HDF5 file or flat '.npy' store.
+        mode : dict
+            Settings besides the configuration that change the output of the
+            run; whether units are sharded is added to them.
+        resume : bool
+            Whether to continue from a checkpoint of an interrupted run.
+
+        Returns
+        -------
+        SegmentationCheckpoint
+            Checkpoint of the run, loaded if it resumes.
+        """
+        sharded = bool(self.config.get("spectrogram_shards", False))
+        if sharded and is_flat_store(h5_path):
+            raise ValueError(
+                "'spectrogram_shards' requires an HDF5 output, not a '.npy' store."
+            )
+        checkpoint_path = default_checkpoint_path(h5_path)
+        output = default_shard_dir(h5_path) if sharded else h5_path
+        checkpoint = SegmentationCheckpoint(
+            checkpoint_path,
+            self.config,
+            dict(mode, sharded=sharded),
+            resume=resume and output.exists(),
+        )
+        if checkpoint.resumed:
+            print(
+                f"\n--- Resuming from {checkpoint_path}: {len(checkpoint.files)} "
+                f"files and {checkpoint.n_units} units already committed ---"
+            )
+        return checkpoint
+
+    # Plan segmentation tasks, splitting long files into windows
+    def _segmentation_tasks(self, files, simple, catalog=None, scratch_dir=None):
+        """
+        Build the segmentation tasks of preprocessed files.
+
+        Files longer than 'split_seconds' are cut into windows (see
+        '_segmentation_windows'). Their maximum powers are found first, in
+        parallel, so that each window is converted to decibels relative to
+        the whole file, as when segmented in one piece. For pykanto
+        segmentation, their units are also found on the whole file first
+        (see '_pykanto_split_segments'), and windows only slice them.
+
+        Parameters
+        ----------
+        files : list of tuple
+            (processed_file, relative_path) pairs. 'relative_path' is the
+            units' source file, and its POSIX form keys the file's tasks.
+        simple : bool
+            Whether the simple segmentation method is used.
+        catalog : AudioCatalog, optional
+            Catalog to read the files' header metadata from.
+        scratch_dir : Path, optional
+            Directory for the temporary pykanto images of split files. The
+            default is the system's temporary directory.
+
+        Returns
+        -------
+        tuple of (list, list, dict)
+            (key, worker, args) tasks, their durations in seconds (None if
+            unknown), and the number of windows of each split file.
+        """
+        plans = {pf: self._segmentation_windows(pf, simple, catalog) for pf, _ in files}
+
+        # Split files are converted to decibels relative to the whole file
+        split_files = [pf for pf, windows in plans.items() if len(windows) > 1]
+        references = {}
+        if split_files:
+            with self._executor() as executor:
+                references = dict(
+                    zip(
+                        split_files,
+                        executor.map(
+                            _power_reference_worker,
+                            split_files,
+                            [None] * len(split_files),
+                            [simple] * len(split_files),
+                        ),
+                    )
                 )
+        segments = self._pykanto_split_segments(
+            {
+                pf: reference
+                for pf, reference in references.items()
+                if reference is not None and reference.equalization is not None
+            },
+            plans,
+            scratch_dir,
+        )
+
+        tasks, durations, n_windows = [], [], {}
+        for pf, relative_path in files:
+            key = relative_path.as_posix()
+            if len(plans[pf]) > 1:
+                n_windows[key] = len(plans[pf])
+            for window, seconds in plans[pf]:
+                if window is None:
+                    worker = _process_file_for_segmentation_worker
+                    args = (pf, relative_path, None, simple)
+                else:
+                    worker = _segment_window_worker
+                    args = (pf, relative_path, window, None, simple, references[pf])
+                    args += (segments.get(pf),)
+                tasks.append((key, worker, args))
+                durations.append(seconds)
+        return tasks, durations, n_windows
+
+    # Pykanto units of split files, found on their whole images
+    def _pykanto_split_segments(self, references, plans, scratch_dir=None):
+        """
+        Find the pykanto units of split files as whole-file segmentation
+        would.
+
+        Histogram equalization and the thresholds of 'find_units' depend on
+        the whole image, so each window computes only the dilated image of
+        its core, normalized and equalized with the file's statistics, into
+        a file-level image in a temporary directory. Units are then found
+        on each file's image in one task, and windows slice the ones in
+        their cores.
+
+        Parameters
+        ----------
+        references : dict
+            Statistics of each split file from '_power_reference_worker',
+            with an 'equalization'.
+        plans : dict
+            Windows of each file, from '_segmentation_windows'.
+        scratch_dir : Path, optional
+            Parent directory of the temporary images.
+
+        Returns
+        -------
+        dict
+            Units of each file whose image could be built, in seconds from
+            its start. Windows of the other files are segmented on their
+            own.
+        """
+        segments = {}
+        if not references:
+            return segments
+        print(f"--- Finding units of {len(references)} split files ---")
+        with tempfile.TemporaryDirectory(dir=scratch_dir) as tmp_dir:
+            images = {}
+            for i, (pf, reference) in enumerate(references.items()):
+                images[pf] = Path(tmp_dir) / f"image-{i}.npy"
+                np.lib.format.open_memmap(
+                    images[pf],
+                    mode="w+",
+                    dtype=np.uint8,
+                    shape=(reference.n_frames, self.config["n_mels"]),
+                )
+
+            with self._executor() as executor:
+                # Fill the images window by window
+                window_futures = [
+                    (
+                        pf,
+                        executor.submit(
+                            _pykanto_window_image_worker,
+                            pf,
+                            window,
+                            images[pf],
+                            None,
+                            references[pf],
+                        ),
+                    )
+                    for pf in images
+                    for window, _ in plans[pf]
+                ]
+                built = dict.fromkeys(images, True)
+                for pf, future in window_futures:
+                    try:
+                        built[pf] &= bool(future.result())
+                    except Exception as e:
+                        print(f"Error processing {pf}: {e}")
+                        built[pf] = False
+
+                # Find the units of each complete image
+                futures = {
+                    pf: executor.submit(
+                        _pykanto_image_segments_worker, images[pf], None, references[pf]
+                    )
+                    for pf, ok in built.items()
+                    if ok
+                }
+                for pf, future in futures.items():
+                    try:
+                        segments[pf] = future.result()
+                    except Exception as e:
+                        print(f"Error processing {pf}: {e}")
+        return segments
+
+    # Run unit-producing tasks and write their units as they complete
+    def _write_units(self, tasks, h5_path, checkpoint, batch_size, pbar, n_windows):
+        """
+        Run segmentation tasks on the pool and write their units to a store.
+
+        Each task is a (key, worker, args) triple. Its worker returns
+        (metadata_list, spectrograms_list, dropped_counts), optionally
+        followed by a success flag, for the file named by 'key', or a list
+        of such tuples when 'key' is a list of file names. Files are named
+        by their path relative to the processed directory. The windows of
+        split files, which return the onsets of their segments instead of a
+        flag, are stitched together once all of them are done.
+
+        Units are written to 'h5_path', or to per-worker shards joined into
+        a virtual dataset if 'spectrogram_shards' is set, and every
+        'checkpoint_seconds' the files written so far are committed to
+        'checkpoint'. A file with a failed task contributes no units and is
+        not committed, so that a resumed run retries all of it.
+
+        Parameters
+        ----------
+        tasks : iterable of tuple
+            (key, worker, args) triples, in submission order.
+        h5_path : Path
+            Output HDF5 file or flat '.npy' store.
+        checkpoint : SegmentationCheckpoint
+            Checkpoint of the run, whose committed units are kept.
+        batch_size : int
+            Maximum number of tasks in flight, and of results waiting for the
+            writer.
+        pbar : tqdm
+            Progress bar, advanced once per file and closed at the end.
+        n_windows : dict
+            Number of window tasks of each split file.
+
+        Returns
+        -------
+        tuple of (list, dict, set)
+            Metadata of all units (including committed ones), accumulated
+            drop statistics, and the names of files that failed.
+        """
+        sharded = bool(self.config.get("spectrogram_shards", False))
+        all_units_data = list(checkpoint.rows)
+        total_dropped_stats = {
+            "max_length": 0,
+            "min_length": 0,
+            "empty": 0,
+            "no_units": 0,
+        }
+        total_dropped_stats.update(checkpoint.dropped)
+
+        # Keep the committed units of an interrupted run
+        keep_units = shard_lengths = None
+        if checkpoint.resumed:
+            keep_units, shard_lengths = checkpoint.n_units, {}
+            for row in checkpoint.rows:
+                if "h5_shard" in row:
+                    shard_lengths[row["h5_shard"]] = max(
+                        shard_lengths.get(row["h5_shard"], 0), row["h5_shard_row"] + 1
+                    )
+
+        # Keep a bounded number of tasks in flight and hand results to a
+        # writer thread that appends them to the HDF5 file in large blocks;
+        # workers return uint8 units in shared memory, copied once by the
+        # writer. Sharded workers write their units themselves.
+        if sharded:
+            shard_dir = str(default_shard_dir(h5_path))
+            tasks = [
+                (key, _sharded_units_worker, (fn, shard_dir, *args))
+                for key, fn, args in tasks
+            ]
+            writer = ShardedStore(h5_path, self.config, shard_lengths)
+        else:
+            tasks = [
+                (key, _shared_units_worker, (fn, *args)) for key, fn, args in tasks
+            ]
+            writer = spectrogram_writer(
+                h5_path, self.config, max_queue=batch_size, keep_units=keep_units
+            )
+        timeline = TaskTimeline(self.n_jobs)
+        checkpoint_seconds = self.config.get("checkpoint_seconds", 60)
+        last_checkpoint = time.monotonic()
+        split_results = {}
+        new_files, n_committed_rows, failed = [], len(all_units_data), set()
+        with writer, self._executor() as executor:
+            for key, future in iter_completed(executor, tasks, batch_size, timeline):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Error processing {key}: {e}")
+                    result = None
+
+                # Tasks over a group of files return one result per file
+                if isinstance(key, list):
+                    outcomes = zip(key, result or [None] * len(key))
+                else:
+                    outcomes = [(key, result)]
+                for name, outcome in outcomes:
+                    if outcome is None:
+                        metadata, specs, drops, extra = [], [], {}, [None]
+                        failed.add(name)
+                    else:
+                        metadata, specs, drops, *extra = outcome
+
+                        # Windows return the onsets of the segments in their
+                        # cores (None if they failed), other tasks may
+                        # return a success flag
+                        if name in n_windows and extra[0] is None:
+                            failed.add(name)
+                        elif name not in n_windows and not all(extra):
+                            failed.add(name)
+
+                    # Stitch the windows of a split file once all are done
+                    if name in n_windows:
+                        if not sharded:
+                            specs = receive_units(specs)
+                        split_results.setdefault(name, []).append(
+                            (metadata, specs, drops, extra[0])
+                        )
+                        if len(split_results[name]) < n_windows[name]:
+                            continue
+                        metadata, specs, drops = _stitch_window_results(
+                            split_results.pop(name)
+                        )
+
+                    # A failed file contributes no units and is not committed
+                    if name in failed:
+                        metadata, drops = [], {}
+                    else:
+                        new_files.append(name)
+
+                    # Accumulate drop statistics
+                    for k, v in drops.items():
+                        total_dropped_stats[k] = total_dropped_stats.get(k, 0) + v
+
+                    if metadata and sharded:
+                        writer.record(metadata, specs)
+                        all_units_data.extend(metadata)
+                    elif metadata:
+                        self._append_units(writer, metadata, specs, all_units_data)
+                    pbar.update(1)
+
+                # Periodically make everything written so far resumable
+                if time.monotonic() - last_checkpoint >= checkpoint_seconds:
+                    writer.flush()
+                    checkpoint.commit(
+                        writer.n_units,
+                        new_files,
+                        all_units_data[n_committed_rows:],
+                        total_dropped_stats,
+                    )
+                    new_files, n_committed_rows = [], len(all_units_data)
+                    last_checkpoint = time.monotonic()
+            pbar.close()
+        writer_report = writer.report()
+
+        # Number sharded units by their rows in the virtual dataset
+        if sharded:
+            for meta_item in all_units_data:
+                meta_item["h5_index"] = writer.offsets[
+                    meta_item.pop("h5_shard")
+                ] + meta_item.pop("h5_shard_row")
+
+        print(f"--- {timeline.report()} ---")
+        print(f"--- {writer_report} ---")
+        return all_units_data, total_dropped_stats, failed
+
+    # Summarize a segmentation run and save its unit metadata
+    @staticmethod
+    def _save_units(
+        all_units_data, dropped, n_failed, n_files, h5_path, csv_path, checkpoint
+    ):
+        """
+        Report failed files and files without units, save the unit metadata
+        as a CSV file, and remove the run's checkpoint.
+
+        Parameters
+        ----------
+        all_units_data : list of dict
+            Metadata of all units.
+        dropped : dict
+            Accumulated drop statistics.
+        n_failed : int
+            Number of files that could not be processed.
+        n_files : int
+            Number of segmented files, for the share of files without units
+            (0 to skip that summary).
+        h5_path : Path
+            Output spectrogram store.
+        csv_path : Path
+            Output metadata CSV file.
+        checkpoint : SegmentationCheckpoint
+            Checkpoint of the run.
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame containing metadata for all units.
+        """
+        if n_failed > 0:
+            print(f"\nWarning: {n_failed} files could not be processed.")
+
+        # Summarize files where no units were found. This replaces noisy
+        # per-file UserWarnings.
+        no_units_files = dropped.get("no_units", 0)
+        if no_units_files > 0 and n_files > 0:
+            pct = (no_units_files / n_files) * 100
+            print(
+                f"\nWarning: {no_units_files} files ({pct:.1f}%) had no units matching the segmentation criteria."
+            )
 
         # Create and save final dataframe
         unit_df = pd.DataFrame(all_units_data)
@@ -706,11 +1810,367 @@ class Analyzer:
         )
 
         unit_df.to_csv(csv_path, index=False)
+        checkpoint.remove()
         print(f"Spectrograms saved to {h5_path}")
         print(f"Unit metadata saved to {csv_path}")
 
         return unit_df
 
+    # Append unit spectrograms to HDF5
+    @staticmethod
+    def _append_units(writer, metadata, specs, all_units_data):
+        """
+        Queue unit spectrograms for writing and record their HDF5 rows.
+
+        Parameters
+        ----------
+        writer : SpectrogramWriter
+            Writer of the spectrogram store.
+        metadata : list of dict
+            Metadata for each unit; 'h5_index' is added in place.
+        specs : list of np.ndarray, np.ndarray, or SharedUnits
+            Unit spectrograms as accepted by 'SpectrogramWriter.append'.
+        all_units_data : list
+            Accumulated metadata, extended with 'metadata'.
+        """
+        # Update metadata with HDF5 index
+        current_size = writer.append(specs)
+        for i, meta_item in enumerate(metadata):
+            meta_item["h5_index"] = current_size + i
+        all_units_data.extend(metadata)
+
+    # Preprocess, segment, and create spectrograms in one pass
+    def preprocess_and_segment(
+        self,
+        input_dir,
+        h5_path,
+        csv_path,
+        simple=False,
+        processed_dir=None,
+        batch_size=None,
+        files_per_task=1,
+        resume=False,
+    ):
+        """
+        Preprocess raw audio and segment it without re-reading intermediate WAVs.
+
+        This fused pipeline is equivalent to 'preprocess_directory' followed
+        by 'segment_and_create_spectrograms', but each worker hands its
+        preprocessed audio straight to spectrogram computation and
+        segmentation in memory. This removes a full write, read, and decode
+        pass over the corpus. Writing the preprocessed WAV files is optional.
+
+        Files longer than 'split_seconds' are the exception: they are
+        preprocessed to WAV first (in 'processed_dir', or in a temporary
+        directory next to 'h5_path' that is removed at the end) and then
+        segmented in windows on several workers, as in
+        'segment_and_create_spectrograms'. Units are sharded if
+        'spectrogram_shards' is set, and the run is checkpointed every
+        'checkpoint_seconds' so that it can be resumed in the same way.
+
+        Parameters
+        ----------
+        input_dir : str, Path, or AudioCatalog
+            Directory containing raw audio files in various formats, or its
+            catalog.
+        h5_path : str or Path
+            Path to the output HDF5 file for spectrograms, or to a flat
+            memory-mapped '.npy' store.
+        csv_path : str or Path
+            Path to the CSV file for unit metadata.
+        simple : bool, optional
+            If True, use simple amplitude-based segmentation. Default is False.
+        processed_dir : str or Path, optional
+            If given, also save the preprocessed WAV files here, mirroring
+            the structure of 'input_dir'. Default is None.
+        batch_size : int, optional
+            Maximum number of tasks submitted to the pool at once, as in
+            'preprocess_directory'. Default is 'n_jobs * 2'.
+        files_per_task : int, optional
+            Number of files handed to a worker in one task, as in
+            'preprocess_directory'. The default is 1.
+        resume : bool, optional
+            If True, continue an interrupted run from its checkpoint, if one
+            exists for the same preprocessing and segmentation settings.
+            Committed files are neither preprocessed nor segmented again.
+            Default is False.
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame containing metadata for all units. 'source_file' holds
+            the path of the preprocessed WAV relative to 'processed_dir', as
+            in 'segment_and_create_spectrograms'.
+        """
+        # Set default batch size and prepare paths
+        if batch_size is None:
+            batch_size = self.n_jobs * 2
+
+        h5_path, csv_path = Path(h5_path), Path(csv_path)
+        if processed_dir is not None:
+            processed_dir = Path(processed_dir)
+
+        # Create directories if needed
+        h5_path.parent.mkdir(parents=True, exist_ok=True)
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Find all audio files recursively, or take them from a catalog
+        input_dir, raw_files, catalog = resolve_audio_files(input_dir)
+        method = "simple (amplitude-based)" if simple else "pykanto (image-based)"
+        print(
+            f"--- Found {len(raw_files)} audio files to preprocess and segment using {method} method ---"
+        )
+
+        # Pick up committed files, units, and rows of an interrupted run
+        checkpoint = self._open_checkpoint(
+            h5_path,
+            {
+                "simple": simple,
+                "preprocess": config_hash(self.config, PREPROCESS_CONFIG_KEYS),
+            },
+            resume,
+        )
+
+        # Reuse one noise profile per recorder group, if configured
+        noise_profiles = self._noise_profiles(raw_files, input_dir, h5_path)
+
+        # Describe each file by its input, unit source name, optional output,
+        # and noise profile
+        jobs = []
+        for raw_file in raw_files:
+            relative_path = raw_file.relative_to(input_dir).with_suffix(".wav")
+            output_path = (
+                processed_dir / relative_path if processed_dir is not None else None
+            )
+            jobs.append(
+                (raw_file, relative_path, output_path, noise_profiles.get(raw_file))
+            )
+        n_files = len(jobs)
+        pbar = tqdm(total=n_files, desc="Preprocessing and segmenting")
+        if checkpoint.files:
+            jobs = [job for job in jobs if job[1].as_posix() not in checkpoint.files]
+            pbar.update(n_files - len(jobs))
+
+        # Files longer than 'split_seconds' are split after preprocessing
+        split_seconds = self.config.get("split_seconds")
+        durations = self._durations([job[0] for job in jobs], catalog)
+        seconds = {job[0]: d for job, d in zip(jobs, durations)}
+        is_long = [
+            bool(split_seconds) and d is not None and d > split_seconds
+            for d in durations
+        ]
+        split_jobs = [job for job, long in zip(jobs, is_long) if long]
+        jobs = [job for job, long in zip(jobs, is_long) if not long]
+
+        # Start the longest files first so that none runs alone at the end
+        jobs = longest_first(jobs, [seconds[job[0]] for job in jobs])
+        tasks, task_durations = [], []
+        for group in chunker(jobs, files_per_task):
+            tasks.append(
+                (
+                    [job[1].as_posix() for job in group],
+                    _preprocess_and_segment_worker,
+                    (group, None, simple),
+                )
+            )
+            group_seconds = [seconds[job[0]] for job in group]
+            task_durations.append(
+                None if None in group_seconds else float(sum(group_seconds))
+            )
+
+        scratch = (
+            tempfile.TemporaryDirectory(dir=h5_path.parent)
+            if split_jobs and processed_dir is None
+            else contextlib.nullcontext(processed_dir)
+        )
+        with scratch as split_dir:
+            # Preprocess the files to split, so that their windows can be
+            # read by several workers
+            prepared, n_unprepared, n_windows = [], 0, {}
+            if split_jobs:
+                print(
+                    f"--- Preprocessing {len(split_jobs)} files longer than "
+                    f"{split_seconds} s for split segmentation ---"
+                )
+                split_dir = Path(split_dir)
+                preprocess_tasks = [
+                    (
+                        job,
+                        _preprocess_files_worker,
+                        ([(job[0], split_dir / job[1], *job[3:])], None),
+                    )
+                    for job in split_jobs
+                ]
+                with self._executor() as executor:
+                    for job, future in iter_completed(
+                        executor, preprocess_tasks, batch_size
+                    ):
+                        try:
+                            ok = future.result()[0]
+                        except Exception as e:
+                            print(f"Error preprocessing {job[0]}: {e}")
+                            ok = False
+                        if ok:
+                            prepared.append((split_dir / job[1], job[1]))
+                        else:
+                            n_unprepared += 1
+                            pbar.update(1)
+
+                split_tasks, split_durations, n_windows = self._segmentation_tasks(
+                    prepared, simple, scratch_dir=h5_path.parent
+                )
+                tasks += split_tasks
+                task_durations += split_durations
+
+            # Stream worker results to a writer thread as they complete
+            all_units_data, total_dropped_stats, failed = self._write_units(
+                longest_first(tasks, task_durations),
+                h5_path,
+                checkpoint,
+                batch_size,
+                pbar,
+                n_windows,
+            )
+
+        if processed_dir is not None:
+            print(f"Standardized WAV audio saved to {processed_dir}")
+        return self._save_units(
+            all_units_data,
+            total_dropped_stats,
+            len(failed) + n_unprepared,
+            n_files,
+            h5_path,
+            csv_path,
+            checkpoint,
+        )
+
+    # Sweep segmentation parameters on a sample of files
+    def sweep_segmentation(
+        self,
+        processed_dir,
+        grid,
+        simple=False,
+        n_files=20,
+        seed=0,
+    ):
+        """
+        Evaluate a grid of segmentation parameters on a sample of files.
+
+        Each sampled file is decoded and its spectrogram computed once by a
+        worker, which then evaluates every setting with the intermediate
+        images cached: only the stages downstream of a changed parameter
+        are recomputed (see '_sweep_segmentation_worker'). Files are
+        processed in parallel, longest first. Nothing is written to disk.
+
+        Parameters
+        ----------
+        processed_dir : str, Path, or AudioCatalog
+            Directory containing preprocessed WAV files, or its catalog.
+        grid : dict or list of dict
+            Either a mapping from parameter name to a list of values, whose
+            Cartesian product is evaluated, or a list of settings. Names must
+            start with 'simple_' if 'simple' is True and 'pykanto_'
+            otherwise; parameters not in a setting keep their configured
+            values.
+        simple : bool, optional
+            If True, sweep simple amplitude-based segmentation. Default is
+            False.
+        n_files : int or None, optional
+            Number of files to sample. If None, every file is used. The
+            default is 20.
+        seed : int, optional
+            Seed of the file sample. The default is 0.
+
+        Returns
+        -------
+        pd.DataFrame or None
+            One row per setting, in grid order, with the parameter values,
+            'n_files', 'n_units', 'mean_units_per_file',
+            'files_without_units', 'median_duration', and the dropped segment
+            counts 'dropped_max_length', 'dropped_min_length', and
+            'dropped_empty'. The 'units_per_file' column holds the unit count
+            of each sampled file and 'durations' the durations in seconds of
+            all kept units, as arrays. None if no files are found.
+        """
+        # Expand the grid and check the parameter names
+        if isinstance(grid, dict):
+            names = list(grid)
+            settings = [
+                dict(zip(names, values))
+                for values in itertools.product(*(grid[name] for name in names))
+            ]
+        else:
+            settings = [dict(setting) for setting in grid]
+        prefix = "simple_" if simple else "pykanto_"
+        for name in {name for setting in settings for name in setting}:
+            if not name.startswith(prefix) or name not in self.config:
+                raise ValueError(
+                    f"Cannot sweep '{name}': expected a '{prefix}*' parameter"
+                )
+
+        # Find preprocessed WAV files, or take them from a catalog
+        processed_dir, files, catalog = resolve_audio_files(processed_dir, (".wav",))
+        if not files:
+            print(f"Error: No audio files found in {processed_dir}")
+            return None
+
+        # Draw a fixed sample of files
+        if n_files is not None and len(files) > n_files:
+            rng = np.random.default_rng(seed)
+            files = [
+                files[i] for i in sorted(rng.choice(len(files), n_files, replace=False))
+            ]
+
+        print(
+            f"--- Sweeping {len(settings)} segmentation settings on "
+            f"{len(files)} files ---"
+        )
+        tasks = [
+            (i, _sweep_segmentation_worker, (f, settings, simple, None))
+            for i, f in enumerate(files)
+        ]
+        tasks = longest_first(tasks, self._durations(files, catalog))
+        file_results = [None] * len(files)
+        with self._executor() as executor:
+            for i, future in tqdm(
+                iter_completed(executor, tasks, max_pending=2 * self.n_jobs),
+                total=len(files),
+                desc="Sweeping segmentation",
+            ):
+                try:
+                    file_results[i] = future.result()
+                except Exception as e:
+                    print(f"Error sweeping file {files[i]}: {e}")
+        file_results = [r for r in file_results if r is not None]
+
+        # Summarize each setting across files
+        rows = []
+        for j, setting in enumerate(settings):
+            per_file = [r[j] for r in file_results]
+            units = np.array([r["n_units"] for r in per_file], dtype=np.int64)
+            durations = np.concatenate(
+                [r["durations"] for r in per_file] + [np.zeros(0, dtype=np.float32)]
+            )
+            row = dict(setting)
+            row.update(
+                {
+                    "n_files": len(per_file),
+                    "n_units": int(units.sum()),
+                    "mean_units_per_file": units.mean() if len(units) else np.nan,
+                    "files_without_units": int((units == 0).sum()),
+                    "median_duration": (
+                        float(np.median(durations)) if len(durations) else np.nan
+                    ),
+                }
+            )
+            for reason in ("max_length", "min_length", "empty"):
+                row[f"dropped_{reason}"] = sum(r["dropped"][reason] for r in per_file)
+            row["units_per_file"] = units
+            row["durations"] = durations
+            rows.append(row)
+
+        return pd.DataFrame(rows)
+
     # Demo segmentation
     def demo_segmentation(self, input_dir, simple=False):
         """
@@ -722,34 +2182,17 @@ class Analyzer:
 
         Parameters
         ----------
-        input_dir : str or Path
-            Directory containing audio files to process.
+        input_dir : str, Path, or AudioCatalog
+            Directory containing audio files to process, or its catalog.
         simple : bool, optional
             If True, use simple amplitude-based segmentation. If False, use
             image-based segmentation (pykanto). The default is False.
         """
         # Apply the plot style from the configuration
         set_plot_style(SimpleNamespace(**self.config))
-        input_dir = Path(input_dir)
 
-        # Find all audio files in directory recursively
-        supported_formats = [
-            ".wav",
-            ".mp3",
-            ".flac",
-            ".ogg",
-            ".m4a",
-            ".WAV",
-            ".MP3",
-            ".FLAC",
-            ".OGG",
-            ".M4A",
-        ]
-        files = [
-            f
-            for f in input_dir.rglob("*")
-            if f.suffix.lower() in supported_formats and f.is_file()
-        ]
+        # Find all audio files in directory recursively, or in a catalog
+        input_dir, files, _ = resolve_audio_files(input_dir)
 
         # Check that files were found
         if not files:
@@ -764,8 +2207,10 @@ class Analyzer:
         clip_duration_sec = self.config.get("plot_clip_duration", 10.0)
 
         # Scan duration and find an active segment
+        backend = self.config.get("audio_backend", "auto")
         try:
-            y_scan, sr_scan = librosa.load(str(input_path), sr=None)
+            y_scan, sr_scan = load_audio(input_path, backend=backend)
+            y_scan = y_scan.mean(axis=0)
             total_duration = librosa.get_duration(y=y_scan, sr=sr_scan)
         except Exception as e:
             print(f"Error scanning file duration: {e}")
@@ -802,12 +2247,7 @@ class Analyzer:
         )
 
         # Load audio clip
-        y, sr = librosa.load(
-            str(input_path),
-            sr=self.config["sr"],
-            offset=start_offset,
-            duration=clip_duration_sec,
-        )
+        y, sr = self._load_clip(input_path, start_offset, clip_duration_sec)
 
         # Calculate spectrogram
         spec = compute_spectrogram(y, sr, self.config)
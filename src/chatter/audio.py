@@ -0,0 +1,409 @@
+"""
+chatter.audio
+=============
+
+Audio decoding and resampling backends.
+
+Files are decoded in-process with soundfile (libsndfile) whenever the format
+allows, and resampled with soxr. pydub, which starts an ffmpeg subprocess per
+file, is only used for containers libsndfile cannot read (e.g., M4A/AAC) or
+when explicitly requested.
+"""
+
+# Import necessary libraries
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import soundfile as sf
+from pydub import AudioSegment
+from pydub.utils import mediainfo
+from scipy.signal import resample_poly
+
+# Optional imports with fallbacks
+try:
+    import soxr
+
+    SOXR_AVAILABLE = True
+except ImportError:
+    SOXR_AVAILABLE = False
+
+# Containers that libsndfile cannot decode and are always read through pydub
+PYDUB_ONLY_FORMATS = (".m4a", ".mp4", ".aac", ".wma", ".webm")
+
+# Subtypes decoded to 32-bit integers (everything else fits in 16 bits)
+WIDE_SUBTYPES = ("PCM_24", "PCM_32", "FLOAT", "DOUBLE")
+
+# Subtypes libsndfile converts to integers exactly; for the others (floats
+# and lossy codecs) its integer conversion wraps around on overshoots
+INTEGER_SUBTYPES = ("PCM_S8", "PCM_U8", "PCM_16", "PCM_24", "PCM_32", "ULAW", "ALAW")
+
+# Containers in which libsndfile seeks to exact frames
+SEEKABLE_FORMATS = ("WAV", "WAVEX", "W64", "RF64", "AIFF", "CAF", "FLAC")
+
+# Valid backend names
+AUDIO_BACKENDS = ("auto", "soundfile", "pydub")
+
+
+# Choose the decoder for a file
+def _use_soundfile(path, backend):
+    """
+    Decide whether 'path' should be decoded with soundfile.
+    """
+    if backend not in AUDIO_BACKENDS:
+        raise ValueError(f"Unknown audio backend '{backend}'; use {AUDIO_BACKENDS}")
+    if backend == "pydub":
+        return False
+    return backend == "soundfile" or Path(path).suffix.lower() not in PYDUB_ONLY_FORMATS
+
+
+# Convert AudioSegment to float array
+def _audiosegment_to_float(audio):
+    """
+    Convert a pydub AudioSegment to a float32 array in the [-1, 1] range.
+
+    Parameters
+    ----------
+    audio : pydub.AudioSegment
+        Decoded audio segment.
+
+    Returns
+    -------
+    np.ndarray
+        Float32 array with shape (channels, n_samples).
+    """
+    arr = np.array(audio.get_array_of_samples(), dtype=np.float32)
+    arr /= float(audio.max_possible_amplitude)
+    return arr.reshape(-1, audio.channels).T
+
+
+# Read file header
+def audio_info(path, backend="auto"):
+    """
+    Read the duration, sample rate, and channel count from a file header.
+
+    Parameters
+    ----------
+    path : str or Path
+        Audio file.
+    backend : {"auto", "soundfile", "pydub"}, optional
+        Decoder to use. "auto" reads the header with soundfile and falls
+        back to ffprobe (through pydub) for unsupported formats. The default
+        is "auto".
+
+    Returns
+    -------
+    types.SimpleNamespace
+        Object with 'duration' (seconds), 'samplerate', 'channels', and
+        'frames' attributes.
+    """
+    if _use_soundfile(path, backend):
+        # soundfile raises a RuntimeError subclass for unsupported formats
+        try:
+            info = sf.info(str(path))
+            return SimpleNamespace(
+                duration=info.duration,
+                samplerate=info.samplerate,
+                channels=info.channels,
+                frames=info.frames,
+            )
+        except RuntimeError:
+            if backend == "soundfile":
+                raise
+
+    info = mediainfo(str(path))
+    samplerate = int(info["sample_rate"])
+    duration = float(info["duration"])
+    return SimpleNamespace(
+        duration=duration,
+        samplerate=samplerate,
+        channels=int(info["channels"]),
+        frames=int(round(duration * samplerate)),
+    )
+
+
+# Resample with soxr
+def resample(y, orig_sr, target_sr, quality="HQ"):
+    """
+    Resample audio along its last axis with soxr.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Audio with shape (n_samples,) or (channels, n_samples).
+    orig_sr : int
+        Sample rate of 'y' in Hz.
+    target_sr : int
+        Desired sample rate in Hz.
+    quality : str, optional
+        soxr quality recipe ("QQ", "LQ", "MQ", "HQ", or "VHQ"). The default
+        is "HQ", which matches librosa's default 'soxr_hq'.
+
+    Returns
+    -------
+    np.ndarray
+        Resampled float32 audio with the same number of dimensions as 'y'.
+        Its length is round(n_samples * target_sr / orig_sr).
+    """
+    y = np.asarray(y, dtype=np.float32)
+    if orig_sr == target_sr:
+        return y
+
+    if SOXR_AVAILABLE:
+        # soxr expects (frames, channels)
+        return soxr.resample(y.T, orig_sr, target_sr, quality=quality).T
+
+    # Polyphase fallback when soxr is not installed
+    g = np.gcd(int(orig_sr), int(target_sr))
+    out = resample_poly(y, int(target_sr) // g, int(orig_sr) // g, axis=-1)
+    return out.astype(np.float32, copy=False)
+
+
+# Create a streaming soxr resampler
+def resample_stream(orig_sr, target_sr, quality="HQ"):
+    """
+    Create a soxr resampler for mono float32 audio processed in blocks.
+
+    Feeding consecutive blocks to 'resample_chunk' (with last=True for the
+    final block) gives the same samples as 'resample' on the whole signal.
+
+    Parameters
+    ----------
+    orig_sr : int
+        Input sample rate in Hz.
+    target_sr : int
+        Output sample rate in Hz.
+    quality : str, optional
+        soxr quality recipe. The default is "HQ".
+
+    Returns
+    -------
+    soxr.ResampleStream
+        Stateful resampler.
+    """
+    if not SOXR_AVAILABLE:
+        raise ImportError("soxr not available. Install it to use the soxr resampler.")
+    return soxr.ResampleStream(orig_sr, target_sr, 1, dtype="float32", quality=quality)
+
+
+# Decode to float array
+def load_audio(path, sr=None, backend="auto"):
+    """
+    Decode an audio file to a float32 array, optionally resampling it.
+
+    Parameters
+    ----------
+    path : str or Path
+        Audio file in any format supported by soundfile or pydub.
+    sr : int, optional
+        Target sample rate. If None, the native rate is kept. Resampling
+        uses soxr. The default is None.
+    backend : {"auto", "soundfile", "pydub"}, optional
+        Decoder to use. "auto" decodes in-process with soundfile and falls
+        back to pydub for formats libsndfile cannot read. The default is
+        "auto".
+
+    Returns
+    -------
+    tuple of (np.ndarray, int)
+        Float32 audio in the [-1, 1] range with shape (channels, n_samples),
+        and its sample rate.
+    """
+    y = None
+    if _use_soundfile(path, backend):
+        try:
+            data, native_sr = sf.read(str(path), dtype="float32", always_2d=True)
+            y = data.T
+        except RuntimeError:
+            if backend == "soundfile":
+                raise
+
+    if y is None:
+        audio = AudioSegment.from_file(path)
+        y, native_sr = _audiosegment_to_float(audio), audio.frame_rate
+
+    # Lossy decoders can overshoot full scale
+    np.clip(y, -1.0, 1.0, out=y)
+
+    if sr is not None and sr != native_sr:
+        return resample(y, native_sr, sr), sr
+    return y, native_sr
+
+
+# Read integer PCM frames the way 'load_audio_segment' stores them
+def _read_pcm(f, frames=-1):
+    """
+    Read frames from an open SoundFile as 16- or 32-bit integers.
+
+    Parameters
+    ----------
+    f : soundfile.SoundFile
+        Open file, positioned at the first frame to read.
+    frames : int, optional
+        Number of frames to read; -1 reads to the end. The default is -1.
+
+    Returns
+    -------
+    np.ndarray
+        Integer array of shape (frames, channels).
+    """
+    dtype = "int32" if f.subtype in WIDE_SUBTYPES else "int16"
+    if f.subtype in INTEGER_SUBTYPES:
+        data = f.read(frames, dtype=dtype, always_2d=True)
+
+        # pydub widens negative 24-bit samples with a low byte of 0xFF
+        if f.subtype == "PCM_24":
+            data[data < 0] |= 0xFF
+        return data
+
+    # Quantize with saturation, as ffmpeg does for pydub
+    info = np.iinfo(dtype)
+    data = f.read(frames, dtype="float64", always_2d=True)
+    data *= -float(info.min)
+    np.rint(data, out=data)
+    np.clip(data, info.min, info.max, out=data)
+    return data.astype(dtype)
+
+
+# Decode to AudioSegment
+def load_audio_segment(path, backend="auto"):
+    """
+    Decode an audio file into a pydub AudioSegment without ffmpeg if possible.
+
+    Parameters
+    ----------
+    path : str or Path
+        Audio file in any format supported by soundfile or pydub.
+    backend : {"auto", "soundfile", "pydub"}, optional
+        Decoder to use (see 'load_audio'). The default is "auto".
+
+    Returns
+    -------
+    pydub.AudioSegment
+        Decoded audio. Sources of up to 16 bits are returned with a sample
+        width of 2 bytes, higher resolution sources with 4 bytes.
+    """
+    if _use_soundfile(path, backend):
+        try:
+            with sf.SoundFile(str(path)) as f:
+                data = _read_pcm(f)
+                return AudioSegment(
+                    data.tobytes(),
+                    frame_rate=f.samplerate,
+                    sample_width=data.dtype.itemsize,
+                    channels=f.channels,
+                )
+        except RuntimeError:
+            if backend == "soundfile":
+                raise
+
+    return AudioSegment.from_file(path)
+
+
+# Open a file for reading clips without decoding all of it
+def open_seekable(path, backend="auto"):
+    """
+    Open a file for frame-accurate partial reads, if its format allows.
+
+    Parameters
+    ----------
+    path : str or Path
+        Audio file.
+    backend : {"auto", "soundfile", "pydub"}, optional
+        Decoder selection, as in 'load_audio'. The default is "auto".
+
+    Returns
+    -------
+    soundfile.SoundFile or None
+        Open file for WAV, FLAC, and similar containers (to be closed by the
+        caller), or None if the file must be decoded whole.
+    """
+    if not _use_soundfile(path, backend):
+        return None
+    try:
+        f = sf.SoundFile(str(path))
+    except RuntimeError:
+        if backend == "soundfile":
+            raise
+        return None
+    if f.format not in SEEKABLE_FORMATS or not f.seekable():
+        f.close()
+        return None
+    return f
+
+
+# Length in milliseconds as pydub reports it
+def segment_length_ms(f):
+    """
+    Return the length of an open file as 'len()' of its AudioSegment.
+
+    Parameters
+    ----------
+    f : soundfile.SoundFile
+        Open file.
+
+    Returns
+    -------
+    int
+        Duration in whole milliseconds.
+    """
+    return round(1000 * (f.frames / f.samplerate))
+
+
+# Read the frames of a pydub-style millisecond slice
+def read_segment_slice(f, start_ms, end_ms):
+    """
+    Read the samples 'load_audio_segment(path)[start_ms:end_ms]' would hold.
+
+    Only the requested frames are read. Frame positions follow pydub's
+    millisecond-to-frame conversion, and a slice reaching past the last
+    frame is padded with silence as pydub does.
+
+    Parameters
+    ----------
+    f : soundfile.SoundFile
+        File opened with 'open_seekable'.
+    start_ms, end_ms : int
+        Slice bounds in milliseconds.
+
+    Returns
+    -------
+    np.ndarray
+        Integer array of shape (frames, channels), 16- or 32-bit as in
+        'load_audio_segment'.
+    """
+    length_ms = segment_length_ms(f)
+    start = int(min(start_ms, length_ms) * (f.samplerate / 1000.0))
+    end = int(min(end_ms, length_ms) * (f.samplerate / 1000.0))
+
+    f.seek(min(start, f.frames))
+    data = _read_pcm(f, max(min(end, f.frames) - start, 0))
+    missing = max(end - start, 0) - len(data)
+    if missing > 0:
+        data = np.concatenate([data, np.zeros((missing, f.channels), data.dtype)])
+    return data
+
+
+# Write integer PCM to a WAV file
+def write_pcm_wav(path, data, sr):
+    """
+    Write integer samples as a PCM WAV file, as 'AudioSegment.export' does.
+
+    Parameters
+    ----------
+    path : str or Path
+        Destination file.
+    data : np.ndarray
+        16- or 32-bit integer array of shape (frames, channels).
+    sr : int
+        Sample rate in Hz.
+    """
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(data.shape[1])
+        out.setsampwidth(data.dtype.itemsize)
+        out.setframerate(sr)
+        out.setnframes(len(data))
+        out.writeframesraw(
+            np.ascontiguousarray(data, dtype=data.dtype.newbyteorder("<")).tobytes()
+        )
@@ -0,0 +1,377 @@
+"""
+chatter.catalog
+===============
+
+On-disk catalog of the audio files in a dataset.
+
+Listing a large corpus with repeated 'rglob' calls is slow on network file
+systems, and reading every header again on each run adds more. A catalog is
+built with one parallel 'os.scandir' walk, stores each file's size,
+modification time, and header metadata (duration, sample rate, channels,
+frames) in a compact HDF5 index, and on later runs only reads the headers
+of files that are new or have changed. Analyzer entry points accept a
+catalog wherever they accept a directory.
+"""
+
+# Import necessary libraries
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from types import SimpleNamespace
+
+import h5py
+import numpy as np
+
+from .audio import audio_info
+
+# Audio file extensions discovered by the Analyzer (matched case-insensitively)
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".ogg", ".m4a")
+
+# Column name and dtype of the index
+CATALOG_COLUMNS = {
+    "path": h5py.string_dtype(),
+    "size": np.int64,
+    "mtime_ns": np.int64,
+    "duration": np.float64,
+    "samplerate": np.int64,
+    "channels": np.int64,
+    "frames": np.int64,
+}
+
+
+# List one directory
+def _scan_directory(directory, extensions):
+    """
+    List the matching files and the subdirectories of one directory.
+    """
+    files, subdirs = [], []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    # Symlinked directories are not followed, as in 'rglob'
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif (
+                        os.path.splitext(entry.name)[1].lower() in extensions
+                        and entry.is_file()
+                    ):
+                        stat = entry.stat()
+                        files.append((entry.path, stat.st_size, stat.st_mtime_ns))
+                except OSError:
+                    continue
+    except OSError as e:
+        print(f"Warning: Could not list {directory}: {e}")
+    return files, subdirs
+
+
+# Walk a directory tree with concurrent scandir calls
+def scan_audio_files(root, extensions=AUDIO_EXTENSIONS, n_threads=16):
+    """
+    Find audio files under a directory with one parallel scandir walk.
+
+    Each directory is listed once in a thread pool, so the latency of
+    directory reads and stat calls on network file systems overlaps.
+
+    Parameters
+    ----------
+    root : str or Path
+        Directory to search recursively.
+    extensions : tuple of str, optional
+        Lowercase file extensions to keep, matched case-insensitively. The
+        default is 'AUDIO_EXTENSIONS'.
+    n_threads : int, optional
+        Number of directories listed concurrently. The default is 16.
+
+    Returns
+    -------
+    list of tuple
+        (path, size, mtime_ns) for every file found, sorted by path.
+    """
+    extensions = tuple(ext.lower() for ext in extensions)
+    found = []
+    with ThreadPoolExecutor(max_workers=max(int(n_threads), 1)) as pool:
+        pending = {pool.submit(_scan_directory, str(root), extensions)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                found.extend(files)
+                pending.update(
+                    pool.submit(_scan_directory, d, extensions) for d in subdirs
+                )
+
+    return sorted((Path(p), size, mtime) for p, size, mtime in found)
+
+
+# Read header metadata, tolerating unreadable files
+def _read_header(path):
+    """
+    Return (duration, samplerate, channels, frames) of a file, or NaN and
+    zeros if its header cannot be read.
+    """
+    try:
+        info = audio_info(path)
+        return info.duration, info.samplerate, info.channels, info.frames
+    except Exception:
+        return np.nan, 0, 0, 0
+
+
+class AudioCatalog:
+    """
+    Index of the audio files under a root directory and their header metadata.
+
+    Attributes
+    ----------
+    root : Path
+        Directory the catalog describes.
+    path : Path
+        Location of the HDF5 index.
+    files : list of Path
+        Absolute paths of the cataloged files, sorted.
+    """
+
+    # Load an existing index, if any
+    def __init__(self, root, path=None):
+        """
+        Open the catalog of a directory.
+
+        The index is read if it exists; call 'update' to create it or to
+        pick up changes on disk.
+
+        Parameters
+        ----------
+        root : str or Path
+            Directory to catalog.
+        path : str or Path, optional
+            Location of the HDF5 index. Defaults to '<root name>_catalog.h5'
+            next to 'root'.
+        """
+        self.root = Path(root)
+        self.path = Path(path) if path is not None else default_catalog_path(root)
+        self._columns = {
+            name: np.zeros(0, dtype=object if name == "path" else dtype)
+            for name, dtype in CATALOG_COLUMNS.items()
+        }
+
+        if self.path.exists():
+            with h5py.File(self.path, "r") as hf:
+                for name in CATALOG_COLUMNS:
+                    data = hf[name]
+                    self._columns[name] = (
+                        data.asstr()[:].astype(object) if name == "path" else data[:]
+                    )
+        self._index()
+
+    # Rebuild lookups after the columns change
+    def _index(self):
+        """
+        Rebuild the absolute file list and the path-to-row lookup.
+        """
+        self.files = [self.root / p for p in self._columns["path"]]
+        self._rows = {p: i for i, p in enumerate(self._columns["path"])}
+
+    # Build or incrementally refresh the index
+    @classmethod
+    def build(cls, root, path=None, n_threads=16):
+        """
+        Open a directory's catalog and update it from disk.
+
+        Parameters
+        ----------
+        root : str or Path
+            Directory to catalog.
+        path : str or Path, optional
+            Location of the HDF5 index, as in 'AudioCatalog'.
+        n_threads : int, optional
+            Number of concurrent directory listings and header reads. The
+            default is 16.
+
+        Returns
+        -------
+        AudioCatalog
+            The up-to-date catalog.
+        """
+        catalog = cls(root, path)
+        catalog.update(n_threads=n_threads)
+        return catalog
+
+    # Rescan the directory and read headers of new or changed files
+    def update(self, n_threads=16):
+        """
+        Rescan the root directory and save the refreshed index.
+
+        Files whose size and modification time match the index keep their
+        stored metadata; headers are only read, in a thread pool, for new
+        or changed files. Files no longer on disk are dropped.
+
+        Parameters
+        ----------
+        n_threads : int, optional
+            Number of concurrent directory listings and header reads. The
+            default is 16.
+
+        Returns
+        -------
+        tuple of int
+            Numbers of (new or changed, removed) files.
+        """
+        scanned = scan_audio_files(self.root, n_threads=n_threads)
+        n = len(scanned)
+        columns = {
+            name: np.zeros(n, dtype=object if name == "path" else dtype)
+            for name, dtype in CATALOG_COLUMNS.items()
+        }
+
+        # Reuse rows of unchanged files
+        stale = []
+        for i, (path, size, mtime_ns) in enumerate(scanned):
+            key = path.relative_to(self.root).as_posix()
+            columns["path"][i], columns["size"][i], columns["mtime_ns"][i] = (
+                key,
+                size,
+                mtime_ns,
+            )
+            row = self._rows.get(key)
+            if (
+                row is not None
+                and self._columns["size"][row] == size
+                and self._columns["mtime_ns"][row] == mtime_ns
+            ):
+                for name in ("duration", "samplerate", "channels", "frames"):
+                    columns[name][i] = self._columns[name][row]
+            else:
+                stale.append(i)
+
+        # Read the headers of new or changed files
+        with ThreadPoolExecutor(max_workers=max(int(n_threads), 1)) as pool:
+            headers = pool.map(_read_header, [scanned[i][0] for i in stale])
+            for i, header in zip(stale, headers):
+                for name, value in zip(
+                    ("duration", "samplerate", "channels", "frames"), header
+                ):
+                    columns[name][i] = value
+
+        n_removed = len(set(self._rows) - set(columns["path"]))
+        self._columns = columns
+        self._index()
+        self.save()
+        print(
+            f"--- Cataloged {n} audio files under {self.root} "
+            f"({len(stale)} new or changed, {n_removed} removed) ---"
+        )
+        return len(stale), n_removed
+
+    # Write the index atomically
+    def save(self):
+        """
+        Write the index, replacing any previous version atomically.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with h5py.File(tmp_path, "w") as hf:
+            hf.attrs["root"] = str(self.root)
+            for name, dtype in CATALOG_COLUMNS.items():
+                hf.create_dataset(
+                    name,
+                    data=self._columns[name],
+                    dtype=dtype,
+                    compression="lzf" if len(self) else None,
+                )
+        os.replace(tmp_path, self.path)
+
+    # Number of cataloged files
+    def __len__(self):
+        return len(self.files)
+
+    # Header metadata of one file
+    def info(self, path):
+        """
+        Return the stored header metadata of a cataloged file.
+
+        Parameters
+        ----------
+        path : str or Path
+            Absolute path of the file, or path relative to 'root'.
+
+        Returns
+        -------
+        types.SimpleNamespace or None
+            Object with 'duration', 'samplerate', 'channels', and 'frames'
+            attributes, as returned by 'audio_info', or None if the file is
+            not cataloged or its header could not be read.
+        """
+        path = Path(path)
+        if path.is_absolute():
+            path = path.relative_to(self.root)
+        row = self._rows.get(path.as_posix())
+        if row is None or not self._columns["samplerate"][row]:
+            return None
+        return SimpleNamespace(
+            duration=float(self._columns["duration"][row]),
+            samplerate=int(self._columns["samplerate"][row]),
+            channels=int(self._columns["channels"][row]),
+            frames=int(self._columns["frames"][row]),
+        )
+
+    # Restrict to some extensions
+    def with_suffix(self, *suffixes):
+        """
+        List the cataloged files with one of the given extensions.
+
+        Parameters
+        ----------
+        *suffixes : str
+            Lowercase extensions such as ".wav", matched case-insensitively.
+
+        Returns
+        -------
+        list of Path
+            Matching absolute paths, sorted.
+        """
+        return [f for f in self.files if f.suffix.lower() in suffixes]
+
+
+# Default index location next to a dataset
+def default_catalog_path(root):
+    """
+    Return the catalog index stored next to a dataset directory.
+
+    Parameters
+    ----------
+    root : str or Path
+        Dataset directory.
+
+    Returns
+    -------
+    Path
+        Sibling file '<root name>_catalog.h5'.
+    """
+    root = Path(root)
+    return root.parent / f"{root.name}_catalog.h5"
+
+
+# Resolve a directory or catalog into a file list
+def resolve_audio_files(source, extensions=AUDIO_EXTENSIONS):
+    """
+    List the audio files of a directory or catalog.
+
+    Parameters
+    ----------
+    source : str, Path, or AudioCatalog
+        Directory to scan, or a catalog whose index is used without
+        touching the file system.
+    extensions : tuple of str, optional
+        Lowercase file extensions to keep. The default is 'AUDIO_EXTENSIONS'.
+
+    Returns
+    -------
+    tuple
+        (root, files, catalog): the root directory, the sorted absolute
+        file paths, and the catalog (None for a directory).
+    """
+    if isinstance(source, AudioCatalog):
+        return source.root, source.with_suffix(*extensions), source
+    root = Path(source)
+    files = [path for path, _, _ in scan_audio_files(root, extensions)]
+    return root, files, None
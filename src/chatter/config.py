@@ -29,6 +29,13 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     "fmin": 1000,
     "fmax": 10000,
     "target_shape": (128, 128),
+    "spectrogram_chunks": None,  # HDF5 chunk: units per chunk or (units, H, W)
+    "spectrogram_compression": None,  # None, "gzip", "lzf", or "blosc" (LZ4)
+    "spectrogram_compression_level": None,  # gzip or Blosc level; None: default
+    "spectrogram_shuffle": None,  # None, "byte", or "bit" (Blosc only)
+    "shared_memory_transfer": True,  # Workers return uint8 units in /dev/shm
+    "spectrogram_shards": False,  # Workers write shards joined by a virtual dataset
+    "checkpoint_seconds": 60,  # Interval of resumable segmentation checkpoints
     # Preprocessing parameters
     "high_pass": None,
     "low_pass": None,
@@ -43,6 +50,24 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     "biodenoising_model": "biodenoising16k_dns48",
     "use_noisereduce": True,
     "noise_floor": None,
+    "preprocess_engine": "pydub",  # "pydub" or "numpy"
+    "audio_backend": "auto",  # "auto", "soundfile", or "pydub"
+    "resampler": "linear",  # NumPy engine: "linear" (pydub-compatible) or "soxr"
+    "stream_chunk_seconds": None,  # Stream files longer than 2 chunks (NumPy engine)
+    "stream_overlap_seconds": 2.0,
+    "biodenoising_batch_size": 8,  # Chunks per biodenoising forward pass
+    "biodenoising_chunk_seconds": 10,
+    "noise_profile_groups": None,  # None, "directory", or {relative path: group}
+    "noise_profile_seconds": 30,  # Quietest audio kept per group noise profile
+    "noise_profile_files": 8,  # Recordings sampled per group noise profile
+    "noise_profile_dir": None,  # Profile cache; defaults next to the output
+    "torch_num_threads": None,  # Overrides threads_per_job for torch if set
+    "threads_per_job": None,  # Set by Analyzer from its thread budget
+    "split_seconds": None,  # Segment files longer than this in parallel windows
+    "split_overlap_seconds": 1.0,  # Context on each side of a split window
+    "segment_tile_seconds": None,  # Run pykanto filters in threaded time tiles
+    "birdnet_batch_size": 64,  # BirdNET windows per interpreter invocation
+    "birdnet_min_confidence": 0.1,  # Floor for detections kept in the store
     # Simple segmentation parameters
     "simple_noise_floor": -60,
     "simple_silence_threshold_db": -40,
@@ -123,6 +148,14 @@ def make_config(user_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         for key, value in user_config.items():
             config[key] = value
 
+        # Streamed files always go through the NumPy engine
+        if config["stream_chunk_seconds"] and config["preprocess_engine"] != "numpy":
+            warnings.warn(
+                "Files streamed with 'stream_chunk_seconds' are preprocessed "
+                "with the NumPy engine regardless of 'preprocess_engine'",
+                UserWarning,
+            )
+
     return config
 
 
@@ -17,6 +17,7 @@ warnings.filterwarnings(
 
 # Reduce TensorFlow / TF Lite info logging (e.g., XNNPACK delegate messages)
 import os  # noqa: E402
+import itertools  # noqa: E402
 import logging  # noqa: E402
 
 os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")  # hide INFO and WARNING logs
@@ -26,36 +27,35 @@ logging.getLogger("absl").setLevel(logging.ERROR)
 # Import necessary libraries
 import numpy as np  # noqa: E402
 import torch  # noqa: E402
-import h5py  # noqa: E402
 import librosa  # noqa: E402
 import noisereduce  # noqa: E402
+import soundfile as sf  # noqa: E402
+import tempfile  # noqa: E402
+from functools import lru_cache  # noqa: E402
+from pathlib import Path  # noqa: E402
 from types import SimpleNamespace  # noqa: E402
 from scipy.io import wavfile  # noqa: E402
 from pydub import AudioSegment  # noqa: E402
 from torch.utils.data import Dataset  # noqa: E402
-from skimage.exposure import equalize_hist  # noqa: E402
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
+from scipy.ndimage import gaussian_filter  # noqa: E402
+from skimage.exposure import cumulative_distribution, equalize_hist  # noqa: E402
 from skimage.filters.rank import median  # noqa: E402
 from skimage.morphology import dilation, disk, erosion  # noqa: E402
 from skimage.util import img_as_ubyte  # noqa: E402
 from pykanto.signal.segment import find_units  # noqa: E402
 from pykanto.signal.filter import gaussian_blur, kernels, norm  # noqa: E402
 from pydub.scipy_effects import high_pass_filter, low_pass_filter  # noqa: E402
+from scipy.signal import butter, sosfilt  # noqa: E402
 
 # Optional imports with fallbacks
 try:
-    from birdnetlib import Recording  # noqa: E402
     from birdnetlib.analyzer import Analyzer as BirdNETAnalyzer  # noqa: E402
 
     BIRDNET_AVAILABLE = True
 except ImportError:
     BIRDNET_AVAILABLE = False
 
-    class Recording:  # noqa: E402
-        def __init__(self, *args, **kwargs):
-            raise ImportError(
-                "birdnetlib not available. Install it to use species detection features."
-            )
-
     class BirdNETAnalyzer:  # noqa: E402
         def __init__(self, *args, **kwargs):
             raise ImportError(
@@ -108,11 +108,46 @@ except ImportError:
 
 
 # Import local utility functions
+from .audio import (  # noqa: E402
+    load_audio,
+    load_audio_segment,
+    open_seekable,
+    read_segment_slice,
+    resample,
+    resample_stream,
+    segment_length_ms,
+    write_pcm_wav,
+)
+from .noise import (  # noqa: E402
+    reduce_noise_with_profile,
+    save_noise_profile,
+    select_noise_blocks,
+)
+from .parallel import limit_worker_threads  # noqa: E402
+from .runs import find_active_units  # noqa: E402
+from .storage import SpectrogramReader, append_to_shard, share_units  # noqa: E402
 from .utils import (  # noqa: E402
+    chunker,
     suppress_stdout_stderr,
-    normalize_spec,
-    pad_center_zero,
-    downsample_spectrogram,
+    downsample_spectrograms,
+)
+
+# Number of unit spectrograms resized per batched matrix product
+_RESIZE_CHUNK = 64
+
+# Parameters of the pykanto image stages, upstream first; the others only
+# affect 'find_units'
+_PYKANTO_IMAGE_PARAMS = ("pykanto_noise_floor", "pykanto_top_dB", "pykanto_gauss_sigma")
+
+# Time frames each pykanto morphology stage reads on either side of a pixel
+_PYKANTO_MORPH_MARGIN = sum(
+    footprint.shape[1] // 2
+    for footprint in (
+        disk(2),
+        kernels.erosion_kern,
+        kernels.dilation_kern,
+        kernels.erosion_kern,
+    )
 )
 
 # Global cache for biodenoising model to avoid reloading in workers
@@ -146,24 +181,182 @@ def _get_biodenoising_model(model_name):
     return _BIODENOISING_MODEL_CACHE[model_name]
 
 
-# PyTorch dataset for lazy loading of spectrograms from HDF5 file with worker-safe file handling
+# Global cache for the BirdNET analyzer to avoid reloading in workers
+_BIRDNET_ANALYZER_CACHE = {}
+
+# BirdNET input format: 3-second windows at 48 kHz, the last padded if at
+# least 1.5 seconds long
+BIRDNET_SAMPLE_RATE = 48000
+BIRDNET_WINDOW_SECONDS = 3.0
+BIRDNET_MIN_WINDOW_SECONDS = 1.5
+
+
+# Helper to load the BirdNET analyzer
+def _get_birdnet_analyzer():
+    """
+    Load and cache the BirdNET analyzer.
+    """
+    if "analyzer" not in _BIRDNET_ANALYZER_CACHE:
+        with suppress_stdout_stderr():
+            _BIRDNET_ANALYZER_CACHE["analyzer"] = BirdNETAnalyzer()
+    return _BIRDNET_ANALYZER_CACHE["analyzer"]
+
+
+# Helper to build (and cache) a mel filterbank
+@lru_cache(maxsize=8)
+def _get_mel_basis(sr, n_fft, n_mels, fmin, fmax):
+    """
+    Build and cache the mel filterbank used by 'compute_spectrogram'.
+    """
+    basis = librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels, fmin=fmin, fmax=fmax)
+    basis.flags.writeable = False
+    return basis
+
+
+# Cache the STFT analysis window per process
+@lru_cache(maxsize=8)
+def _get_stft_window(win_length):
+    """
+    Build and cache the Hann window 'librosa.stft' would construct.
+    """
+    window = librosa.filters.get_window("hann", win_length, fftbins=True)
+    window.flags.writeable = False
+    return window
+
+
+# Per-process state installed by the pool initializer
+_WORKER_STATE = {}
+
+
+# Initialize a persistent pool worker
+def _init_worker(config, threads_per_job=None):
+    """
+    Install per-process state in a persistent pool worker.
+
+    Called once when each worker process starts. Applies the thread budget,
+    stores the configuration so that tasks do not need to carry it, and
+    builds the mel filterbank and biodenoising model up front. The BirdNET
+    analyzer is loaded on first use and then kept for the lifetime of the
+    worker.
+
+    Parameters
+    ----------
+    config : dict
+        Configuration dictionary shared by all tasks run in this worker.
+    threads_per_job : int, optional
+        Thread limit for native libraries (see 'limit_worker_threads').
+    """
+    limit_worker_threads(threads_per_job)
+    _WORKER_STATE["config"] = config
+
+    # Build the filterbank for the configured spectrogram parameters
+    _get_mel_basis(
+        config["sr"], config["n_fft"], config["n_mels"], config["fmin"], config["fmax"]
+    )
+
+    # Load the denoising model once instead of on the first file
+    if config.get("use_biodenoising", False) and BIODENOISING_AVAILABLE:
+        _get_biodenoising_model(
+            config.get("biodenoising_model", "biodenoising16k_dns48")
+        )
+
+
+# Resolve the configuration for a task
+def _worker_config(config):
+    """
+    Return 'config', or the configuration installed by '_init_worker' if None.
+    """
+    if config is None:
+        return _WORKER_STATE["config"]
+    return config
+
+
+# Run a segmentation worker and return its units in shared memory
+def _shared_units_worker(worker, *args):
+    """
+    Call a spectrogram-producing worker in a pool process and move the unit
+    spectrograms of its result into shared memory with 'share_units'.
+
+    Parameters
+    ----------
+    worker : callable
+        Worker returning (metadata, spectrograms, dropped_counts, ...) or a
+        list of such tuples.
+    *args
+        Arguments of 'worker'.
+
+    Returns
+    -------
+    tuple or list of tuple
+        The worker result with each spectrogram list replaced by a
+        'SharedUnits' handle or a uint8 array.
+    """
+    config = _worker_config(None)
+    result = worker(*args)
+    if isinstance(result, list):
+        return [(m, share_units(s, config), *rest) for m, s, *rest in result]
+    metadata, specs, *rest = result
+    return (metadata, share_units(specs, config), *rest)
+
+
+# Run a segmentation worker and append its units to this process's shard
+def _sharded_units_worker(worker, shard_dir, *args):
+    """
+    Call a spectrogram-producing worker in a pool process and append the
+    unit spectrograms of its result to the process's shard file.
+
+    Parameters
+    ----------
+    worker : callable
+        Worker returning (metadata, spectrograms, dropped_counts, ...) or a
+        list of such tuples.
+    shard_dir : str or Path
+        Directory of the shard files, one per worker process.
+    *args
+        Arguments of 'worker'.
+
+    Returns
+    -------
+    tuple or list of tuple
+        The worker result with each spectrogram list replaced by the
+        (shard file name, row) of each unit.
+    """
+    config = _worker_config(None)
+    shard_path = Path(shard_dir) / f"shard-{os.getpid()}.h5"
+
+    def store(specs):
+        if not len(specs):
+            return []
+        start = append_to_shard(shard_path, specs, config)
+        return [(shard_path.name, start + i) for i in range(len(specs))]
+
+    result = worker(*args)
+    if isinstance(result, list):
+        return [(m, store(s), *rest) for m, s, *rest in result]
+    metadata, specs, *rest = result
+    return (metadata, store(specs), *rest)
+
+
+# PyTorch dataset for lazy loading of spectrograms from a store with worker-safe file handling
 class SpectrogramDataset(Dataset):
     """
-    PyTorch Dataset for lazy loading of spectrograms from an HDF5 file.
+    PyTorch Dataset for lazy loading of spectrograms from a spectrogram store.
 
     This dataset reads spectrograms on demand from an HDF5 dataset named
-    'spectrograms'. It is designed to work correctly with parallel DataLoader
-    workers by opening a separate file handle per worker process.
+    'spectrograms', or from a flat memory-mapped '.npy' store. It is designed
+    to work correctly with parallel DataLoader workers by opening a separate
+    reader per worker process; memory-mapped stores share one page cache
+    across workers.
 
     Attributes
     ----------
     h5_path : str
-        Path to the HDF5 file containing the spectrograms.
+        Path to the HDF5 file or '.npy' store containing the spectrograms.
     indices : list of int
         List of integer indices referring to the entries in the 'spectrograms'
         dataset.
-    _h5 : h5py.File or None
-        Lazily opened HDF5 file handle. It is not pickled across processes.
+    _store : SpectrogramReader or None
+        Lazily opened reader. It is not pickled across processes.
     """
 
     # Initialize dataset
@@ -174,7 +367,8 @@ class SpectrogramDataset(Dataset):
         Parameters
         ----------
         h5_path : str or Path
-            Path to the HDF5 file containing the 'spectrograms' dataset.
+            Path to the HDF5 file containing the 'spectrograms' dataset, or
+            to a flat '.npy' store.
         indices : list of int
             List of dataset indices that this instance will expose through
             __getitem__.
@@ -182,22 +376,23 @@ class SpectrogramDataset(Dataset):
         # Store path and indices for lazy loading
         self.h5_path = str(h5_path)
         self.indices = list(indices)
-        self._h5 = None
+        self._store = None
 
     # Lazy handle opener
     def _require_handle(self):
         """
-        Open the HDF5 file handle lazily for the current worker process.
+        Open the store lazily for the current worker process.
 
         Returns
         -------
-        h5py.File
-            Open HDF5 file handle in read-only mode with SWMR support enabled.
+        SpectrogramReader
+            Open reader (HDF5 files are opened read-only with SWMR support
+            enabled).
         """
-        # Open file lazily per worker process
-        if self._h5 is None:
-            self._h5 = h5py.File(self.h5_path, "r", libver="latest", swmr=True)
-        return self._h5
+        # Open store lazily per worker process
+        if self._store is None:
+            self._store = SpectrogramReader(self.h5_path)
+        return self._store
 
     # Get length
     def __len__(self):
@@ -214,7 +409,7 @@ class SpectrogramDataset(Dataset):
     # Get item by index
     def __getitem__(self, idx):
         """
-        Retrieve a single spectrogram from the HDF5 file.
+        Retrieve a single spectrogram from the store.
 
         Parameters
         ----------
@@ -228,122 +423,192 @@ class SpectrogramDataset(Dataset):
             dataset is stored as uint8, values are scaled to the [0, 1] range;
             otherwise, the data is returned as float32 without rescaling.
         """
-        # Open HDF5 file lazily per worker
-        hf = self._require_handle()
+        # Open store lazily per worker
+        store = self._require_handle()
 
         # Get actual index from subset list
         data_idx = self.indices[idx]
 
-        # Retrieve spectrogram from dataset
-        spec = hf["spectrograms"][data_idx]
+        # Retrieve spectrogram (a view for memory-mapped stores, converted
+        # without an intermediate copy)
+        spec = store[data_idx]
 
         # Convert to tensor and add channel dimension
+        tensor = torch.from_numpy(spec.astype(np.float32)).unsqueeze(0)
         if spec.dtype == np.uint8:
-            return torch.from_numpy(spec).unsqueeze(0).float() / 255.0
-        return torch.from_numpy(spec).unsqueeze(0).float()
+            return tensor / 255.0
+        return tensor
 
     # Prepare for pickling
     def __getstate__(self):
         """
-        Prepare the dataset for pickling without an open HDF5 file handle.
+        Prepare the dataset for pickling without an open reader.
 
         Returns
         -------
         dict
-            State dictionary for pickling, with the HDF5 file handle set to
-            None to avoid cross-process issues.
+            State dictionary for pickling, with the reader set to None to
+            avoid cross-process issues.
         """
-        # Ensure HDF5 handle is not pickled across processes
+        # Ensure file handles and memory maps are not pickled across processes
         state = self.__dict__.copy()
-        state["_h5"] = None
+        state["_store"] = None
         return state
 
 
 # Parallelized helpers
 
 
-# Worker to extract species clips
-def _extract_species_worker(args):
+# Cut a 48 kHz signal into BirdNET input windows
+def _birdnet_windows(y):
     """
-    Detect a target species in a single audio file and export clips.
+    Split mono audio at 'BIRDNET_SAMPLE_RATE' into BirdNET input windows.
 
-    This worker function is called by parallel processes. It analyzes an audio
-    file using BirdNET, filters for a target species above a confidence
-    threshold, combines adjacent detections, adds a buffer, and saves each
-    resulting interval as a new WAV file.
+    Mirrors birdnetlib's 'Recording' chunking: consecutive 3-second windows
+    without overlap, a final window zero-padded if it holds at least 1.5
+    seconds of audio, and shorter remainders dropped.
 
     Parameters
     ----------
-    args : tuple
-        A tuple containing the arguments: (input_path, input_dir, output_dir,
-        species, confidence_threshold, buffer_seconds).
+    y : np.ndarray
+        Mono float audio at 48 kHz.
 
     Returns
     -------
-    bool
-        True if processing completes successfully, False otherwise.
+    np.ndarray
+        Float32 array of shape (n_windows, 144000).
     """
-    # Unpack arguments
-    input_path, input_dir, output_dir, species, confidence_threshold, buffer_seconds = (
-        args
-    )
+    size = int(BIRDNET_WINDOW_SECONDS * BIRDNET_SAMPLE_RATE)
+    min_size = int(BIRDNET_MIN_WINDOW_SECONDS * BIRDNET_SAMPLE_RATE)
 
-    if not BIRDNET_AVAILABLE:
-        print(f"BirdNET not available, skipping species detection for {input_path}")
-        return False
+    n_windows = len(y) // size + (len(y) % size >= min_size)
+    windows = np.zeros((n_windows, size), dtype=np.float32)
+    for i in range(n_windows):
+        chunk = y[i * size : (i + 1) * size]
+        windows[i, : len(chunk)] = chunk
+    return windows
 
-    try:
-        # Load audio file to get duration and for slicing
-        audio = AudioSegment.from_file(input_path)
-        total_duration_s = len(audio) / 1000.0
 
-        # Analyze audio file with BirdNET
-        detections = []
-        with suppress_stdout_stderr():
-            analyzer = BirdNETAnalyzer()
-            recording = Recording(
-                analyzer=analyzer,
-                path=str(input_path),
-                min_conf=confidence_threshold,
-            )
-            recording.analyze()
-            detections = recording.detections
+# Run the BirdNET model on a batch of windows
+def _birdnet_predict(analyzer, windows):
+    """
+    Score a batch of windows with one BirdNET interpreter invocation.
 
-        # Filter for the target species
-        species_intervals = []
-        for d in detections:
-            if d["common_name"] == species:
-                species_intervals.append((d["start_time"], d["end_time"]))
+    birdnetlib invokes the TFLite interpreter once per window and resizes
+    its input tensor every time; here the tensor is only resized when the
+    batch size changes.
 
-        # Return early if no detections are found
-        if not species_intervals:
-            return True
+    Parameters
+    ----------
+    analyzer : birdnetlib.analyzer.Analyzer
+        Loaded BirdNET analyzer.
+    windows : np.ndarray
+        Float32 array of shape (batch, 144000).
 
-        # Sort intervals by start time to prepare for merging
-        species_intervals.sort(key=lambda x: x[0])
+    Returns
+    -------
+    np.ndarray
+        Sigmoid confidences of shape (batch, n_labels), as returned by
+        birdnetlib at the default sensitivity.
+    """
+    interpreter = analyzer.interpreter
+    shape = list(windows.shape)
+    if _BIRDNET_ANALYZER_CACHE.get("input_shape") != shape:
+        interpreter.resize_tensor_input(analyzer.input_layer_index, shape)
+        interpreter.allocate_tensors()
+        _BIRDNET_ANALYZER_CACHE["input_shape"] = shape
 
-        # Combine adjacent or overlapping intervals
-        combined_intervals = [species_intervals[0]]
-        for next_start, next_end in species_intervals[1:]:
-            last_start, last_end = combined_intervals[-1]
-            if next_start <= last_end:
-                combined_intervals[-1] = (last_start, max(last_end, next_end))
-            else:
-                combined_intervals.append((next_start, next_end))
+    interpreter.set_tensor(analyzer.input_layer_index, windows)
+    interpreter.invoke()
+    logits = np.array(interpreter.get_tensor(analyzer.output_layer_index))
+    return analyzer.flat_sigmoid(logits, sensitivity=-1.0)
+
+
+# Keep the detections above a confidence floor as table columns
+def _detection_columns(scores, min_confidence):
+    """
+    Convert window scores into columns of a sparse detection table.
+
+    Parameters
+    ----------
+    scores : np.ndarray
+        Confidences of shape (n_windows, n_labels) for one file.
+    min_confidence : float
+        Detections at or below this confidence are dropped.
+
+    Returns
+    -------
+    dict of np.ndarray
+        Columns 'start', 'end', 'label', and 'confidence', ordered by window.
+    """
+    windows, labels = np.nonzero(scores > min_confidence)
+    return {
+        "start": (windows * BIRDNET_WINDOW_SECONDS).astype(np.float32),
+        "end": ((windows + 1) * BIRDNET_WINDOW_SECONDS).astype(np.float32),
+        "label": labels.astype(np.int32),
+        "confidence": scores[windows, labels].astype(np.float32),
+    }
+
+
+# Export buffered species intervals from one file
+def _export_species_clips(
+    input_path, input_dir, output_dir, species, intervals, buffer_seconds, audio=None
+):
+    """
+    Merge detection intervals, add a buffer, and save each as a WAV clip.
+
+    Parameters
+    ----------
+    input_path : Path
+        Source audio file.
+    input_dir : Path
+        Root input directory, used to mirror the directory structure.
+    output_dir : Path
+        Root output directory.
+    species : str
+        Common name of the detected species, used in clip names.
+    intervals : list of tuple of float
+        (start_s, end_s) detection intervals.
+    buffer_seconds : float
+        Seconds added before and after each merged interval.
+    audio : pydub.AudioSegment or soundfile.SoundFile, optional
+        Decoded source audio or a file opened with 'open_seekable', to share
+        across several species. If None, the file is opened here.
+    """
+    # Seek into WAV and FLAC files instead of decoding them whole
+    source = audio if audio is not None else open_seekable(input_path)
+    if source is None:
+        source = load_audio_segment(input_path)
+    seekable = isinstance(source, sf.SoundFile)
+    total_ms = segment_length_ms(source) if seekable else len(source)
+    total_duration_s = total_ms / 1000.0
+
+    # Sort intervals by start time to prepare for merging
+    species_intervals = sorted(intervals, key=lambda x: x[0])
+
+    # Combine adjacent or overlapping intervals
+    combined_intervals = [species_intervals[0]]
+    for next_start, next_end in species_intervals[1:]:
+        last_start, last_end = combined_intervals[-1]
+        if next_start <= last_end:
+            combined_intervals[-1] = (last_start, max(last_end, next_end))
+        else:
+            combined_intervals.append((next_start, next_end))
 
-        # Add buffer to each combined interval
-        buffered_intervals = []
-        for start_s, end_s in combined_intervals:
-            buffered_start = max(0, start_s - buffer_seconds)
-            buffered_end = min(total_duration_s, end_s + buffer_seconds)
-            buffered_intervals.append((buffered_start, buffered_end))
+    # Add buffer to each combined interval
+    buffered_intervals = []
+    for start_s, end_s in combined_intervals:
+        buffered_start = max(0, start_s - buffer_seconds)
+        buffered_end = min(total_duration_s, end_s + buffer_seconds)
+        buffered_intervals.append((buffered_start, buffered_end))
 
-        # Create the relative output directory
-        relative_path = input_path.relative_to(input_dir)
-        clip_output_dir = output_dir / relative_path.parent
-        clip_output_dir.mkdir(parents=True, exist_ok=True)
+    # Create the relative output directory
+    relative_path = input_path.relative_to(input_dir)
+    clip_output_dir = output_dir / relative_path.parent
+    clip_output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Export each buffered interval as a new WAV file
+    # Export each buffered interval as a new WAV file
+    try:
         for i, (start_s, end_s) in enumerate(buffered_intervals):
             species_name_safe = species.replace(" ", "_")
             output_filename = f"{input_path.stem}_{species_name_safe}_{i + 1}_{start_s:.2f}s-{end_s:.2f}s.wav"
@@ -351,134 +616,369 @@ def _extract_species_worker(args):
 
             start_ms = int(start_s * 1000)
             end_ms = int(end_s * 1000)
-            clip = audio[start_ms:end_ms]
+            if seekable:
+                clip = read_segment_slice(source, start_ms, end_ms)
+                write_pcm_wav(output_path, clip, source.samplerate)
+            else:
+                source[start_ms:end_ms].export(output_path, format="wav")
+    finally:
+        if seekable and audio is None:
+            source.close()
 
-            clip.export(output_path, format="wav")
 
-        return True
+# Score several files with batched inference
+def _birdnet_scores(paths, config=None):
+    """
+    Score the BirdNET windows of a group of audio files.
 
-    except Exception as e:
-        print(f"Error processing {input_path}: {e}")
-        return False
+    The BirdNET analyzer is loaded once per worker process and reused. Each
+    file is decoded once, resampled to 48 kHz with soxr, and cut into
+    3-second windows; windows from all files in the group are scored in
+    batches of 'birdnet_batch_size' per interpreter invocation.
 
+    Parameters
+    ----------
+    paths : list of Path
+        Audio files to score.
+    config : dict, optional
+        Configuration dictionary. If None, the configuration installed by
+        the pool initializer is used.
 
-# Core logic for preprocessing a single audio segment
-def preprocess_audio_data(audio, config):
+    Returns
+    -------
+    list
+        Per-file confidences of shape (n_windows, n_labels), or None for
+        files that failed, in the order of 'paths'.
     """
-    Core preprocessing pipeline for a pydub AudioSegment.
+    if not BIRDNET_AVAILABLE:
+        for input_path in paths:
+            print(f"BirdNET not available, skipping species detection for {input_path}")
+        return [None] * len(paths)
+
+    config = _worker_config(config)
+    batch_size = max(int(config.get("birdnet_batch_size", 64)), 1)
+    decoded = [False] * len(paths)
+
+    # Decode each file and cut it into model windows
+    windows, owners = [], []
+    for idx, input_path in enumerate(paths):
+        try:
+            y, _ = load_audio(input_path, sr=BIRDNET_SAMPLE_RATE)
+            file_windows = _birdnet_windows(y.mean(axis=0))
+            windows.append(file_windows)
+            owners.append(np.full(len(file_windows), idx))
+            decoded[idx] = True
+        except Exception as e:
+            print(f"Error processing {input_path}: {e}")
+
+    # Score all windows in batches with one cached analyzer
+    try:
+        with suppress_stdout_stderr():
+            analyzer = _get_birdnet_analyzer()
+            windows = np.concatenate(windows) if windows else np.zeros((0, 1))
+            owners = np.concatenate(owners) if owners else np.zeros(0, dtype=int)
+            scores = [
+                _birdnet_predict(analyzer, windows[start : start + batch_size])
+                for start in range(0, len(windows), batch_size)
+            ]
+        n_labels = len(analyzer.labels)
+        scores = np.concatenate(scores) if scores else np.zeros((0, n_labels))
+    except Exception as e:
+        for idx, input_path in enumerate(paths):
+            if decoded[idx]:
+                print(f"Error processing {input_path}: {e}")
+        return [None] * len(paths)
 
-    This function applies the full preprocessing chain: fade in/out, format conversion,
-    filtering, amplitude normalization, noise reduction (noisereduce or biodenoising),
-    compression, limiting, and final normalization.
+    return [
+        scores[owners == idx] if decoded[idx] else None for idx in range(len(paths))
+    ]
+
+
+# Worker to detect species in several files
+def _detect_species_files_worker(paths, config=None, min_confidence=None):
+    """
+    Run BirdNET on a group of audio files and keep all confident detections.
 
     Parameters
     ----------
-    audio : pydub.AudioSegment
-        Input audio segment.
-    config : dict
-        Configuration dictionary containing preprocessing parameters.
+    paths : list of Path
+        Audio files to analyze.
+    config : dict, optional
+        Configuration dictionary. If None, the configuration installed by
+        the pool initializer is used.
+    min_confidence : float, optional
+        Detections at or below this confidence are dropped; pass the floor
+        of the store they are added to. If None, 'birdnet_min_confidence'
+        from the configuration is used.
 
     Returns
     -------
-    np.ndarray
-        Processed audio data as a 1D numpy array of type int16.
+    list
+        Per-file results in the order of 'paths': None if the file failed,
+        otherwise an (n_windows, columns) tuple where 'columns' holds the
+        detection table columns of '_detection_columns'.
     """
-    # Apply short fade-in and fade-out before any other processing
-    fade_ms = config.get("fade_ms", 20)
-    audio = audio.fade_in(fade_ms).fade_out(fade_ms)
-
-    # Standardize to mono and resample to target sample rate
-    audio = audio.set_channels(1)
-    audio = audio.set_frame_rate(config["sr"])
+    config = _worker_config(config)
+    if min_confidence is None:
+        min_confidence = config.get("birdnet_min_confidence", 0.1)
+    results = []
+    for scores in _birdnet_scores(paths, config):
+        if scores is None:
+            results.append(None)
+            continue
+        results.append((len(scores), _detection_columns(scores, min_confidence)))
+    return results
 
-    # Apply frequency filters if specified
-    if config.get("high_pass") is not None:
-        audio = high_pass_filter(audio, config["high_pass"], order=10)
-    if config.get("low_pass") is not None:
-        audio = low_pass_filter(audio, config["low_pass"], order=10)
 
-    # Normalize amplitude to target dBFS level
-    audio = audio.apply_gain(config["target_dbfs"] - audio.dBFS)
+# Worker to read the BirdNET label list
+def _birdnet_labels_worker(config=None):
+    """
+    Return the labels of the cached BirdNET analyzer.
 
-    # Convert pydub audio to NumPy array for processing
-    arr = np.array(audio.get_array_of_samples())
-    max_int = float(2 ** (8 * audio.sample_width - 1) - 1)
-    audio_float = arr.astype(np.float32) / max_int
+    Returns
+    -------
+    list of str or None
+        Labels as 'Scientific name_Common name', or None if BirdNET is not
+        available.
+    """
+    if not BIRDNET_AVAILABLE:
+        return None
+    with suppress_stdout_stderr():
+        return list(_get_birdnet_analyzer().labels)
 
-    # Sanitize samples and add dithering to prevent silence issues
-    audio_float = np.nan_to_num(audio_float)
-    audio_float += 1e-10 * np.random.normal(size=audio_float.shape)
 
-    # Apply biodenoising if enabled
-    if config.get("use_biodenoising", False):
-        # Load configured model (using cache)
-        model_name = config.get("biodenoising_model", "biodenoising16k_dns48")
-        model = _get_biodenoising_model(model_name)
+# Worker to export clips of several species from one file
+def _export_species_clips_worker(
+    input_path, input_dir, output_dir, species_intervals, buffer_seconds
+):
+    """
+    Export the clips of several species from one audio file.
 
-        # Prepare audio tensor (add channel dimension)
-        wav_tensor = torch.from_numpy(audio_float).unsqueeze(0)
+    Parameters
+    ----------
+    input_path : Path
+        Source audio file.
+    input_dir : Path
+        Root input directory, used to mirror the directory structure.
+    output_dir : Path
+        Root output directory.
+    species_intervals : dict
+        Mapping from common name to (start_s, end_s) detection intervals.
+    buffer_seconds : float
+        Seconds added before and after each merged interval.
 
-        # Convert audio to model sample rate
-        wav_model = convert_audio(
-            wav_tensor, config["sr"], model.sample_rate, model.chin
-        )
+    Returns
+    -------
+    bool
+        True if all clips were exported, False otherwise.
+    """
+    audio = None
+    try:
+        audio = open_seekable(input_path)
+        if audio is None:
+            audio = load_audio_segment(input_path)
+        for species, intervals in species_intervals.items():
+            _export_species_clips(
+                input_path,
+                input_dir,
+                output_dir,
+                species,
+                intervals,
+                buffer_seconds,
+                audio=audio,
+            )
+        return True
+    except Exception as e:
+        print(f"Error exporting clips from {input_path}: {e}")
+        return False
+    finally:
+        if isinstance(audio, sf.SoundFile):
+            audio.close()
 
-        # Set chunking parameters to avoid memory overload
-        chunk_seconds = 10
-        chunk_size = int(chunk_seconds * model.sample_rate)
-        num_frames = wav_model.shape[-1]
-        denoised_parts = []
 
-        # Process chunks using the model on CPU
-        with torch.no_grad():
-            for i in range(0, num_frames, chunk_size):
-                # Extract chunk
-                end = min(i + chunk_size, num_frames)
-                chunk = wav_model[:, i:end]
+# Run biodenoising on several signals with batched model inference
+def _biodenoise_batch(signals, config):
+    """
+    Denoise several mono signals with the biodenoising model in batches.
 
-                # Process chunk (add batch dimension, process, then move to CPU)
-                # Padding is not usually required for these UNet models on typical lengths
-                processed_chunk = model(chunk[None])[0]
-                denoised_parts.append(processed_chunk.cpu())
+    Each signal is converted to the model sample rate and split into chunks
+    of 'biodenoising_chunk_seconds'. Chunks of equal length, from the same
+    signal or from different signals, are stacked into batches of up to
+    'biodenoising_batch_size' and run through the model in one forward pass.
+    Each chunk is processed exactly as in a batch-size-1 loop, so the output
+    does not depend on how signals are grouped.
 
-        # Stitch chunks back together
-        denoised_tensor = torch.cat(denoised_parts, dim=-1)
+    Parameters
+    ----------
+    signals : list of np.ndarray
+        Mono float32 audio arrays at config['sr'].
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
 
-        # Resample back to original sample rate
+    Returns
+    -------
+    list of np.ndarray
+        Denoised mono float32 arrays at config['sr'], in input order.
+    """
+    # Load configured model (using cache)
+    model_name = config.get("biodenoising_model", "biodenoising16k_dns48")
+    model = _get_biodenoising_model(model_name)
+
+    # Set chunking parameters to avoid memory overload
+    chunk_size = int(config.get("biodenoising_chunk_seconds", 10) * model.sample_rate)
+    batch_size = max(int(config.get("biodenoising_batch_size", 8)), 1)
+
+    # Convert each signal to the model rate and group its chunks by length
+    groups = {}
+    n_chunks = []
+    for s_idx, audio_float in enumerate(signals):
+        wav_model = convert_audio(
+            torch.from_numpy(audio_float).unsqueeze(0),
+            config["sr"],
+            model.sample_rate,
+            model.chin,
+        )
+        starts = range(0, wav_model.shape[-1], chunk_size)
+        n_chunks.append(len(starts))
+        for c_idx, i in enumerate(starts):
+            chunk = wav_model[:, i : i + chunk_size]
+            groups.setdefault(chunk.shape[-1], []).append((s_idx, c_idx, chunk))
+
+    # Process stacked equal-length chunks on CPU
+    denoised = {}
+    with torch.no_grad():
+        for group in groups.values():
+            for batch in chunker(group, batch_size):
+                out = model(torch.stack([chunk for _, _, chunk in batch])).cpu()
+                for (s_idx, c_idx, _), processed in zip(batch, out):
+                    denoised[(s_idx, c_idx)] = processed
+
+    # Stitch chunks back together and resample to the original rate
+    results = []
+    for s_idx, audio_float in enumerate(signals):
+        if n_chunks[s_idx] == 0:
+            results.append(audio_float)
+            continue
+        denoised_tensor = torch.cat(
+            [denoised.pop((s_idx, c_idx)) for c_idx in range(n_chunks[s_idx])],
+            dim=-1,
+        )
         denoised_tensor = convert_audio(
             denoised_tensor, model.sample_rate, config["sr"], 1
         )
+        results.append(denoised_tensor.squeeze(0).numpy())
+
+    return results
+
+
+# Dither, then apply biodenoising and/or noisereduce to float32 signals
+def _denoise_audio_batch(signals, config, noise_profiles=None):
+    """
+    Apply the noise reduction stage shared by all preprocessing engines.
+
+    Biodenoising inference is batched across all signals; noisereduce runs
+    on each signal separately.
 
-        # Convert back to NumPy and remove channel dimension
-        audio_float = denoised_tensor.squeeze(0).numpy()
+    Parameters
+    ----------
+    signals : list of np.ndarray
+        Mono float32 audio arrays at config['sr'], gain-normalized to
+        'target_dbfs'.
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
+    noise_profiles : list of str or None, optional
+        Cached group noise profile for each signal (see 'chatter.noise').
+        With stationary noise reduction, signals that have a profile are
+        gated against it instead of their own statistics. The default is
+        None.
+
+    Returns
+    -------
+    list of np.ndarray
+        Denoised mono float32 arrays, in input order.
+    """
+    # Sanitize samples and add dithering to prevent silence issues
+    signals = [np.nan_to_num(audio_float) for audio_float in signals]
+    for audio_float in signals:
+        audio_float += 1e-10 * np.random.normal(size=audio_float.shape)
+
+    # Apply biodenoising if enabled
+    if config.get("use_biodenoising", False):
+        signals = _biodenoise_batch(signals, config)
 
     # Apply noisereduce if enabled
     if config.get("use_noisereduce", True):
-        audio_float = noisereduce.reduce_noise(
-            y=audio_float,
-            sr=config["sr"],
-            stationary=config["static"],
-            n_jobs=-1,
-            n_std_thresh_stationary=config["threshold"],
-            thresh_n_mult_nonstationary=config["threshold"],
-        )
+        if noise_profiles is None:
+            noise_profiles = [None] * len(signals)
+        n_jobs = config.get("threads_per_job") or -1
+        denoised = []
+        for audio_float, noise_profile in zip(signals, noise_profiles):
+            if noise_profile is not None and config["static"]:
+                denoised.append(
+                    reduce_noise_with_profile(
+                        audio_float,
+                        config["sr"],
+                        noise_profile,
+                        config["threshold"],
+                        n_jobs=n_jobs,
+                    )
+                )
+                continue
+            denoised.append(
+                noisereduce.reduce_noise(
+                    y=audio_float,
+                    sr=config["sr"],
+                    stationary=config["static"],
+                    n_jobs=n_jobs,
+                    n_std_thresh_stationary=config["threshold"],
+                    thresh_n_mult_nonstationary=config["threshold"],
+                )
+            )
+        signals = denoised
 
-    # Renormalize to the target dBFS (converting back to AudioSegment and then NumPy)
-    # Note: we reconvert to pydub here to leverage apply_gain easily; this maintains the existing flow
-    audio_int16 = (audio_float * (2**15 - 1)).astype(np.int16)
+    return signals
 
-    audio_seg = AudioSegment(
-        audio_int16.tobytes(), frame_rate=config["sr"], sample_width=2, channels=1
-    )
 
-    audio_seg = audio_seg.apply_gain(config["target_dbfs"] - audio_seg.dBFS)
-    arr = np.array(audio_seg.get_array_of_samples())
+# Dither, then apply biodenoising and/or noisereduce to a float32 signal
+def _denoise_audio_float(audio_float, config, noise_profile=None):
+    """
+    Apply the noise reduction stage shared by all preprocessing engines.
 
-    # Recalculate max int based on 16-bit sample width
-    max_int = float(2 ** (8 * audio_seg.sample_width - 1) - 1)
-    audio_final = arr.astype(np.float32) / max_int
-    audio_final = audio_final.reshape(1, -1)
+    Parameters
+    ----------
+    audio_float : np.ndarray
+        Mono float32 audio at config['sr'], gain-normalized to 'target_dbfs'.
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
+    noise_profile : str, optional
+        Cached group noise profile (see '_denoise_audio_batch').
+
+    Returns
+    -------
+    np.ndarray
+        Denoised mono float32 audio.
+    """
+    return _denoise_audio_batch([audio_float], config, [noise_profile])[0]
+
+
+# Apply compressor and limiter to a float32 signal
+def _apply_dynamics(audio_final, config):
+    """
+    Apply the compressor and peak limiter shared by all preprocessing engines.
+
+    Parameters
+    ----------
+    audio_final : np.ndarray
+        Mono float32 audio with shape (1, n_samples), renormalized to
+        'target_dbfs'.
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
 
+    Returns
+    -------
+    np.ndarray
+        Compressed and limited mono audio as a 1D float array.
+    """
     # Instantiate the compressor and limiter
     compressor = AudioCompressor(
         threshold=config["target_dbfs"] + config["compressor_amount"],
@@ -499,14 +999,36 @@ def preprocess_audio_data(audio, config):
     if AUDIO_COMPRESSION_AVAILABLE:
         audio_final = compressor.process(audio_final, sample_rate=config["sr"])
         audio_final = limiter.process(audio_final, sample_rate=config["sr"])
-        audio_final = audio_final.squeeze()
     else:
         print(
             "Warning: Audio compression/limiting not available. Install audiocomplib for better audio processing."
         )
+    return audio_final.squeeze()
 
+
+# Peak-normalize, apply the noise floor, and quantize to int16
+def _to_int16_output(audio_final, config, peak=None):
+    """
+    Convert compressed float audio to the final int16 output.
+
+    Parameters
+    ----------
+    audio_final : np.ndarray
+        Mono float audio after compression and limiting.
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
+    peak : float, optional
+        Peak absolute amplitude used for normalization. If None, the peak of
+        'audio_final' is used. Streaming callers pass the whole-file peak.
+
+    Returns
+    -------
+    np.ndarray
+        Processed audio data as a 1D numpy array of type int16.
+    """
     # Normalize the final signal and convert to 16-bit integer
-    peak = np.max(np.abs(audio_final))
+    if peak is None:
+        peak = np.max(np.abs(audio_final))
     if peak > 0:
         audio_final = audio_final / peak
 
@@ -530,10 +1052,746 @@ def preprocess_audio_data(audio, config):
     return audio_int16_final
 
 
-# Preprocess a single audio file with denoising, filtering, and normalization
-def _preprocess_wav_worker(input_path, output_path, config):
+# Compress, limit, peak-normalize, and quantize a float32 signal
+def _compress_and_finalize(audio_final, config):
     """
-    Denoise, standardize, and normalize a single audio file in memory.
+    Apply the dynamics and output stage shared by all preprocessing engines.
+
+    Parameters
+    ----------
+    audio_final : np.ndarray
+        Mono float32 audio with shape (1, n_samples), renormalized to
+        'target_dbfs'.
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
+
+    Returns
+    -------
+    np.ndarray
+        Processed audio data as a 1D numpy array of type int16.
+    """
+    return _to_int16_output(_apply_dynamics(audio_final, config), config)
+
+
+# Core logic for preprocessing a single audio segment
+def preprocess_audio_data(audio, config):
+    """
+    Core preprocessing pipeline for a pydub AudioSegment.
+
+    This function applies the full preprocessing chain: fade in/out, format conversion,
+    filtering, amplitude normalization, noise reduction (noisereduce or biodenoising),
+    compression, limiting, and final normalization.
+
+    Parameters
+    ----------
+    audio : pydub.AudioSegment
+        Input audio segment.
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
+
+    Returns
+    -------
+    np.ndarray
+        Processed audio data as a 1D numpy array of type int16.
+    """
+    audio_float = _prepare_audio_segment(audio, config)
+
+    # Apply biodenoising and/or noisereduce
+    audio_float = _denoise_audio_float(audio_float, config)
+
+    # Renormalize, compress, limit, and quantize
+    return _finish_audio_segment(audio_float, config)
+
+
+# Front half of the pydub engine: everything before noise reduction
+def _prepare_audio_segment(audio, config):
+    """
+    Fade, downmix, resample, filter, and gain-normalize an AudioSegment.
+
+    Parameters
+    ----------
+    audio : pydub.AudioSegment
+        Input audio segment.
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
+
+    Returns
+    -------
+    np.ndarray
+        Mono float32 audio at config['sr'], ready for noise reduction.
+    """
+    # Apply short fade-in and fade-out before any other processing
+    fade_ms = config.get("fade_ms", 20)
+    audio = audio.fade_in(fade_ms).fade_out(fade_ms)
+
+    # Standardize to mono and resample to target sample rate
+    audio = audio.set_channels(1)
+    audio = audio.set_frame_rate(config["sr"])
+
+    # Apply frequency filters if specified
+    if config.get("high_pass") is not None:
+        audio = high_pass_filter(audio, config["high_pass"], order=10)
+    if config.get("low_pass") is not None:
+        audio = low_pass_filter(audio, config["low_pass"], order=10)
+
+    # Normalize amplitude to target dBFS level
+    audio = audio.apply_gain(config["target_dbfs"] - audio.dBFS)
+
+    # Convert pydub audio to NumPy array for processing
+    arr = np.array(audio.get_array_of_samples())
+    max_int = float(2 ** (8 * audio.sample_width - 1) - 1)
+    return arr.astype(np.float32) / max_int
+
+
+# Back half of the pydub engine: everything after noise reduction
+def _finish_audio_segment(audio_float, config):
+    """
+    Renormalize denoised audio through pydub, then compress and quantize.
+
+    Parameters
+    ----------
+    audio_float : np.ndarray
+        Denoised mono float32 audio at config['sr'].
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
+
+    Returns
+    -------
+    np.ndarray
+        Processed audio data as a 1D numpy array of type int16.
+    """
+    # Renormalize to the target dBFS (converting back to AudioSegment and then NumPy)
+    # Note: we reconvert to pydub here to leverage apply_gain easily; this maintains the existing flow
+    audio_int16 = (audio_float * (2**15 - 1)).astype(np.int16)
+
+    audio_seg = AudioSegment(
+        audio_int16.tobytes(), frame_rate=config["sr"], sample_width=2, channels=1
+    )
+
+    audio_seg = audio_seg.apply_gain(config["target_dbfs"] - audio_seg.dBFS)
+    arr = np.array(audio_seg.get_array_of_samples())
+
+    # Recalculate max int based on 16-bit sample width
+    max_int = float(2 ** (8 * audio_seg.sample_width - 1) - 1)
+    audio_final = arr.astype(np.float32) / max_int
+    audio_final = audio_final.reshape(1, -1)
+
+    # Apply compression, limiting, peak normalization, and noise floor
+    return _compress_and_finalize(audio_final, config)
+
+
+# Frame indices and gains of one pydub linear fade
+def _fade_ramp(sr, start_ms, end_ms, from_power, to_power):
+    """
+    Compute the frames touched by 'AudioSegment.fade' and their gains.
+
+    Parameters
+    ----------
+    sr : int
+        Sample rate in Hz.
+    start_ms : int
+        Fade start in milliseconds.
+    end_ms : int
+        Fade end in milliseconds.
+    from_power : float
+        Linear gain at the start of the fade.
+    to_power : float
+        Linear gain at the end of the fade.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        Frame indices and the float64 gain applied to each of them.
+    """
+    frames_per_ms = sr / 1000.0
+    duration = end_ms - start_ms
+    gain_delta = to_power - from_power
+
+    if duration > 100:
+        # Coarse fading: one gain step per millisecond
+        bounds = (np.arange(start_ms, end_ms + 1) * frames_per_ms).astype(np.int64)
+        fade_idx = np.arange(bounds[0], bounds[-1])
+        fade_gain = np.repeat(
+            from_power + (gain_delta / duration) * np.arange(duration),
+            np.diff(bounds),
+        )
+    else:
+        # Precise fading: one gain step per sample
+        start_frame = start_ms * frames_per_ms
+        fade_frames = end_ms * frames_per_ms - start_frame
+        steps = np.arange(int(fade_frames))
+        fade_idx = (start_frame + steps).astype(np.int64)
+        fade_gain = from_power + (gain_delta / fade_frames) * steps
+
+    return fade_idx, fade_gain
+
+
+# Apply one pydub-compatible linear fade to a float array
+def _fade_array(y, sr, start_ms, end_ms, from_power, to_power):
+    """
+    Apply a linear fade to a float array following 'AudioSegment.fade'.
+
+    Frame positions, gain steps, and pydub's millisecond rounding of the
+    segment length are reproduced exactly, so the output has the same length
+    and gain curve as the pydub engine. When the fade lines up with whole
+    frames (the usual case), the array is modified in place.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Float audio with shape (channels, n_samples).
+    sr : int
+        Sample rate of 'y' in Hz.
+    start_ms : int
+        Fade start in milliseconds.
+    end_ms : int
+        Fade end in milliseconds.
+    from_power : float
+        Linear gain at the start of the fade (applied before it).
+    to_power : float
+        Linear gain at the end of the fade (applied after it).
+
+    Returns
+    -------
+    np.ndarray
+        Faded audio with shape (channels, n_out_samples).
+    """
+    n_frames = y.shape[-1]
+    frames_per_ms = sr / 1000.0
+    len_ms = round(1000 * (n_frames / sr))
+
+    # Frame ranges that pydub slices before and after the fade
+    before_end = int(min(start_ms, len_ms) * frames_per_ms)
+    after_start = int(min(end_ms, len_ms) * frames_per_ms)
+    after_end = int(len_ms * frames_per_ms)
+
+    # Frame indices and gains inside the fade
+    fade_idx, fade_gain = _fade_ramp(sr, start_ms, end_ms, from_power, to_power)
+    fade_gain = fade_gain.astype(y.dtype)
+
+    # Fast path: the fade tiles the array exactly, so scale in place
+    if (
+        after_end == n_frames
+        and fade_idx.size == after_start - before_end
+        and (fade_idx.size == 0 or fade_idx[0] == before_end)
+        and (fade_idx.size == 0 or fade_idx[-1] == after_start - 1)
+    ):
+        if from_power != 1.0:
+            y[:, :before_end] *= from_power
+        y[:, before_end:after_start] *= fade_gain
+        if to_power != 1.0:
+            y[:, after_start:] *= to_power
+        return y
+
+    # General path: concatenate slices like pydub, padding missing frames with zeros
+    def _slice(lo, hi):
+        part = y[:, lo:hi]
+        missing = max(hi - max(lo, n_frames), 0)
+        if missing:
+            part = np.pad(part, ((0, 0), (0, missing)))
+        return part
+
+    fade_gain = fade_gain[fade_idx < n_frames]
+    fade_idx = fade_idx[fade_idx < n_frames]
+    return np.concatenate(
+        [
+            _slice(0, before_end) * from_power,
+            y[:, fade_idx] * fade_gain,
+            _slice(after_start, after_end) * to_power,
+        ],
+        axis=1,
+    ).astype(y.dtype, copy=False)
+
+
+# Compute a range of linearly interpolated output samples
+def _resample_linear_block(y, offset, k_start, k_stop, in_rate, out_rate):
+    """
+    Compute output samples [k_start, k_stop) of the pydub-style resampler.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Mono float32 input samples, where y[0] is input sample 'offset'. It
+        must cover every input sample needed by the requested outputs.
+    offset : int
+        Absolute index of the first sample in 'y'.
+    k_start, k_stop : int
+        Range of absolute output sample indices to compute.
+    in_rate, out_rate : int
+        Input and output rates reduced by their greatest common divisor.
+
+    Returns
+    -------
+    np.ndarray
+        Float32 output samples.
+    """
+    k = np.arange(k_start, k_stop, dtype=np.int64)
+    # Index of the first input sample at or after the output position
+    j = (k * in_rate + out_rate - 1) // out_rate
+    w_prev = ((j * out_rate - k * in_rate) / out_rate).astype(np.float32)
+    prev = np.maximum(j - 1, offset) - offset
+    return y[prev] * w_prev + y[j - offset] * (1.0 - w_prev)
+
+
+# Linear-interpolation resampler matching audioop.ratecv used by pydub
+def _resample_linear(y, orig_sr, target_sr, block_size=2**20):
+    """
+    Resample a mono float signal with the interpolation used by pydub.
+
+    Output sample k is the linear interpolation of the input at position
+    k * orig_sr / target_sr, which is the arithmetic performed by
+    'audioop.ratecv' inside 'AudioSegment.set_frame_rate'. Work is done in
+    blocks to bound the size of temporary index arrays.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Mono float32 audio.
+    orig_sr : int
+        Input sample rate in Hz.
+    target_sr : int
+        Output sample rate in Hz.
+    block_size : int, optional
+        Number of output samples computed per block. The default is 2**20.
+
+    Returns
+    -------
+    np.ndarray
+        Resampled float32 audio.
+    """
+    if orig_sr == target_sr or y.size == 0:
+        return y
+
+    # Reduce the rate ratio exactly as ratecv does
+    g = np.gcd(int(orig_sr), int(target_sr))
+    in_rate, out_rate = int(orig_sr) // g, int(target_sr) // g
+    n_out = (y.size - 1) * out_rate // in_rate + 1
+    out = np.empty(n_out, dtype=np.float32)
+
+    for lo in range(0, n_out, block_size):
+        hi = min(lo + block_size, n_out)
+        out[lo:hi] = _resample_linear_block(y, 0, lo, hi, in_rate, out_rate)
+
+    return out
+
+
+# Gain in dB that brings a float signal to a target dBFS level
+def _gain_to_dbfs(y, target_dbfs):
+    """
+    Return the gain in dB that moves the RMS level of 'y' to 'target_dbfs'.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Float audio in the [-1, 1] full-scale range.
+    target_dbfs : float
+        Target RMS level in dBFS.
+
+    Returns
+    -------
+    float
+        Gain in decibels, or 0.0 if the signal is silent.
+    """
+    y = y.ravel()
+    return _gain_from_energy(
+        float(np.dot(y, y.astype(np.float64))), y.size, target_dbfs
+    )
+
+
+# Gain in dB from an accumulated sum of squares
+def _gain_from_energy(energy, n_samples, target_dbfs):
+    """
+    Return the gain in dB that moves a signal's RMS level to 'target_dbfs'.
+
+    Parameters
+    ----------
+    energy : float
+        Sum of squared samples of the signal.
+    n_samples : int
+        Number of samples the energy was accumulated over.
+    target_dbfs : float
+        Target RMS level in dBFS.
+
+    Returns
+    -------
+    float
+        Gain in decibels, or 0.0 if the signal is silent or empty.
+    """
+    if n_samples == 0 or energy <= 0:
+        return 0.0
+    return float(target_dbfs - 10 * np.log10(energy / n_samples))
+
+
+# Butterworth filters used by the preprocessing chain
+def _preprocess_filters(config):
+    """
+    Design the optional high-pass and low-pass filters of the chain.
+
+    The filters use the same design as 'pydub.scipy_effects' (order-10
+    Butterworth in second-order sections).
+
+    Parameters
+    ----------
+    config : dict
+        Configuration dictionary containing 'sr' and optionally 'high_pass'
+        and 'low_pass' cutoff frequencies in Hz.
+
+    Returns
+    -------
+    list of np.ndarray
+        Second-order-section coefficient arrays, in the order they are applied.
+    """
+    nyq = 0.5 * config["sr"]
+    filters = []
+    if config.get("high_pass") is not None:
+        filters.append(
+            butter(10, config["high_pass"] / nyq, btype="highpass", output="sos")
+        )
+    if config.get("low_pass") is not None:
+        filters.append(
+            butter(10, config["low_pass"] / nyq, btype="lowpass", output="sos")
+        )
+    return filters
+
+
+# Pure-NumPy float32 preprocessing engine
+def preprocess_audio_array(y, sr, config):
+    """
+    Core preprocessing pipeline for a float audio array.
+
+    This is the NumPy counterpart of 'preprocess_audio_data'. It applies the
+    same chain (fade in/out, downmix, resampling, Butterworth filtering, dBFS
+    gain, noise reduction, renormalization, compression, limiting, peak
+    normalization, and noise floor) on a single float32 array, without the
+    int16 re-encoding and AudioSegment round-trips of the pydub engine.
+
+    The output has the same length as 'preprocess_audio_data' and differs
+    only by the intermediate integer quantization that the pydub engine
+    performs: a few int16 steps going into the compressor, and an output RMS
+    difference below -60 dBFS (below -50 dBFS with noisereduce enabled).
+    Unlike the pydub engine, samples that exceed full scale after noise
+    reduction are clipped rather than wrapped around.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Input audio in the [-1, 1] full-scale range, either 1D (mono) or with
+        shape (channels, n_samples).
+    sr : int
+        Sample rate of 'y' in Hz.
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
+
+    Returns
+    -------
+    np.ndarray
+        Processed audio data as a 1D numpy array of type int16.
+    """
+    audio_float = _prepare_audio_array(y, sr, config)
+
+    # Apply biodenoising and/or noisereduce
+    audio_float = _denoise_audio_float(audio_float, config)
+
+    # Renormalize, compress, limit, and quantize
+    return _finish_audio_array(audio_float, config)
+
+
+# Front half of the NumPy engine: everything before noise reduction
+def _prepare_audio_array(y, sr, config):
+    """
+    Fade, downmix, resample, filter, and gain-normalize a float array.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Input audio in the [-1, 1] full-scale range, either 1D (mono) or with
+        shape (channels, n_samples).
+    sr : int
+        Sample rate of 'y' in Hz.
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
+
+    Returns
+    -------
+    np.ndarray
+        Mono float32 audio at config['sr'], ready for noise reduction.
+    """
+    # Work on a private float32 (channels, n_samples) array
+    y = np.array(y, dtype=np.float32, ndmin=2, copy=True)
+
+    # Apply short fade-in and fade-out before any other processing
+    fade_ms = config.get("fade_ms", 20)
+    if fade_ms:
+        floor_power = 10 ** (-120 / 20)
+        y = _fade_array(y, sr, 0, fade_ms, floor_power, 1.0)
+        len_ms = round(1000 * (y.shape[-1] / sr))
+        y = _fade_array(y, sr, len_ms - fade_ms, len_ms, 1.0, floor_power)
+
+    # Standardize to mono and resample to target sample rate
+    audio_float = y[0] if y.shape[0] == 1 else y.mean(axis=0, dtype=np.float32)
+    del y
+    if config.get("resampler", "linear") == "soxr":
+        audio_float = resample(audio_float, sr, config["sr"])
+    else:
+        audio_float = _resample_linear(audio_float, sr, config["sr"])
+
+    # Apply frequency filters if specified
+    for sos in _preprocess_filters(config):
+        audio_float = sosfilt(sos, audio_float).astype(np.float32, copy=False)
+
+    # Normalize amplitude to target dBFS level
+    audio_float *= np.float32(
+        10 ** (_gain_to_dbfs(audio_float, config["target_dbfs"]) / 20)
+    )
+    return audio_float
+
+
+# Back half of the NumPy engine: everything after noise reduction
+def _finish_audio_array(audio_float, config):
+    """
+    Renormalize denoised audio in float32, then compress and quantize.
+
+    Parameters
+    ----------
+    audio_float : np.ndarray
+        Denoised mono float audio at config['sr'].
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
+
+    Returns
+    -------
+    np.ndarray
+        Processed audio data as a 1D numpy array of type int16.
+    """
+    # Renormalize to the target dBFS without re-encoding
+    audio_float = np.asarray(audio_float, dtype=np.float32)
+    np.clip(audio_float, -1.0, 1.0, out=audio_float)
+    audio_float *= np.float32(
+        10 ** (_gain_to_dbfs(audio_float, config["target_dbfs"]) / 20)
+    )
+
+    # Apply compression, limiting, peak normalization, and noise floor
+    return _compress_and_finalize(audio_float.reshape(1, -1), config)
+
+
+# Bounded-memory preprocessing of a long file in overlapping chunks
+def preprocess_file_streaming(input_path, output_path, config, noise_profile=None):
+    """
+    Preprocess a long audio file in overlapping chunks with bounded memory.
+
+    This runs the NumPy engine ('preprocess_audio_array', whatever the
+    'preprocess_engine' setting) as a sequence of streaming passes over a
+    float32 scratch file stored next to the output, so that peak memory
+    depends on 'stream_chunk_seconds' rather than on the length of the
+    recording:
+
+    1. Decode in blocks, fade, downmix, resample, and filter (filter state
+       and resampler position are carried across blocks, so this pass is
+       exact for both the 'linear' and 'soxr' resamplers), accumulating the
+       signal energy.
+    2. Apply the dBFS gain and denoise overlapping chunks, joining them with
+       linear crossfades over 'stream_overlap_seconds'.
+    3. Renormalize and compress/limit in blocks, warming up the dynamics
+       with the preceding overlap so their envelopes are continuous.
+    4. Peak-normalize, apply the noise floor, and write int16 output
+       incrementally.
+
+    Without noise reduction the output matches the non-streaming NumPy
+    engine to within a few int16 steps (RMS difference below -90 dBFS).
+    Noise reduction estimates its statistics per chunk instead of per file,
+    so with denoising enabled the RMS difference is around -35 dBFS (about
+    -39 dBFS with 10 second chunks and 2 second overlaps on stationary
+    noise); longer chunks reduce it further. With a group noise profile,
+    every chunk is gated against the same statistics.
+
+    Parameters
+    ----------
+    input_path : Path or str
+        Path to an input file readable by soundfile (e.g., WAV or FLAC).
+    output_path : Path or str
+        Path at which to save the processed 16-bit WAV file.
+    config : dict
+        Configuration dictionary containing preprocessing parameters,
+        including 'stream_chunk_seconds' and 'stream_overlap_seconds'.
+    noise_profile : str, optional
+        Cached group noise profile used for stationary noise reduction (see
+        'chatter.noise'). The default is None.
+
+    Returns
+    -------
+    int
+        Number of samples written to 'output_path'.
+    """
+    sr = config["sr"]
+    chunk = int(config["stream_chunk_seconds"] * sr)
+    overlap = 2 * (int(config.get("stream_overlap_seconds", 2.0) * sr) // 2)
+    overlap = min(overlap, 2 * (chunk // 4))
+    half = overlap // 2
+    output_path = Path(output_path)
+    scratch_path = output_path.with_suffix(".stream.f32")
+
+    with sf.SoundFile(str(input_path)) as src:
+        sr_in, n_in = src.samplerate, src.frames
+
+        # Fading keeps whole milliseconds like pydub, trimming or padding the input
+        fade_ms = config.get("fade_ms", 20)
+        floor_power = 10 ** (-120 / 20)
+        len_ms = round(1000 * (n_in / sr_in))
+        n_src = int(len_ms * sr_in / 1000.0) if fade_ms else n_in
+
+        # Output length and rate ratio of the resampler
+        g = np.gcd(int(sr_in), int(sr))
+        in_rate, out_rate = int(sr_in) // g, int(sr) // g
+        use_soxr = config.get("resampler", "linear") == "soxr" and in_rate != out_rate
+        if use_soxr:
+            n_out = (2 * n_src * out_rate + in_rate) // (2 * in_rate)
+            stream = resample_stream(sr_in, sr)
+        else:
+            n_out = (n_src - 1) * out_rate // in_rate + 1 if n_src else 0
+        scratch = np.memmap(scratch_path, dtype=np.float32, mode="w+", shape=(n_out,))
+
+        try:
+            # Fade gains (fast-path layout of '_fade_array') by absolute frame index
+            if fade_ms:
+                head_idx, head_gain = _fade_ramp(sr_in, 0, fade_ms, floor_power, 1.0)
+                tail_idx, tail_gain = _fade_ramp(
+                    sr_in, len_ms - fade_ms, len_ms, 1.0, floor_power
+                )
+                tail_after = int(len_ms * sr_in / 1000.0)
+            filters = [
+                (sos, np.zeros((sos.shape[0], 2)))
+                for sos in _preprocess_filters(config)
+            ]
+
+            # Pass 1: decode, fade, downmix, resample, filter
+            energy = 0.0
+            pos, k_next = 0, 0
+            carry = np.zeros(1, dtype=np.float32)
+            block_frames = max(int(config["stream_chunk_seconds"] * sr_in), 1)
+            padding = np.zeros((max(n_src - n_in, 0), src.channels), np.float32)
+            blocks = src.blocks(blocksize=block_frames, dtype="float32", always_2d=True)
+            for block in itertools.chain(blocks, [padding]):
+                block = block[: n_src - pos]
+                if not block.size:
+                    break
+                mono = (
+                    block[:, 0]
+                    if block.shape[1] == 1
+                    else block.mean(axis=1, dtype=np.float32)
+                )
+                end = pos + mono.size
+
+                if fade_ms:
+                    for idx, gain in ((head_idx, head_gain), (tail_idx, tail_gain)):
+                        sel = (idx >= pos) & (idx < end)
+                        mono[idx[sel] - pos] *= gain[sel].astype(np.float32)
+                    if tail_after < end:
+                        mono[max(tail_after - pos, 0) :] *= floor_power
+
+                # Resample the outputs whose input neighbours are now available
+                if in_rate == out_rate:
+                    out = mono
+                elif use_soxr:
+                    out = stream.resample_chunk(mono, last=end >= n_src)
+                    out = out[: n_out - k_next]
+                else:
+                    k_stop = (end - 1) * out_rate // in_rate + 1
+                    buf = np.concatenate([carry, mono]) if pos else mono
+                    out = _resample_linear_block(
+                        buf, pos - 1 if pos else 0, k_next, k_stop, in_rate, out_rate
+                    )
+                    carry = mono[-1:]
+
+                # Filter with state carried across blocks
+                for i, (sos, zi) in enumerate(filters):
+                    out, zf = sosfilt(sos, out, zi=zi)
+                    filters[i] = (sos, zf)
+                out = out.astype(np.float32, copy=False)
+
+                scratch[k_next : k_next + out.size] = out
+                energy += float(np.dot(out.astype(np.float64), out))
+                k_next += out.size
+                pos = end
+
+            # Pass 2: gain to target dBFS and denoise overlapping chunks in place
+            gain = np.float32(
+                10 ** (_gain_from_energy(energy, n_out, config["target_dbfs"]) / 20)
+            )
+            energy = 0.0
+            pending = None
+            prev_tail = None
+            ramp = np.linspace(0.0, 1.0, overlap, endpoint=False, dtype=np.float32)
+            n_chunks = max(-(-n_out // chunk), 1)
+            for c in range(n_chunks):
+                start, stop = c * chunk, min((c + 1) * chunk, n_out)
+                lo, hi = max(start - overlap, 0), min(stop + overlap, n_out)
+                x = np.array(scratch[lo:hi]) * gain
+
+                # Flush the previous chunk now that this chunk's input is read
+                if pending is not None:
+                    p_lo, p_data = pending
+                    scratch[p_lo : p_lo + p_data.size] = p_data
+                    energy += float(np.dot(p_data.astype(np.float64), p_data))
+
+                d = np.asarray(
+                    _denoise_audio_float(x, config, noise_profile), dtype=np.float32
+                )
+                d = librosa.util.fix_length(d, size=x.size)
+                np.clip(d, -1.0, 1.0, out=d)
+
+                # Crossfade with the previous chunk around the boundary
+                out_lo = 0 if c == 0 else max(start - half, 0)
+                out_hi = n_out if c == n_chunks - 1 else stop - half
+                out_data = d[out_lo - lo : out_hi - lo].copy()
+                if prev_tail is not None:
+                    n_blend = min(prev_tail.size, out_data.size)
+                    r = ramp[:n_blend]
+                    out_data[:n_blend] = (
+                        prev_tail[:n_blend] * (1.0 - r) + out_data[:n_blend] * r
+                    )
+                prev_tail = d[stop - half - lo : min(stop + half, n_out) - lo].copy()
+                pending = (out_lo, out_data)
+
+            if pending is not None:
+                p_lo, p_data = pending
+                scratch[p_lo : p_lo + p_data.size] = p_data
+                energy += float(np.dot(p_data.astype(np.float64), p_data))
+
+            # Pass 3: renormalize, then compress and limit with a warm-up overlap
+            gain = np.float32(
+                10 ** (_gain_from_energy(energy, n_out, config["target_dbfs"]) / 20)
+            )
+            peak = 0.0
+            warm = np.zeros(0, dtype=np.float32)
+            for start in range(0, n_out, chunk):
+                stop = min(start + chunk, n_out)
+                x = np.array(scratch[start:stop]) * gain
+                y = _apply_dynamics(np.concatenate([warm, x]).reshape(1, -1), config)
+                y = np.atleast_1d(y)[warm.size :]
+                scratch[start:stop] = y
+                peak = max(peak, float(np.max(np.abs(y))))
+                warm = x[-overlap:] if overlap else warm
+
+            # Pass 4: peak-normalize, noise floor, and write int16 output
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with sf.SoundFile(
+                str(output_path), "w", samplerate=sr, channels=1, subtype="PCM_16"
+            ) as dst:
+                for start in range(0, n_out, chunk):
+                    block = np.array(scratch[start : start + chunk])
+                    dst.write(_to_int16_output(block, config, peak=peak))
+
+        finally:
+            del scratch
+            scratch_path.unlink(missing_ok=True)
+
+    return n_out
+
+
+# Preprocess a single audio file with denoising, filtering, and normalization
+def _preprocess_wav_worker(input_path, output_path, config):
+    """
+    Denoise, standardize, and normalize a single audio file in memory.
 
     This function is designed to be called from parallel worker processes. It
     loads an audio file, converts it to mono, resamples it to a target sampling
@@ -552,7 +1810,8 @@ def _preprocess_wav_worker(input_path, output_path, config):
         keys include 'sr' (int, target sample rate), 'target_dbfs' (float,
         target loudness in dBFS), 'static' (bool for stationary noise reduction),
         'threshold' (float for noise reduction), and optionally 'high_pass'
-        and 'low_pass' (cutoff frequencies in Hz).
+        and 'low_pass' (cutoff frequencies in Hz) and 'preprocess_engine'
+        ("pydub" or "numpy").
 
     Returns
     -------
@@ -560,27 +1819,221 @@ def _preprocess_wav_worker(input_path, output_path, config):
         True if preprocessing succeeds without raising an exception, and False
         otherwise.
     """
+    return _preprocess_files_worker([(input_path, output_path)], config)[0]
+
+
+# Preprocess several audio files, batching denoising inference across them
+def _preprocess_files_worker(jobs, config=None):
+    """
+    Denoise, standardize, and normalize a group of audio files in memory.
+
+    Each file goes through the same steps as '_preprocess_wav_worker', but
+    noise reduction runs once for the whole group so that biodenoising
+    chunks from different files share forward passes. Files long enough to
+    be streamed are processed individually in bounded memory.
+
+    Parameters
+    ----------
+    jobs : list of tuple
+        Sequence of (input_path, output_path) pairs, optionally extended
+        with the path of the file's group noise profile.
+    config : dict, optional
+        Configuration dictionary containing preprocessing parameters. If
+        None, the configuration installed by the pool initializer is used.
+
+    Returns
+    -------
+    list of bool
+        Per-file success flags, in the order of 'jobs'.
+    """
+    config = _worker_config(config)
+    return [result is not None for result in _preprocess_files(jobs, config)]
+
+
+# Shared preprocessing loop for file-based and fused workers
+def _preprocess_files(jobs, config, return_audio=False):
+    """
+    Preprocess a group of audio files with batched noise reduction.
+
+    Parameters
+    ----------
+    jobs : list of tuple
+        Sequence of (input_path, output_path) pairs, optionally extended
+        with a noise profile path. If 'output_path' is None, no WAV file is
+        written for that input.
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
+    return_audio : bool, optional
+        If True, return the processed int16 audio of each file instead of
+        a success marker. The default is False.
+
+    Returns
+    -------
+    list
+        One entry per job: None if the file failed, otherwise the int16
+        audio array (if 'return_audio') or True.
+    """
+    # Limit intra-op threads so that parallel workers do not oversubscribe cores
+    if config.get("torch_num_threads"):
+        torch.set_num_threads(int(config["torch_num_threads"]))
+
+    results = [None] * len(jobs)
+    pending = []
+    engine = config.get("preprocess_engine", "pydub")
+
+    # Load each file and run everything before noise reduction
+    for idx, job in enumerate(jobs):
+        input_path, output_path = job[:2]
+        noise_profile = job[2] if len(job) > 2 else None
+        try:
+            # Ensure output directory exists
+            if output_path is not None:
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Stream long files that soundfile can decode in bounded memory
+            chunk_seconds = config.get("stream_chunk_seconds")
+            if chunk_seconds:
+                try:
+                    info = sf.info(str(input_path))
+                except Exception:
+                    info = None
+                if info is not None and info.duration > 2 * chunk_seconds:
+                    results[idx] = _preprocess_streamed(
+                        input_path, output_path, config, return_audio, noise_profile
+                    )
+                    continue
+
+            pending.append((idx, _load_and_prepare(input_path, config), noise_profile))
+
+        except Exception as e:
+            print(f"Error preprocessing {input_path}: {e}")
+
+    if not pending:
+        return results
+
+    # Apply biodenoising and/or noisereduce to all loaded files at once
+    indices = [idx for idx, _, _ in pending]
     try:
-        # Ensure output directory exists
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        denoised = _denoise_audio_batch(
+            [audio for _, audio, _ in pending],
+            config,
+            [noise_profile for _, _, noise_profile in pending],
+        )
+    except Exception as e:
+        for idx in indices:
+            print(f"Error preprocessing {jobs[idx][0]}: {e}")
+        return results
+    del pending
+
+    # Finish each file and save it as a WAV file
+    finish = _finish_audio_array if engine == "numpy" else _finish_audio_segment
+    for idx, audio_float in zip(indices, denoised):
+        input_path, output_path = jobs[idx][:2]
+        try:
+            audio_int16 = finish(audio_float, config)
+            if output_path is not None:
+                wavfile.write(str(output_path), config["sr"], audio_int16)
+            results[idx] = audio_int16 if return_audio else True
+        except Exception as e:
+            print(f"Error preprocessing {input_path}: {e}")
+
+    return results
+
+
+# Decode a file and run the preprocessing steps before noise reduction
+def _load_and_prepare(input_path, config):
+    """
+    Decode an audio file and apply fades, downmix, resampling, filters, and
+    gain with the configured engine.
 
-        # Load audio file using pydub to handle multiple formats
-        audio = AudioSegment.from_file(input_path)
+    Parameters
+    ----------
+    input_path : Path
+        Audio file in any format supported by soundfile or pydub.
+    config : dict
+        Configuration dictionary containing preprocessing parameters.
+
+    Returns
+    -------
+    np.ndarray
+        Mono float32 audio at config['sr'], ready for noise reduction.
+    """
+    # Decode in-process where possible, falling back to pydub/ffmpeg
+    backend = config.get("audio_backend", "auto")
+    if config.get("preprocess_engine", "pydub") == "numpy":
+        y, sr = load_audio(input_path, backend=backend)
+        return _prepare_audio_array(y, sr, config)
+    audio = load_audio_segment(input_path, backend=backend)
+    return _prepare_audio_segment(audio, config)
 
-        # Process audio using the shared core logic
-        audio_int16 = preprocess_audio_data(audio, config)
 
-        # Save processed audio as WAV file
-        wavfile.write(str(output_path), config["sr"], audio_int16)
+# Estimate and cache the noise profile of one recorder group
+def _build_noise_profile_worker(input_paths, profile_path, config=None):
+    """
+    Build a group noise profile from a sample of its recordings.
 
-        # Return success
-        return True
+    Each file is prepared exactly as for preprocessing (including
+    biodenoising, if enabled), and the quietest one-second blocks across the
+    files are concatenated into a clip of 'noise_profile_seconds', which is
+    saved to 'profile_path'.
+
+    Parameters
+    ----------
+    input_paths : list of Path
+        Recordings of the group to estimate the profile from.
+    profile_path : Path
+        Destination '.npy' file.
+    config : dict, optional
+        Configuration dictionary containing preprocessing parameters. If
+        None, the configuration installed by the pool initializer is used.
 
+    Returns
+    -------
+    bool
+        True if the profile was written, False otherwise.
+    """
+    config = _worker_config(config)
+
+    signals = []
+    for input_path in input_paths:
+        try:
+            signals.append(_load_and_prepare(input_path, config))
+        except Exception as e:
+            print(f"Error reading {input_path} for noise profile: {e}")
+
+    try:
+        # Match the signal seen by noisereduce, so run any biodenoising first
+        signals = _denoise_audio_batch(signals, dict(config, use_noisereduce=False))
+        noise = select_noise_blocks(
+            signals, config["sr"], config.get("noise_profile_seconds", 30)
+        )
+        save_noise_profile(noise, profile_path)
+        return True
     except Exception as e:
-        print(f"Error preprocessing {input_path}: {e}")
+        print(f"Error building noise profile {profile_path}: {e}")
         return False
 
 
+# Stream one long file, optionally reading the result back into memory
+def _preprocess_streamed(input_path, output_path, config, return_audio, noise_profile):
+    """
+    Run 'preprocess_file_streaming' for a single job of '_preprocess_files'.
+
+    Without an output path the file is streamed into a temporary directory,
+    which is removed once the result has been read back.
+    """
+    if output_path is not None:
+        preprocess_file_streaming(input_path, output_path, config, noise_profile)
+        if not return_audio:
+            return True
+        return sf.read(str(output_path), dtype="int16")[0]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir) / "streamed.wav"
+        preprocess_file_streaming(input_path, tmp_path, config, noise_profile)
+        return sf.read(str(tmp_path), dtype="int16")[0]
+
+
 # Compute spectrogram from audio array
 def compute_spectrogram(y, sr, config):
     """
@@ -600,101 +2053,335 @@ def compute_spectrogram(y, sr, config):
     np.ndarray
         Mel spectrogram in decibel scale.
     """
-    mel_spec = librosa.feature.melspectrogram(
-        y=y,
-        sr=sr,
-        n_fft=config["n_fft"],
-        win_length=config["win_length"],
-        hop_length=config["hop_length"],
-        n_mels=config["n_mels"],
-        fmin=config["fmin"],
-        fmax=config["fmax"],
+    return librosa.power_to_db(_mel_power(y, sr, config), ref=np.max)
+
+
+# Compute the mel power spectrogram behind 'compute_spectrogram'
+def _mel_power(y, sr, config, center=True):
+    """
+    Compute a mel power spectrogram with cached window and filterbank.
+
+    Frames are centered on multiples of 'hop_length', so the spectrogram of
+    a suffix of 'y' starting at a whole frame is (away from its first
+    frames) a column slice of this one.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Audio time series.
+    sr : int
+        Sample rate.
+    config : dict
+        Configuration dictionary containing spectrogram parameters.
+    center : bool, optional
+        If False, frames start at multiples of 'hop_length' instead, without
+        zero padding at the ends. The default is True.
+
+    Returns
+    -------
+    np.ndarray
+        Mel power spectrogram with shape (n_mels, time_frames).
+    """
+    # Power spectrogram, as computed inside librosa.feature.melspectrogram
+    win_length = config["win_length"] or config["n_fft"]
+    power = (
+        np.abs(
+            librosa.stft(
+                y,
+                n_fft=config["n_fft"],
+                win_length=win_length,
+                hop_length=config["hop_length"],
+                window=_get_stft_window(win_length),
+                center=center,
+                pad_mode="constant",
+            )
+        )
+        ** 2
     )
-    return librosa.power_to_db(mel_spec, ref=np.max)
 
+    # Project onto the cached mel filterbank
+    mel_basis = _get_mel_basis(
+        sr, config["n_fft"], config["n_mels"], config["fmin"], config["fmax"]
+    )
+    return mel_basis @ power
 
-# Segment a mel spectrogram using pykanto image-based method
-def segment_file(mel_spectrogram, config):
+
+# Median filter and morphology stages of the pykanto pipeline
+def _pykanto_morphology(img_ubyte):
     """
-    Segment a full mel spectrogram using the high-fidelity pykanto workflow.
+    Apply the pykanto median filter, erosion, and dilations to a uint8 image.
+    """
+    img_med = median(img_ubyte, disk(2))
+    img_eroded = erosion(img_med, kernels.erosion_kern)
+    img_dilated = dilation(img_eroded, kernels.dilation_kern)
+    return dilation(img_dilated, kernels.erosion_kern)
+
+
+# Split a time axis into tiles padded with context frames
+def _time_tiles(n_frames, tile_frames, margin):
+    """
+    Return (start, stop, lo, hi) for each tile: the frames it produces and
+    the wider range it reads, clipped to the image.
+    """
+    return [
+        (start, min(start + tile_frames, n_frames))
+        + (max(start - margin, 0), min(start + tile_frames + margin, n_frames))
+        for start in range(0, n_frames, tile_frames)
+    ]
+
+
+# Time frames per tile of the pykanto image filters, if tiling applies
+def _pykanto_tile_frames(config, n_frames):
+    """
+    Return the tile length in frames from 'segment_tile_seconds', or None
+    if the filters should run on the whole image.
+    """
+    tile_seconds = config.get("segment_tile_seconds")
+    if not tile_seconds:
+        return None
+    tile_frames = max(int(round(tile_seconds * config["sr"] / config["hop_length"])), 1)
+    return tile_frames if tile_frames < n_frames else None
+
+
+# Decibel spectrogram raised to the pykanto noise floor
+def _pykanto_floored(mel_spectrogram, noise_floor):
+    """
+    Return a copy of 'mel_spectrogram' with values below 'noise_floor'
+    set to it.
+    """
+    spec_for_segmentation = np.copy(mel_spectrogram)
+    spec_for_segmentation[spec_for_segmentation < noise_floor] = noise_floor
+    return spec_for_segmentation
+
+
+# Histogram of a normalized pykanto image, summable over parts of it
+def _pykanto_histogram(img):
+    """
+    Return the counts and bin edges of 'img' in the 256 bins that
+    'skimage.exposure.histogram' uses for a float image spanning [0, 1],
+    as the normalized pykanto image does.
+    """
+    zero, one = img.dtype.type(0), img.dtype.type(1)
+    return np.histogram(img, bins=256, range=(zero, one))
 
-    This function applies an image-processing pipeline inspired by pykanto to
-    identify syllable-like acoustic units in a spectrogram. It uses histogram
-    equalization, median filtering, morphological operations, and Gaussian
-    blurring, followed by pykanto's 'find_units' to obtain onset and offset
-    times.
+
+# Equalization CDF from summed histogram counts
+def _histogram_cdf(counts, bin_edges):
+    """
+    Return (cdf, bin_centers) as 'skimage.exposure.cumulative_distribution'
+    computes them from the same histogram.
+    """
+    bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2.0
+    cdf = counts.cumsum()
+    return (cdf / float(cdf[-1])).astype(bin_edges.dtype), bin_centers
+
+
+# Noise floor, equalization, median filter, and morphology stages
+def _pykanto_dilated(mel_spectrogram, config, equalization=None):
+    """
+    Compute the dilated uint8 pykanto image of a mel spectrogram.
+
+    Depends only on 'pykanto_noise_floor' among the segmentation
+    parameters. If 'segment_tile_seconds' is set, the filters run on
+    overlapping time tiles in 'threads_per_job' threads; the histogram
+    equalization CDF is computed once over the whole image and tiles read
+    enough context for the filter footprints, so the result is identical.
 
     Parameters
     ----------
     mel_spectrogram : np.ndarray
-        Full mel spectrogram in decibel scale, with shape (n_mels, time_frames).
+        Mel spectrogram in decibel scale, with shape (n_mels, time_frames).
     config : dict
         Configuration dictionary containing segmentation parameters.
+    equalization : tuple, optional
+        (low, high, cdf, bin_centers) of a larger spectrogram that
+        'mel_spectrogram' is part of, as collected by
+        '_power_reference_worker': it is normalized from the range
+        (low, high) and equalized with that CDF, so that its columns match
+        those of the larger image. The default is None, for statistics of
+        'mel_spectrogram' itself.
 
     Returns
     -------
     np.ndarray
-        Array of segment boundaries with shape (n_segments, 2), where each row
-        contains the onset and offset times (in seconds or frames, depending
-        on pykanto configuration). If no units are found or an error occurs,
-        an empty array with shape (0,) is returned.
+        uint8 image with the same shape as 'mel_spectrogram'.
     """
-    try:
-        # Create a copy of the spectrogram for segmentation-only processing
-        spec_for_segmentation = np.copy(mel_spectrogram)
-
-        # Apply the noise floor mask to the copy
-        noise_floor = config.get("pykanto_noise_floor", -60.0)
-        spec_for_segmentation[spec_for_segmentation < noise_floor] = noise_floor
-
-        # Create SimpleNamespace to mimic pykanto parameters object using separated parameters
-        params = SimpleNamespace(
-            top_dB=config["pykanto_top_dB"],
-            gauss_sigma=config["pykanto_gauss_sigma"],
-            sr=config["sr"],
-            sample_rate=config["sr"],
-            hop_length=config["hop_length"],
-            n_fft=config["n_fft"],
-            window_length=config["win_length"],
-            num_mel_bins=config["n_mels"],
-            max_dB=config["pykanto_max_dB"],
-            dB_delta=config["pykanto_dB_delta"],
-            silence_threshold=config["pykanto_silence_threshold"],
-            min_silence_length=config["pykanto_min_silence_length"],
-            max_unit_length=config["pykanto_max_unit_length"],
-            min_unit_length=config["pykanto_min_unit_length"],
-        )
-
-        # Perform pykanto image-processing pipeline on the masked spectrogram
+    # Apply the noise floor mask to a copy of the spectrogram
+    noise_floor = config.get("pykanto_noise_floor", -60.0)
+    spec_for_segmentation = _pykanto_floored(mel_spectrogram, noise_floor)
+
+    # Perform pykanto image-processing pipeline on the masked spectrogram
+    n_frames = spec_for_segmentation.shape[1]
+    tile_frames = _pykanto_tile_frames(config, n_frames)
+    if equalization is not None:
+        low, high, cdf, bin_centers = equalization
+        img = (spec_for_segmentation - low) / (high - low)
+        tile_frames = tile_frames or n_frames
+    elif tile_frames is None:
         img_eq = equalize_hist(norm(spec_for_segmentation))
-        img_med = median(img_as_ubyte(img_eq), disk(2))
-        img_eroded = erosion(img_med, kernels.erosion_kern)
-        img_dilated = dilation(img_eroded, kernels.dilation_kern)
-        img_dilated = dilation(img_dilated, kernels.erosion_kern)
+        return _pykanto_morphology(img_as_ubyte(img_eq))
+    else:
+        img = norm(spec_for_segmentation)
+        cdf, bin_centers = cumulative_distribution(img, 256)
+    img_dilated = np.empty(img.shape, dtype=np.uint8)
+
+    # Equalize with the global CDF, then filter per tile
+    def filter_tile(tile):
+        start, stop, lo, hi = tile
+        img_eq = np.interp(img[:, lo:hi], bin_centers, cdf).astype(cdf.dtype)
+        img_dilated[:, start:stop] = _pykanto_morphology(img_as_ubyte(img_eq))[
+            :, start - lo : stop - lo
+        ]
+
+    tiles = _time_tiles(n_frames, tile_frames, _PYKANTO_MORPH_MARGIN)
+    with ThreadPoolExecutor(max_workers=config.get("threads_per_job") or 1) as pool:
+        list(pool.map(filter_tile, tiles))
+    return img_dilated
+
+
+# Equalization, decibel inversion, and Gaussian blur stages
+def _pykanto_blurred(img_dilated, config):
+    """
+    Compute the blurred pykanto image passed to 'find_units'.
+
+    Depends on 'pykanto_top_dB' and 'pykanto_gauss_sigma' among the
+    segmentation parameters, and is tiled like '_pykanto_dilated'.
+
+    Parameters
+    ----------
+    img_dilated : np.ndarray
+        Output of '_pykanto_dilated'.
+    config : dict
+        Configuration dictionary containing segmentation parameters.
+
+    Returns
+    -------
+    np.ndarray
+        Blurred float64 image, as from 'gaussian_blur'.
+    """
+    top_dB = config["pykanto_top_dB"]
+    gauss_sigma = config["pykanto_gauss_sigma"]
+    n_frames = img_dilated.shape[1]
+    tile_frames = _pykanto_tile_frames(config, n_frames)
+    if tile_frames is None:
         img_norm = equalize_hist(img_dilated)
 
         # Normalize image to decibel range
         img_inv = np.interp(
             img_norm,
             (img_norm.min(), img_norm.max()),
-            (-params.top_dB, 0.0),
+            (-top_dB, 0.0),
         )
 
         # Apply Gaussian blur for smoothing
-        img_gauss = gaussian_blur(img_inv.astype(float), params.gauss_sigma)
+        return gaussian_blur(img_inv.astype(float), gauss_sigma)
 
-        # Call pykanto find_units function
-        mock_dataset = SimpleNamespace(parameters=params)
-        onsets, offsets = find_units(mock_dataset, img_gauss)
+    # Global CDF and output range of the equalization
+    cdf, bin_centers = cumulative_distribution(img_dilated, 256)
+    norm_range = tuple(
+        np.interp([img_dilated.min(), img_dilated.max()], bin_centers, cdf)
+    )
+    img_blurred = np.empty(img_dilated.shape, dtype=np.float64)
+
+    # Equalize, invert to decibels, and blur per tile
+    def blur_tile(tile):
+        start, stop, lo, hi = tile
+        img_norm = np.interp(img_dilated[:, lo:hi], bin_centers, cdf)
+        img_inv = np.interp(img_norm, norm_range, (-top_dB, 0.0))
+        img_blurred[:, start:stop] = gaussian_filter(img_inv, sigma=gauss_sigma)[
+            :, start - lo : stop - lo
+        ]
 
-        # Check if any units were found
-        if onsets is None or offsets is None:
-            # No units found; return an empty array and let the caller
-            # handle any aggregation or summary of these cases.
-            return np.array([])
+    # scipy's Gaussian kernel extends 'truncate' (4) standard deviations
+    tiles = _time_tiles(n_frames, tile_frames, int(4.0 * float(gauss_sigma) + 0.5))
+    with ThreadPoolExecutor(max_workers=config.get("threads_per_job") or 1) as pool:
+        list(pool.map(blur_tile, tiles))
+
+    # Rescale to the blurred image's range, as in 'gaussian_blur'
+    low, high = img_blurred.min(), img_blurred.max()
+    return np.interp(img_blurred, (low, high), (low, 0))
+
+
+# Find unit boundaries in a blurred pykanto image
+def _pykanto_units(img_gauss, config):
+    """
+    Run pykanto's 'find_units' on a blurred image.
+
+    Parameters
+    ----------
+    img_gauss : np.ndarray
+        Output of '_pykanto_blurred'.
+    config : dict
+        Configuration dictionary containing segmentation parameters.
+
+    Returns
+    -------
+    np.ndarray
+        Onset and offset pairs with shape (n_segments, 2), or an empty
+        array with shape (0,) if no units are found.
+    """
+    # Create SimpleNamespace to mimic pykanto parameters object using separated parameters
+    params = SimpleNamespace(
+        top_dB=config["pykanto_top_dB"],
+        gauss_sigma=config["pykanto_gauss_sigma"],
+        sr=config["sr"],
+        sample_rate=config["sr"],
+        hop_length=config["hop_length"],
+        n_fft=config["n_fft"],
+        window_length=config["win_length"],
+        num_mel_bins=config["n_mels"],
+        max_dB=config["pykanto_max_dB"],
+        dB_delta=config["pykanto_dB_delta"],
+        silence_threshold=config["pykanto_silence_threshold"],
+        min_silence_length=config["pykanto_min_silence_length"],
+        max_unit_length=config["pykanto_max_unit_length"],
+        min_unit_length=config["pykanto_min_unit_length"],
+    )
+
+    # Call pykanto find_units function
+    mock_dataset = SimpleNamespace(parameters=params)
+    onsets, offsets = find_units(mock_dataset, img_gauss)
+
+    # Check if any units were found
+    if onsets is None or offsets is None:
+        # No units found; return an empty array and let the caller
+        # handle any aggregation or summary of these cases.
+        return np.array([])
 
-        # Return segments as array of [onset, offset] pairs
-        return np.column_stack((onsets, offsets))
+    # Return segments as array of [onset, offset] pairs
+    return np.column_stack((onsets, offsets))
+
+
+# Segment a mel spectrogram using pykanto image-based method
+def segment_file(mel_spectrogram, config):
+    """
+    Segment a full mel spectrogram using the high-fidelity pykanto workflow.
+
+    This function applies an image-processing pipeline inspired by pykanto to
+    identify syllable-like acoustic units in a spectrogram. It uses histogram
+    equalization, median filtering, morphological operations, and Gaussian
+    blurring, followed by pykanto's 'find_units' to obtain onset and offset
+    times. If 'segment_tile_seconds' is set, the filters run on overlapping
+    time tiles in 'threads_per_job' threads, with identical results.
+
+    Parameters
+    ----------
+    mel_spectrogram : np.ndarray
+        Full mel spectrogram in decibel scale, with shape (n_mels, time_frames).
+    config : dict
+        Configuration dictionary containing segmentation parameters.
+
+    Returns
+    -------
+    np.ndarray
+        Array of segment boundaries with shape (n_segments, 2), where each row
+        contains the onset and offset times (in seconds or frames, depending
+        on pykanto configuration). If no units are found or an error occurs,
+        an empty array with shape (0,) is returned.
+    """
+    try:
+        img_dilated = _pykanto_dilated(mel_spectrogram, config)
+        return _pykanto_units(_pykanto_blurred(img_dilated, config), config)
 
     except Exception as e:
         print(f"Error segmenting audio: {e}")
@@ -733,91 +2420,45 @@ def segment_file_simple(y, sr, config):
         returned.
     """
     try:
-        hop_length = config["hop_length"]
-        n_fft = config["n_fft"]
-
-        # Set noise floor (minimum dBFS to consider)
-        noise_floor = config.get("simple_noise_floor", -60.0)
-
-        # Compute frame-wise RMS energy and convert to dBFS
-        rms = librosa.feature.rms(
-            y=y,
-            frame_length=n_fft,
-            hop_length=hop_length,
-        )[0]
-        rms_db = librosa.amplitude_to_db(rms, ref=1.0)
-
-        # Derive detection threshold in dBFS
-        threshold_db = float(config["simple_silence_threshold_db"])
-
-        # Use a single effective threshold that respects both noise floor and silence threshold
-        effective_threshold_db = max(threshold_db, noise_floor)
-
-        # Derive boolean mask of active (non-silent) frames
-        active = rms_db > effective_threshold_db
-
-        # Return empty if everything is silent
-        if not np.any(active):
-            return np.array([])
-
-        # Find contiguous runs of active frames
-        active_indices = np.where(active)[0]
-        breaks = np.where(np.diff(active_indices) > 1)[0]
-
-        start_indices = np.concatenate(([0], breaks + 1))
-        end_indices = np.concatenate((breaks, [len(active_indices) - 1]))
-
-        # Frame indices are [start_frame, end_frame_exclusive)
-        intervals_frames = np.vstack(
-            [
-                active_indices[start_indices],
-                active_indices[end_indices] + 1,
-            ]
-        ).T
-
-        # Convert frame indices to times in seconds
-        intervals_sec = intervals_frames.astype(float) * hop_length / float(sr)
-
-        # Ensure we do not exceed the actual audio duration
-        audio_duration = len(y) / float(sr)
-        intervals_sec[:, 1] = np.minimum(intervals_sec[:, 1], audio_duration)
-
-        # Merge segments separated by short silences
-        min_silence_len_sec = config.get("simple_min_silence_length", 0.1)
-        merged_intervals = []
-
-        current_start, current_end = intervals_sec[0]
-        for start, end in intervals_sec[1:]:
-            silence_duration = start - current_end
-            if silence_duration < min_silence_len_sec:
-                current_end = end
-            else:
-                merged_intervals.append([current_start, current_end])
-                current_start, current_end = start, end
-        merged_intervals.append([current_start, current_end])
-
-        # Filter merged segments by duration constraints
-        min_len = config.get("simple_min_unit_length", 0.0)
-        max_len = config.get("simple_max_unit_length", float("inf"))
-
-        final_intervals = [
-            [start, end]
-            for start, end in merged_intervals
-            if min_len <= (end - start) <= max_len
-        ]
+        units = find_active_units(_simple_rms_db(y, config), len(y), sr, config)
 
         # Return empty array if no intervals match criteria
-        if not final_intervals:
+        if not len(units):
             return np.array([])
-
-        # Return final intervals as NumPy array
-        return np.array(final_intervals, dtype=float)
+        return units
 
     except Exception as e:
         print(f"Error in simple segmentation: {e}")
         return np.array([])
 
 
+# Frame-wise RMS level used by simple segmentation
+def _simple_rms_db(y, config):
+    """
+    Compute frame-wise RMS energy in dBFS, independent of the 'simple_*'
+    segmentation parameters.
+    """
+    rms = librosa.feature.rms(
+        y=y,
+        frame_length=config["n_fft"],
+        hop_length=config["hop_length"],
+    )[0]
+    return librosa.amplitude_to_db(rms, ref=1.0)
+
+
+# Frame indices of segment times
+def _time_to_frames(times, config):
+    """
+    Convert times in seconds to frame indices as 'librosa.time_to_frames'
+    does, but without truncating a time that is a whole number of samples
+    (such as a frame boundary) to the sample before it because of rounding
+    error, which would shift units by one frame depending on the offset of
+    the audio they were found in.
+    """
+    samples = np.floor(np.asarray(times) * config["sr"] + 1e-6).astype(int)
+    return samples // config["hop_length"]
+
+
 # Slice full spectrogram into unit spectrograms and process to target shape
 def slice_and_process_spectrograms(
     full_spec, segments, config, max_unit_len_sec, min_unit_len_sec=None
@@ -828,6 +2469,9 @@ def slice_and_process_spectrograms(
     This function takes a full mel spectrogram and a collection of temporal
     segments, extracts the corresponding time windows, normalizes each segment,
     pads them to a common length, and downsamples them to a fixed target shape.
+    Units are written into one preallocated float32 buffer and resized
+    together with cached linear operators (see 'resize_operators'), which
+    match per-unit 'downsample_spectrogram' calls up to float32 rounding.
 
     Parameters
     ----------
@@ -857,38 +2501,11 @@ def slice_and_process_spectrograms(
 
         If no segments are provided or all are skipped, empty lists are returned.
     """
-    # Initialize list for sliced spectrograms
-    sliced_specs = []
     dropped_counts = {"max_length": 0, "min_length": 0, "empty": 0}
 
     # Convert segment times to spectrogram frame indices
-    start_frames = librosa.time_to_frames(
-        segments[:, 0],
-        sr=config["sr"],
-        hop_length=config["hop_length"],
-    )
-    end_frames = librosa.time_to_frames(
-        segments[:, 1],
-        sr=config["sr"],
-        hop_length=config["hop_length"],
-    )
-
-    # Slice full spectrogram for each segment
-    for start_frame, end_frame in zip(start_frames, end_frames):
-        # Check for invalid slice
-        if start_frame >= end_frame:
-            sliced_specs.append(None)
-            continue
-
-        unit_spec = full_spec[:, start_frame:end_frame]
-        normalized = normalize_spec(
-            unit_spec, noise_floor=config.get("simple_noise_floor", -60.0)
-        )
-        sliced_specs.append(normalized)
-
-    # Return empty list if no spectrograms were generated
-    if not sliced_specs:
-        return [], [], dropped_counts
+    start_frames = _time_to_frames(segments[:, 0], config)
+    end_frames = _time_to_frames(segments[:, 1], config)
 
     # Get maximum unit length in frames
     max_length = librosa.time_to_frames(
@@ -903,35 +2520,71 @@ def slice_and_process_spectrograms(
         min_unit_len_sec, sr=config["sr"], hop_length=config["hop_length"]
     )
 
-    # Pad and downsample each spectrogram to target shape
-    final_spectrograms = []
-    valid_indices = []
+    # Check each slice against the length limits
+    units = []
+    for i, (start_frame, end_frame) in enumerate(zip(start_frames, end_frames)):
+        width = min(end_frame, full_spec.shape[1]) - start_frame
 
-    for i, spec in enumerate(sliced_specs):
         # Check for empty or invalid spectrograms from slicing
-        if spec is None:
+        if start_frame >= end_frame or width <= 0:
             dropped_counts["empty"] += 1
             continue
 
         # Check if segment exceeds maximum length
-        if spec.shape[1] > max_length:
+        if width > max_length:
             dropped_counts["max_length"] += 1
             continue
 
         # Check if segment is smaller than minimum length
-        if spec.shape[1] < min_length:
+        if width < min_length:
             dropped_counts["min_length"] += 1
             continue
 
-        # Check if spectrogram is empty (all zeros)
-        if np.max(spec) == 0 and np.min(spec) == 0:
+        units.append((i, start_frame, width))
+
+    noise_floor = config.get("simple_noise_floor", -60.0)
+
+    # Normalize units into the center of a reused zero-padded buffer, as
+    # 'normalize_spec' and 'pad_center_zero' would, and resize each chunk
+    # of units at once
+    batch = np.zeros(
+        (min(len(units), _RESIZE_CHUNK), full_spec.shape[0], max_length),
+        dtype=np.float32,
+    )
+    final_spectrograms, valid_indices, n_batch = [], [], 0
+    for pos, (i, start_frame, width) in enumerate(units):
+        unit_spec = np.maximum(
+            full_spec[:, start_frame : start_frame + width], noise_floor
+        )
+        min_val, max_val = np.min(unit_spec), np.max(unit_spec)
+
+        # Replace non-finite values only when there are any
+        if not np.isfinite(max_val - min_val):
+            unit_spec = np.maximum(
+                np.nan_to_num(full_spec[:, start_frame : start_frame + width]),
+                noise_floor,
+            )
+            min_val, max_val = np.min(unit_spec), np.max(unit_spec)
+
+        # Constant spectrograms normalize to all zeros
+        if max_val > min_val:
+            left = (max_length - width) // 2
+            out = batch[n_batch]
+            out[:, :left] = 0.0
+            out[:, left + width :] = 0.0
+            np.subtract(unit_spec, min_val, out=out[:, left : left + width])
+            out[:, left : left + width] /= max_val - min_val
+            valid_indices.append(i)
+            n_batch += 1
+        else:
             dropped_counts["empty"] += 1
-            continue
 
-        padded = pad_center_zero(spec, max_length)
-        final_spec = downsample_spectrogram(padded, config["target_shape"])
-        final_spectrograms.append(final_spec.astype(np.float32))
-        valid_indices.append(i)
+        # Downsample a full chunk, or the last one, to the target shape
+        if n_batch and (n_batch == len(batch) or pos == len(units) - 1):
+            final_spectrograms.extend(
+                downsample_spectrograms(batch[:n_batch], config["target_shape"])
+            )
+            n_batch = 0
 
     # Return list of processed spectrograms and valid indices
     return final_spectrograms, valid_indices, dropped_counts
@@ -958,9 +2611,10 @@ def _process_file_for_segmentation_worker(
     relative_path : Path
         Relative path from a base directory, used for tracking the source file
         in downstream analyses.
-    config : dict
+    config : dict or None
         Configuration dictionary containing spectrogram and segmentation
-        parameters.
+        parameters. If None, the configuration installed by the pool
+        initializer is used.
     simple : bool, optional
         If True, use the simple amplitude-based segmentation method. If False,
         use the pykanto-inspired image-based segmentation on mel spectrograms.
@@ -971,56 +2625,620 @@ def _process_file_for_segmentation_worker(
     tuple of (list, list, dict)
         A tuple (metadata_list, spectrograms_list, dropped_counts).
     """
-    # Initialize lists for this file
-    file_unit_data = []
-    spectrograms_to_return = []
-    dropped_counts = {"max_length": 0, "min_length": 0, "empty": 0, "no_units": 0}
+    config = _worker_config(config)
 
     # Load audio file
     try:
         y_full, sr = librosa.load(str(processed_file), sr=config["sr"])
     except Exception as e:
         print(f"Error loading {processed_file}: {e}")
-        return file_unit_data, spectrograms_to_return, dropped_counts
+        return [], [], {"max_length": 0, "min_length": 0, "empty": 0, "no_units": 0}
+
+    return _segment_audio(y_full, sr, relative_path, config, simple)
+
+
+# Reference powers of a long processed file for its split segmentation
+def _power_reference_worker(
+    processed_file, config=None, simple=False, block_frames=16384
+):
+    """
+    Return the file-level statistics that windows of a split file are
+    segmented with.
+
+    Whole-file segmentation converts the mel spectrogram to decibels
+    relative to its maximum, and the spectrogram it segments relative to
+    the maximum after the initial 'skip_noise' seconds (when noise is not
+    static). Windows of a split file use these file-level references so
+    that thresholds and noise floors mean the same in every window. For
+    pykanto segmentation, the range and histogram that '_pykanto_dilated'
+    normalizes and equalizes the segmented spectrogram with are also
+    collected, in a second pass. The file is read in blocks of
+    'block_frames' STFT frames, each with the samples its frames overlap,
+    so memory stays bounded and the frames match those of '_mel_power' on
+    the whole file.
+
+    Parameters
+    ----------
+    processed_file : Path
+        Path to the preprocessed audio file.
+    config : dict or None
+        Configuration dictionary containing spectrogram parameters. If None,
+        the configuration installed by the pool initializer is used.
+    simple : bool, optional
+        If True, the file is segmented with the simple method and no
+        equalization statistics are collected. The default is False.
+    block_frames : int, optional
+        Number of STFT frames computed at a time. The default is 16384.
+
+    Returns
+    -------
+    SimpleNamespace or None
+        'file_max' and 'segment_max' (mel power maxima of the file and of
+        its segmented part), 'skip_frames' and 'n_frames' (first frame and
+        number of frames of the segmented part), and 'equalization' (the
+        argument of '_pykanto_dilated', or None for simple segmentation,
+        resampled files, and silent files). None if the file cannot be
+        read, in which case windows fall back to their own maxima.
+    """
+    config = _worker_config(config)
+    n_fft, hop_length = config["n_fft"], config["hop_length"]
+    try:
+        with sf.SoundFile(str(processed_file)) as f:
+            n_samples, sr = f.frames, f.samplerate
+
+            # Files at another sample rate are loaded and resampled whole
+            resampled = sr != config["sr"]
+            if resampled:
+                y_full, sr = librosa.load(str(processed_file), sr=config["sr"])
+                n_samples = len(y_full)
+            n_frames = 1 + n_samples // hop_length
+            if resampled:
+                block_frames = n_frames
+
+            # Frames the whole-file segmentation skips
+            skip_frames = 0
+            if not config.get("static", True):
+                skip_samples = int(config.get("skip_noise", 3.0) * sr)
+                if skip_samples and n_samples > skip_samples:
+                    skip_frames = min(-(-skip_samples // hop_length), n_frames - 1)
+
+            # Segmented frames of each block, zero-padding the ends as
+            # 'librosa.stft' does for centered frames
+            def blocks():
+                for first in range(0, n_frames, block_frames):
+                    last = min(first + block_frames, n_frames)
+                    lo = first * hop_length - n_fft // 2
+                    hi = (last - 1) * hop_length - n_fft // 2 + n_fft
+                    if resampled:
+                        y = y_full[max(lo, 0) : hi]
+                    else:
+                        f.seek(max(lo, 0))
+                        y = f.read(min(hi, n_samples) - max(lo, 0), dtype="float32")
+                        y = y.mean(axis=1) if y.ndim > 1 else y
+                    y = np.pad(y, (max(-lo, 0), max(hi - n_samples, 0)))
+                    power = _mel_power(y, sr, config, center=False)
+                    yield power, power[:, max(skip_frames - first, 0) :]
+
+            # Keep the maxima in the spectrogram's dtype, so that decibels
+            # relative to them are those relative to 'np.max'
+            file_maxima, segment_maxima, segment_minima = [], [], []
+            for power, segmented in blocks():
+                file_maxima.append(power.max())
+                if segmented.size:
+                    segment_maxima.append(segmented.max())
+                    segment_minima.append(segmented.min())
+            file_max, segment_max = max(file_maxima), max(segment_maxima)
+            segment_min = min(segment_minima)
+
+            # Range and histogram of the normalized pykanto spectrogram
+            equalization = None
+            if not simple and not resampled and segment_max > 0:
+                noise_floor = config.get("pykanto_noise_floor", -60.0)
+                low, high = _pykanto_floored(
+                    _power_to_db(np.array([segment_min, segment_max]), ref=segment_max),
+                    noise_floor,
+                )
+                if high > low:
+                    counts = 0
+                    for _, segmented in blocks():
+                        if segmented.size:
+                            spec = _power_to_db(segmented, ref=segment_max)
+                            img = (_pykanto_floored(spec, noise_floor) - low) / (
+                                high - low
+                            )
+                            hist, bin_edges = _pykanto_histogram(img)
+                            counts = counts + hist
+                    equalization = (low, high) + _histogram_cdf(counts, bin_edges)
+    except Exception as e:
+        print(f"Error loading {processed_file}: {e}")
+        return None
+    return SimpleNamespace(
+        file_max=file_max,
+        segment_max=segment_max,
+        skip_frames=skip_frames,
+        n_frames=n_frames - skip_frames,
+        equalization=equalization,
+    )
+
+
+# Audio of one window of a long processed file
+def _read_window(processed_file, window, config):
+    """
+    Read the samples of a window of a file, decoded and downmixed as
+    'librosa.load' does and resampled to config['sr'], and return them with
+    the file's sample rate and length in samples.
+    """
+    start, stop = window[:2]
+    with sf.SoundFile(str(processed_file)) as f:
+        n_samples, sr = f.frames, f.samplerate
+        f.seek(start)
+        y = f.read(stop - start, dtype="float32", always_2d=True)
+    y = y.mean(axis=1) if y.shape[1] > 1 else y[:, 0]
+    if sr != config["sr"]:
+        y = librosa.resample(y, orig_sr=sr, target_sr=config["sr"])
+    return y, sr, n_samples
+
+
+# Dilated pykanto image columns of one window of a long processed file
+def _pykanto_window_image_worker(
+    processed_file, window, image_path, config=None, reference=None
+):
+    """
+    Write the core columns of a window to the dilated pykanto image of a
+    split file.
+
+    The window's spectrogram is normalized and equalized with the file's
+    statistics, and its core is far enough from the window's ends for the
+    filter footprints, so its columns are those of the whole file's image.
+    The frames centered in the core are written (the last window also
+    writes the final frame), so that the windows of a file fill the image
+    together.
+
+    Parameters
+    ----------
+    processed_file : Path
+        Path to the preprocessed audio file, at config['sr'].
+    window : tuple of int
+        (start, stop, core_start, core_stop) in samples of the file, as
+        returned by 'chatter.parallel.split_windows'.
+    image_path : Path
+        '.npy' file of the uint8 image of the segmented frames, created by
+        the caller with shape (reference.n_frames, n_mels), time first so
+        that each window writes one contiguous block.
+    config : dict or None
+        Configuration dictionary containing spectrogram and segmentation
+        parameters. If None, the configuration installed by the pool
+        initializer is used.
+    reference : SimpleNamespace
+        File statistics from '_power_reference_worker', with an
+        'equalization'.
+
+    Returns
+    -------
+    bool
+        Whether the window could be read and its columns written.
+    """
+    config = _worker_config(config)
+    start, _, core_start, core_stop = window
+    hop_length = config["hop_length"]
+    try:
+        y, sr, n_samples = _read_window(processed_file, window, config)
+    except Exception as e:
+        print(f"Error loading {processed_file}: {e}")
+        return False
+
+    # Frames centered in the core and past the skipped part of the file
+    power = _mel_power(y, sr, config)
+    first = max(start // hop_length, reference.skip_frames)
+    lo = max(-(-core_start // hop_length), first)
+    hi = start // hop_length + power.shape[1]
+    if core_stop < n_samples:
+        hi = -(-core_stop // hop_length)
+    if hi <= lo:
+        return True
+
+    # Image of the window from its first segmented frame
+    img_dilated = _pykanto_dilated(
+        _power_to_db(
+            power[:, first - start // hop_length :], ref=reference.segment_max
+        ),
+        config,
+        reference.equalization,
+    )
+    image = np.load(image_path, mmap_mode="r+")
+    skip_frames = reference.skip_frames
+    image[lo - skip_frames : hi - skip_frames] = img_dilated[
+        :, lo - first : hi - first
+    ].T
+    image.flush()
+    return True
+
+
+# Pykanto units of a split file from its dilated image
+def _pykanto_image_segments_worker(image_path, config=None, reference=None):
+    """
+    Find the pykanto units of a split file in the dilated image written by
+    '_pykanto_window_image_worker', as 'segment_file' does for the whole
+    file.
+
+    Parameters
+    ----------
+    image_path : Path
+        '.npy' file of the image, with shape (frames, n_mels).
+    config : dict or None
+        Configuration dictionary containing segmentation parameters. If
+        None, the configuration installed by the pool initializer is used.
+    reference : SimpleNamespace
+        File statistics from '_power_reference_worker'.
+
+    Returns
+    -------
+    np.ndarray
+        Onset and offset pairs in seconds from the start of the file, with
+        shape (n_segments, 2), or an empty array with shape (0,).
+    """
+    config = _worker_config(config)
+    img_dilated = np.ascontiguousarray(np.load(image_path, mmap_mode="r").T)
+    try:
+        segments = _pykanto_units(_pykanto_blurred(img_dilated, config), config)
+    except Exception as e:
+        print(f"Error segmenting audio: {e}")
+        segments = np.array([])
+    return segments + reference.skip_frames * config["hop_length"] / config["sr"]
+
+
+# Segment one window of a long processed file
+def _segment_window_worker(
+    processed_file,
+    relative_path,
+    window,
+    config,
+    simple=False,
+    reference=None,
+    segments=None,
+):
+    """
+    Segment part of a preprocessed file for split scheduling of long files.
+
+    The window is segmented with its surrounding context, and only units
+    whose onset falls inside the window's core are kept (and counted when
+    dropped), so that the cores of consecutive windows stitch back into one
+    unit list per file.
+
+    Parameters
+    ----------
+    processed_file : Path
+        Path to the preprocessed audio file.
+    relative_path : Path
+        Source file name recorded in the unit metadata.
+    window : tuple of int
+        (start, stop, core_start, core_stop) in samples of the file, as
+        returned by 'chatter.parallel.split_windows'.
+    config : dict or None
+        Configuration dictionary containing spectrogram and segmentation
+        parameters. If None, the configuration installed by the pool
+        initializer is used.
+    simple : bool, optional
+        If True, use the simple amplitude-based segmentation method. The
+        default is False.
+    reference : SimpleNamespace, optional
+        File statistics from '_power_reference_worker', so that the window
+        is converted to decibels as the whole file would be. If None, the
+        window's own maximum is used.
+    segments : np.ndarray, optional
+        Units of the whole file, in seconds from its start, as found by
+        '_pykanto_image_segments_worker'. If given, the window only slices
+        the ones in its core instead of segmenting its audio.
+
+    Returns
+    -------
+    tuple of (list, list, dict, np.ndarray or None)
+        A tuple (metadata_list, spectrograms_list, dropped_counts, onsets)
+        for the units owned by this window, with times relative to the
+        whole file; 'onsets' holds the onsets of all segments in the core,
+        including dropped ones, or is None if the window cannot be read.
+    """
+    config = _worker_config(config)
+    start, stop, core_start, core_stop = window
+    try:
+        y, sr, n_samples = _read_window(processed_file, window, config)
+    except Exception as e:
+        print(f"Error loading {processed_file}: {e}")
+        return (
+            [],
+            [],
+            {"max_length": 0, "min_length": 0, "empty": 0, "no_units": 0},
+            None,
+        )
+
+    # Keep the units that start inside this window's core (compared in
+    # samples so that a unit on a boundary belongs to exactly one window)
+    scale = config["sr"] / sr
+    return _segment_audio(
+        y,
+        config["sr"],
+        relative_path,
+        config,
+        simple,
+        offset=start / sr,
+        reference=reference,
+        core=(round(core_start * scale), round(core_stop * scale)),
+        file_samples=round(n_samples * scale),
+        segments=segments,
+    )
+
+
+# Join the window results of a split file
+def _stitch_window_results(results):
+    """
+    Combine the outputs of '_segment_window_worker' for one file.
+
+    Parameters
+    ----------
+    results : list of tuple
+        (metadata_list, spectrograms_list, dropped_counts, onsets) per
+        window, in any order.
+
+    Returns
+    -------
+    tuple of (list, list, dict)
+        Units of the whole file sorted by onset, their spectrograms, and
+        the summed drop counts ('no_units' is 1 only if no window found any
+        segment). Units are numbered in 'unit_index' by their rank among
+        all segments found, as whole-file segmentation numbers them before
+        dropping any.
+    """
+    units = [
+        (meta, spec)
+        for metadata, specs, *_ in results
+        for meta, spec in zip(metadata, specs)
+    ]
+    units.sort(key=lambda unit: unit[0]["onset"])
+    onsets = np.sort(
+        np.concatenate(
+            [np.asarray(r[3], dtype=float) for r in results if r[3] is not None]
+            or [np.array([])]
+        )
+    )
+    for meta, _ in units:
+        meta["unit_index"] = int(np.searchsorted(onsets, meta["onset"]))
+
+    dropped_counts = {"max_length": 0, "min_length": 0, "empty": 0, "no_units": 0}
+    for _, _, drops, _ in results:
+        for k, v in drops.items():
+            if k != "no_units":
+                dropped_counts[k] = dropped_counts.get(k, 0) + v
+    dropped_counts["no_units"] = int(not onsets.size)
+
+    return [meta for meta, _ in units], [spec for _, spec in units], dropped_counts
+
+
+# Decibels relative to a reference power
+def _power_to_db(power, ref=np.max):
+    """
+    Convert mel power to decibels as 'compute_spectrogram' does, keeping
+    librosa's 80 dB dynamic range below 'ref' rather than below the
+    array's own maximum, so that a window of a file converted with the
+    file's maximum matches the same frames of the whole file.
+    """
+    if callable(ref):
+        return librosa.power_to_db(power, ref=ref)
+    return np.maximum(librosa.power_to_db(power, ref=ref, top_db=None), -80.0)
+
+
+# Audio or spectrogram segmented after skipping initial noise
+def _segmentation_input(
+    y_full,
+    sr,
+    full_mel_power,
+    full_db,
+    config,
+    simple,
+    offset=0.0,
+    reference=None,
+    file_samples=None,
+):
+    """
+    Select the data that segmentation runs on and its time offset.
 
-    # Initialize audio used for segmentation and time offset
-    y_for_segmentation = y_full
-    time_offset = 0.0
+    If noise is not static, the first 'skip_noise' seconds of the file are
+    left out of segmentation only. Simple segmentation receives the
+    truncated audio; pykanto segmentation reuses the full STFT from the
+    first frame at or after the skipped part instead of transforming the
+    truncated audio again.
+
+    Parameters
+    ----------
+    y_full : np.ndarray
+        Preprocessed mono audio.
+    sr : int
+        Sample rate of 'y_full'.
+    full_mel_power : np.ndarray
+        Mel power spectrogram of 'y_full', from '_mel_power'.
+    full_db : np.ndarray
+        'full_mel_power' in decibels relative to the file's maximum.
+    config : dict
+        Configuration dictionary containing segmentation parameters.
+    simple : bool
+        If True, return audio for simple segmentation; otherwise a decibel
+        mel spectrogram for pykanto segmentation.
+    offset : float, optional
+        Time in seconds of the first sample of 'y_full' within the source
+        file. The default is 0.0.
+    reference : SimpleNamespace, optional
+        Statistics of the source file from '_power_reference_worker' when
+        'y_full' is a window of it; the pykanto spectrogram is then in
+        decibels relative to the segmented part of the whole file. If None,
+        the maxima of 'y_full' are used.
+    file_samples : int, optional
+        Length in samples of the source file, which decides whether its
+        start is skipped at all. The default is the length of 'y_full'.
 
-    # If noise is not static, skip the initial part of the audio for segmentation only
+    Returns
+    -------
+    tuple
+        (audio or spectrogram, time offset in seconds of its first sample
+        or frame within 'y_full'). The audio or spectrogram is None if all
+        of 'y_full' lies in the skipped part.
+    """
+    if file_samples is None:
+        file_samples = len(y_full)
+    skip_samples = 0
     if not config.get("static", True):
-        skip_duration = config.get("skip_noise", 3.0)
-        skip_samples = int(skip_duration * sr)
-        if len(y_full) > skip_samples:
-            y_for_segmentation = y_full[skip_samples:]
-            time_offset = skip_duration
+        skip_noise = config.get("skip_noise", 3.0)
+        file_skip = int(skip_noise * sr)
+        if file_samples > file_skip:
+            skip_samples = file_skip - round(offset * sr)
+
+            # Past the skipped part, simple segmentation keeps the RMS frame
+            # grid of the whole file, which starts where the skip ends
+            if simple and skip_samples < 0:
+                skip_samples %= config["hop_length"]
+            skip_samples = max(skip_samples, 0)
+            shift = skip_samples - (file_skip - round(offset * sr))
+            skip_duration = skip_noise - offset + shift / sr
+
+    segment_ref = np.max if reference is None else reference.segment_max
+    if not skip_samples:
+        if simple or reference is None or reference.segment_max == reference.file_max:
+            return (y_full if simple else full_db), 0.0
+        return _power_to_db(full_mel_power, ref=segment_ref), 0.0
+    if skip_samples >= len(y_full):
+        return None, 0.0
+    if simple:
+        return y_full[skip_samples:], skip_duration
+
+    skip_frames = min(
+        -(-skip_samples // config["hop_length"]), full_mel_power.shape[1] - 1
+    )
+    return (
+        _power_to_db(full_mel_power[:, skip_frames:], ref=segment_ref),
+        skip_frames * config["hop_length"] / sr,
+    )
 
-    # Compute the full spectrogram from the original, complete audio file
-    full_mel_spectrogram_db = compute_spectrogram(y_full, sr, config)
 
-    # Perform segmentation on the (potentially truncated) audio data
+# Maximum and minimum unit lengths of a segmentation method
+def _unit_length_limits(config, simple):
+    """
+    Return (max_unit_length, min_unit_length) in seconds for slicing units.
+    """
     if simple:
-        segments_relative = segment_file_simple(y_for_segmentation, sr, config)
-        max_unit_len = config["simple_max_unit_length"]
-    else:
-        # for pykanto, a spectrogram of the truncated audio is needed
-        mel_spec_for_segmentation_db = compute_spectrogram(
-            y_for_segmentation, sr, config
+        return config["simple_max_unit_length"], config["simple_min_unit_length"]
+    return config["pykanto_max_unit_length"], config.get(
+        "pykanto_min_unit_length", config["simple_min_unit_length"]
+    )
+
+
+# Segment an in-memory recording and slice unit spectrograms
+def _segment_audio(
+    y_full,
+    sr,
+    relative_path,
+    config,
+    simple=False,
+    offset=0.0,
+    reference=None,
+    core=None,
+    file_samples=None,
+    segments=None,
+):
+    """
+    Segment a preprocessed recording and return spectrograms and metadata.
+
+    Parameters
+    ----------
+    y_full : np.ndarray
+        Preprocessed mono audio at config['sr'].
+    sr : int
+        Sample rate of 'y_full'.
+    relative_path : Path
+        Source file name recorded in the unit metadata.
+    config : dict
+        Configuration dictionary containing spectrogram and segmentation
+        parameters.
+    simple : bool, optional
+        If True, use the simple amplitude-based segmentation method. The
+        default is False.
+    offset : float, optional
+        Time in seconds of the first sample of 'y_full' within the source
+        file, when segmenting a window of a longer recording. Onsets and
+        offsets are reported relative to the file, and the initial
+        'skip_noise' seconds are only skipped where the window overlaps
+        them. The default is 0.0.
+    reference : SimpleNamespace, optional
+        Statistics of the source file from '_power_reference_worker', whose
+        maxima are used as decibel references in place of those of 'y_full'
+        when it is a window. The default is None.
+    core : tuple of int, optional
+        (start, stop) sample range of the source file at 'sr'. If given,
+        only segments whose onset falls inside it are sliced, returned, and
+        counted in 'dropped_counts'. The default is None.
+    file_samples : int, optional
+        Length of the source file in samples at 'sr', when 'y_full' is a
+        window of it. The default is the length of 'y_full'.
+    segments : np.ndarray, optional
+        Segments already found in the source file, in seconds from its
+        start, to slice instead of segmenting 'y_full'. The default is None.
+
+    Returns
+    -------
+    tuple of (list, list, dict)
+        A tuple (metadata_list, spectrograms_list, dropped_counts). If
+        'core' is given, the onsets of all segments inside it, including
+        dropped ones, follow as a fourth element.
+    """
+    # Initialize lists for this file
+    file_unit_data = []
+    spectrograms_to_return = []
+    dropped_counts = {"max_length": 0, "min_length": 0, "empty": 0, "no_units": 0}
+
+    # Compute the full spectrogram from the original, complete audio file
+    full_mel_power = _mel_power(y_full, sr, config)
+    full_mel_spectrogram_db = _power_to_db(
+        full_mel_power, ref=np.max if reference is None else reference.file_max
+    )
+
+    # Perform segmentation on the (potentially truncated) audio data, unless
+    # the segments of the source file are given
+    if segments is None:
+        segmentation_input, time_offset = _segmentation_input(
+            y_full,
+            sr,
+            full_mel_power,
+            full_mel_spectrogram_db,
+            config,
+            simple,
+            offset,
+            reference,
+            file_samples,
         )
-        segments_relative = segment_file(mel_spec_for_segmentation_db, config)
-        max_unit_len = config["pykanto_max_unit_length"]
+        if segmentation_input is None:
+            segments_relative = np.array([])
+        elif simple:
+            segments_relative = segment_file_simple(segmentation_input, sr, config)
+        else:
+            segments_relative = segment_file(segmentation_input, config)
 
-    # Process segments if any were found
-    if segments_relative.size > 0:
-        # Adjust segment times to be relative to the start of the original file
+        # Adjust segment times to be relative to the start of 'y_full' and
+        # of the original file
         segments_absolute = segments_relative + time_offset
+        file_segments = segments_absolute + offset
+    else:
+        file_segments = np.asarray(segments)
+        segments_absolute = file_segments - offset
+    max_unit_len, min_unit_len = _unit_length_limits(config, simple)
+
+    # Keep the segments that start inside the core (compared in samples so
+    # that a segment on a boundary belongs to exactly one window)
+    if core is not None and segments_absolute.size > 0:
+        onsets = np.rint(file_segments[:, 0] * sr)
+        in_core = (onsets >= core[0]) & (onsets < core[1])
+        segments_absolute = segments_absolute[in_core]
+        file_segments = file_segments[in_core]
 
+    # Process segments if any were found
+    if segments_absolute.size > 0:
         # Slice from the full, original spectrogram using absolute segment times
-        min_unit_len = (
-            config["simple_min_unit_length"]
-            if simple
-            else config.get("pykanto_min_unit_length", config["simple_min_unit_length"])
-        )
         spectrograms, valid_indices, dropped_counts = slice_and_process_spectrograms(
             full_mel_spectrogram_db,
             segments_absolute,
@@ -1036,8 +3254,8 @@ def _process_file_for_segmentation_worker(
                 {
                     "source_file": str(relative_path),
                     "unit_index": i,
-                    "onset": float(segments_absolute[i][0]),
-                    "offset": float(segments_absolute[i][1]),
+                    "onset": float(file_segments[i][0]),
+                    "offset": float(file_segments[i][1]),
                     "max_unit_length_s": float(max_unit_len),
                 }
             )
@@ -1047,9 +3265,180 @@ def _process_file_for_segmentation_worker(
         dropped_counts["no_units"] = 1
 
     # Return metadata and spectrograms for this file
+    if core is not None:
+        onsets = file_segments[:, 0] if file_segments.size else np.array([])
+        return file_unit_data, spectrograms_to_return, dropped_counts, onsets
     return file_unit_data, spectrograms_to_return, dropped_counts
 
 
+# Evaluate segmentation settings on one file with cached intermediate stages
+def _sweep_segmentation_worker(processed_file, settings, simple=False, config=None):
+    """
+    Segment one preprocessed file under several parameter settings.
+
+    The audio is decoded and its spectrogram computed once. Simple
+    segmentation reuses the frame-wise RMS levels for every setting.
+    Pykanto settings are visited grouped by their upstream parameters, so
+    the dilated image is only recomputed when 'pykanto_noise_floor'
+    changes and the blurred image when 'pykanto_top_dB' or
+    'pykanto_gauss_sigma' also change; the remaining parameters only rerun
+    'find_units'. Units are sliced and checked as in a full run.
+
+    Parameters
+    ----------
+    processed_file : Path
+        Path to the preprocessed audio file.
+    settings : list of dict
+        Overrides of 'simple_*' or 'pykanto_*' configuration parameters.
+    simple : bool, optional
+        If True, use the simple amplitude-based segmentation method. The
+        default is False.
+    config : dict or None
+        Configuration dictionary. If None, the configuration installed by
+        the pool initializer is used.
+
+    Returns
+    -------
+    list of dict or None
+        For each setting, in order: 'n_units' (units kept), 'durations'
+        (float32 durations of the kept units in seconds), and 'dropped'
+        (counts of dropped segments by reason, as in '_segment_audio').
+        None if the file cannot be loaded.
+    """
+    config = _worker_config(config)
+
+    # Load audio file and compute its spectrogram once
+    try:
+        y_full, sr = librosa.load(str(processed_file), sr=config["sr"])
+    except Exception as e:
+        print(f"Error loading {processed_file}: {e}")
+        return None
+
+    full_mel_power = _mel_power(y_full, sr, config)
+    full_mel_spectrogram_db = librosa.power_to_db(full_mel_power, ref=np.max)
+    segmentation_input, time_offset = _segmentation_input(
+        y_full, sr, full_mel_power, full_mel_spectrogram_db, config, simple
+    )
+    if simple:
+        rms_db = _simple_rms_db(segmentation_input, config)
+
+    # Visit settings grouped by the parameters of the image stages
+    configs = [dict(config, **setting) for setting in settings]
+    order = range(len(configs))
+    if not simple:
+        order = sorted(
+            order, key=lambda i: [configs[i][name] for name in _PYKANTO_IMAGE_PARAMS]
+        )
+    dilated_key = blurred_key = None
+    results = [None] * len(configs)
+    for i in order:
+        setting_config = configs[i]
+        try:
+            if simple:
+                segments = find_active_units(
+                    rms_db, len(segmentation_input), sr, setting_config
+                )
+            else:
+                key = (setting_config["pykanto_noise_floor"],)
+                if key != dilated_key:
+                    img_dilated = _pykanto_dilated(segmentation_input, setting_config)
+                    dilated_key, blurred_key = key, None
+                key = tuple(setting_config[name] for name in _PYKANTO_IMAGE_PARAMS)
+                if key != blurred_key:
+                    img_gauss = _pykanto_blurred(img_dilated, setting_config)
+                    blurred_key = key
+                segments = _pykanto_units(img_gauss, setting_config)
+        except Exception as e:
+            print(f"Error segmenting {processed_file} with {settings[i]}: {e}")
+            segments = np.array([])
+
+        # Slice units as a full run would to count drops
+        dropped = {"max_length": 0, "min_length": 0, "empty": 0, "no_units": 0}
+        durations = np.zeros(0, dtype=np.float32)
+        if segments.size > 0:
+            max_unit_len, min_unit_len = _unit_length_limits(setting_config, simple)
+            _, valid_indices, drops = slice_and_process_spectrograms(
+                full_mel_spectrogram_db,
+                segments + time_offset,
+                setting_config,
+                max_unit_len,
+                min_unit_len_sec=min_unit_len,
+            )
+            dropped.update(drops)
+            kept = segments[valid_indices]
+            durations = (kept[:, 1] - kept[:, 0]).astype(np.float32)
+        else:
+            dropped["no_units"] = 1
+
+        results[i] = {
+            "n_units": len(durations),
+            "durations": durations,
+            "dropped": dropped,
+        }
+
+    return results
+
+
+# Preprocess and segment raw files without reading intermediate WAVs
+def _preprocess_and_segment_worker(jobs, config=None, simple=False):
+    """
+    Preprocess raw audio files and segment the results in memory.
+
+    The int16 output of preprocessing is converted to float exactly as
+    'librosa.load' would read it back from a WAV file, so units, onsets,
+    and spectrograms match the two-step 'preprocess_directory' plus
+    'segment_and_create_spectrograms' workflow.
+
+    Parameters
+    ----------
+    jobs : list of tuple
+        Sequence of (input_path, relative_path, output_path) triples,
+        optionally extended with a noise profile path. If 'output_path' is
+        None, the preprocessed audio is not written to disk.
+    config : dict, optional
+        Configuration dictionary containing preprocessing, spectrogram, and
+        segmentation parameters. If None, the configuration installed by
+        the pool initializer is used.
+    simple : bool, optional
+        If True, use the simple amplitude-based segmentation method. The
+        default is False.
+
+    Returns
+    -------
+    list of tuple
+        One (metadata_list, spectrograms_list, dropped_counts, succeeded)
+        tuple per job, in the order of 'jobs'.
+    """
+    config = _worker_config(config)
+
+    outputs = _preprocess_files(
+        [(job[0], *job[2:]) for job in jobs],
+        config,
+        return_audio=True,
+    )
+
+    results = []
+    for (input_path, relative_path, *_), audio_int16 in zip(jobs, outputs):
+        if audio_int16 is None:
+            empty = {"max_length": 0, "min_length": 0, "empty": 0, "no_units": 0}
+            results.append(([], [], empty, False))
+            continue
+
+        # Scale as soundfile does when decoding 16-bit PCM to float32
+        y_full = audio_int16.astype(np.float32) / 32768.0
+        try:
+            metadata, specs, drops = _segment_audio(
+                y_full, config["sr"], relative_path, config, simple
+            )
+            results.append((metadata, specs, drops, True))
+        except Exception as e:
+            print(f"Error segmenting {input_path}: {e}")
+            empty = {"max_length": 0, "min_length": 0, "empty": 0, "no_units": 0}
+            results.append(([], [], empty, False))
+
+    return results
+
+
 # Process files that have already been segmented
 def _process_presegmented_file_worker(processed_file, segments_df, config):
     """
@@ -1067,8 +3456,9 @@ def _process_presegmented_file_worker(processed_file, segments_df, config):
     segments_df : pd.DataFrame
         A DataFrame containing the segmentation data for this specific audio
         file, with 'onset' and 'offset' columns in seconds.
-    config : dict
+    config : dict or None
         The configuration dictionary containing spectrogram and processing parameters.
+        If None, the configuration installed by the pool initializer is used.
 
     Returns
     -------
@@ -1077,6 +3467,8 @@ def _process_presegmented_file_worker(processed_file, segments_df, config):
         a list of the corresponding processed spectrograms as NumPy arrays,
         and a dictionary of dropped segment counts.
     """
+    config = _worker_config(config)
+
     try:
         # Load audio file
         y, sr = librosa.load(str(processed_file), sr=config["sr"])
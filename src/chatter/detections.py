@@ -0,0 +1,346 @@
+"""
+chatter.detections
+==================
+
+Persistent table of BirdNET detections.
+
+Species detection runs once per audio file and stores every detection above
+a low confidence floor in a columnar HDF5 table keyed by the file's content
+hash. Clips for any species and confidence threshold are then exported from
+the table without running BirdNET again, and later runs only analyze files
+whose contents have not been seen before.
+"""
+
+# Import necessary libraries
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import h5py
+import numpy as np
+
+# Column name and dtype of each table
+FILE_COLUMNS = {"hash": "S32", "n_windows": np.int64}
+PATH_COLUMNS = {
+    "path": h5py.string_dtype(),
+    "size": np.int64,
+    "mtime_ns": np.int64,
+    "file": np.int64,
+}
+DETECTION_COLUMNS = {
+    "file": np.int64,
+    "start": np.float32,
+    "end": np.float32,
+    "label": np.int32,
+    "confidence": np.float32,
+}
+TABLES = {
+    "files": FILE_COLUMNS,
+    "paths": PATH_COLUMNS,
+    "detections": DETECTION_COLUMNS,
+}
+
+
+class DetectionStore:
+    """
+    Columnar HDF5 table of BirdNET detections keyed by file content hash.
+
+    The file holds three tables of equal-length 1-D datasets: 'files' (one
+    row per distinct audio content: hash and number of model windows), 'paths' (one row
+    per path seen under an input directory, with its size, modification
+    time, and row in 'files'), and 'detections' (file row, window start
+    and end in seconds, label index, and confidence). The label names are
+    stored once in 'labels'.
+
+    A file row is appended after its detections, so detections without a
+    file row (left by an interrupted run) are dropped when the store is
+    opened.
+
+    Attributes
+    ----------
+    path : Path
+        Location of the HDF5 file.
+    min_confidence : float
+        Detections at or below this confidence are not stored, so clips can
+        only be exported for higher thresholds.
+    labels : list of str
+        BirdNET labels ('Scientific name_Common name').
+    """
+
+    # Open or create a store
+    def __init__(self, path, min_confidence=0.1):
+        """
+        Open an existing detection store or create a new one.
+
+        Parameters
+        ----------
+        path : str or Path
+            Location of the HDF5 file.
+        min_confidence : float, optional
+            Confidence floor for new stores. An existing store keeps the
+            floor it was created with. The default is 0.1.
+        """
+        self.path = Path(path)
+        self.min_confidence = float(min_confidence)
+        self.labels: List[str] = []
+        self._hash_rows: Dict[bytes, int] = {}
+        self._path_rows: Dict[str, tuple] = {}
+        self._h5 = None
+
+        if self.path.exists():
+            self._load()
+
+    # Read index columns and repair an interrupted append
+    def _load(self):
+        """
+        Load labels and lookup indexes, truncating orphaned detections.
+        """
+        with h5py.File(self.path, "a") as hf:
+            self.min_confidence = float(hf.attrs["min_confidence"])
+            self.labels = [label.decode() for label in hf["labels"][:]]
+
+            # Columns of a table may differ in length after an interrupted append
+            lengths = {}
+            for table, columns in TABLES.items():
+                lengths[table] = min(hf[f"{table}/{name}"].shape[0] for name in columns)
+            file_col = hf["detections/file"][: lengths["detections"]]
+            lengths["detections"] = int(
+                np.searchsorted(file_col, lengths["files"], side="left")
+            )
+            for table, columns in TABLES.items():
+                for name in columns:
+                    if hf[f"{table}/{name}"].shape[0] > lengths[table]:
+                        hf[f"{table}/{name}"].resize(lengths[table], axis=0)
+
+            hashes = hf["files/hash"][:]
+            self._hash_rows = {h: i for i, h in enumerate(hashes)}
+
+            # Later rows of a path supersede earlier ones
+            paths = hf["paths/path"].asstr()[:]
+            sizes = hf["paths/size"][:]
+            mtimes = hf["paths/mtime_ns"][:]
+            files = hf["paths/file"][:]
+            self._path_rows = {
+                p: (int(f), int(size), int(mtime))
+                for p, f, size, mtime in zip(paths, files, sizes, mtimes)
+            }
+
+    # Create empty tables
+    def _create(self, labels):
+        """
+        Create the HDF5 layout with empty resizable columns.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with h5py.File(self.path, "w") as hf:
+            hf.attrs["min_confidence"] = self.min_confidence
+            hf.create_dataset("labels", data=np.array(labels, dtype="S"))
+            for table, columns in TABLES.items():
+                for name, dtype in columns.items():
+                    hf.create_dataset(
+                        f"{table}/{name}",
+                        shape=(0,),
+                        maxshape=(None,),
+                        dtype=dtype,
+                        chunks=(1 << 14,),
+                        compression="lzf",
+                    )
+        self.labels = list(labels)
+
+    # Check whether a path is unchanged since it was recorded
+    def known_path(self, key, input_path):
+        """
+        Check whether a path was recorded with its current size and mtime.
+
+        Parameters
+        ----------
+        key : str
+            Path relative to the input directory.
+        input_path : Path
+            Absolute path of the file.
+
+        Returns
+        -------
+        bool
+            True if the path's detections are already in the store.
+        """
+        record = self._path_rows.get(key)
+        if record is None:
+            return False
+        stat = os.stat(input_path)
+        return (stat.st_size, stat.st_mtime_ns) == record[1:]
+
+    # Check whether contents have been analyzed
+    def known_hash(self, content_hash):
+        """
+        Check whether audio with this content hash has been analyzed.
+        """
+        return content_hash.encode() in self._hash_rows
+
+    # Open for a sequence of appends
+    def open(self, labels=None):
+        """
+        Open the store for appending, creating it if needed.
+
+        Parameters
+        ----------
+        labels : list of str, optional
+            BirdNET labels, required when the store does not exist yet.
+        """
+        if self._h5 is not None:
+            return
+        if not self.path.exists():
+            if labels is None:
+                raise ValueError("labels are required to create a detection store")
+            self._create(labels)
+        self._h5 = h5py.File(self.path, "a")
+
+    # Close after appending
+    def close(self):
+        """
+        Flush and close the HDF5 file if it is open.
+        """
+        if self._h5 is not None:
+            self._h5.close()
+            self._h5 = None
+
+    # Append rows to a table
+    def _append(self, table, columns, values):
+        """
+        Append equal-length arrays to the columns of one table.
+        """
+        n = len(next(iter(values.values())))
+        start = self._h5[f"{table}/{next(iter(columns))}"].shape[0]
+        for name in columns:
+            dataset = self._h5[f"{table}/{name}"]
+            dataset.resize(start + n, axis=0)
+            if n:
+                dataset[start:] = values[name]
+        return start
+
+    # Record the detections of one file
+    def add_file(self, content_hash, n_windows, detections):
+        """
+        Append the detections of newly analyzed audio.
+
+        Parameters
+        ----------
+        content_hash : str
+            Content hash of the file.
+        n_windows : int
+            Number of 3-second windows scored.
+        detections : dict of np.ndarray
+            Columns 'start', 'end', 'label', and 'confidence'.
+        """
+        row = self._h5["files/hash"].shape[0]
+        values = dict(detections, file=np.full(len(detections["label"]), row))
+        self._append("detections", DETECTION_COLUMNS, values)
+        self._append(
+            "files",
+            FILE_COLUMNS,
+            {"hash": [content_hash.encode()], "n_windows": [n_windows]},
+        )
+        self._h5.flush()
+        self._hash_rows[content_hash.encode()] = row
+
+    # Record the path of analyzed audio
+    def add_path(self, key, input_path, content_hash):
+        """
+        Record that a path holds audio whose detections are stored.
+
+        Parameters
+        ----------
+        key : str
+            Path relative to the input directory.
+        input_path : Path
+            Absolute path of the file.
+        content_hash : str
+            Content hash of the file, already added with 'add_file'.
+        """
+        stat = os.stat(input_path)
+        file_row = self._hash_rows[content_hash.encode()]
+        self._append(
+            "paths",
+            PATH_COLUMNS,
+            {
+                "path": [key],
+                "size": [stat.st_size],
+                "mtime_ns": [stat.st_mtime_ns],
+                "file": [file_row],
+            },
+        )
+        self._h5.flush()
+        self._path_rows[key] = (file_row, stat.st_size, stat.st_mtime_ns)
+
+    # Select detections for export
+    def select(self, species, confidence_threshold):
+        """
+        Collect detection windows of one species per path.
+
+        Parameters
+        ----------
+        species : str
+            Common name of the species.
+        confidence_threshold : float
+            Minimum confidence, clipped to [0.01, 0.99] as birdnetlib does;
+            detections must exceed it.
+
+        Returns
+        -------
+        dict
+            Mapping from path (relative to the input directory) to a list of
+            (start_s, end_s) windows, in time order.
+        """
+        threshold = max(0.01, min(confidence_threshold, 0.99))
+        if threshold < self.min_confidence:
+            raise ValueError(
+                f"Threshold {threshold} is below the store's confidence floor "
+                f"{self.min_confidence}; rerun detection into a new store"
+            )
+        columns = [
+            i for i, label in enumerate(self.labels) if label.split("_")[1] == species
+        ]
+        if not columns or not self.path.exists():
+            return {}
+
+        with h5py.File(self.path, "r") as hf:
+            label = hf["detections/label"][:]
+            confidence = hf["detections/confidence"][:]
+            keep = np.isin(label, columns) & (confidence > threshold)
+            file_col = hf["detections/file"][:][keep]
+            start = hf["detections/start"][:][keep]
+            end = hf["detections/end"][:][keep]
+
+        # Windows per file row, deduplicated across labels of the species
+        windows: Dict[int, list] = {}
+        for f, s, e in sorted(
+            set(zip(file_col.tolist(), start.tolist(), end.tolist()))
+        ):
+            windows.setdefault(f, []).append((s, e))
+
+        return {
+            key: windows[record[0]]
+            for key, record in self._path_rows.items()
+            if record[0] in windows
+        }
+
+
+def default_detections_path(output_dir: Path, name: Optional[str] = None) -> Path:
+    """
+    Return the detection store location next to a clip output directory.
+
+    Parameters
+    ----------
+    output_dir : Path
+        Directory receiving exported clips.
+    name : str, optional
+        File name. Defaults to '<output_dir name>_detections.h5'.
+
+    Returns
+    -------
+    Path
+        Path of the detection store, a sibling of 'output_dir'.
+    """
+    output_dir = Path(output_dir)
+    if name is None:
+        name = f"{output_dir.name}_detections.h5"
+    return output_dir.parent / name
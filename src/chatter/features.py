@@ -12,7 +12,6 @@ import json  # noqa: E402
 from pathlib import Path  # noqa: E402
 from types import SimpleNamespace  # noqa: E402
 
-import h5py  # noqa: E402
 import matplotlib.patches as patches  # noqa: E402
 import matplotlib.pyplot as plt  # noqa: E402
 import numpy as np  # noqa: E402
@@ -70,6 +69,7 @@ except ImportError:
 
 # Import local modules
 from .config import set_plot_style  # noqa: E402
+from .storage import SpectrogramReader  # noqa: E402
 
 
 # Constants for frequency statistics and visualization
@@ -660,7 +660,7 @@ class FeatureProcessor:
         """
         Compute minimum, mean, and maximum frequency statistics for each unit.
 
-        This method loads spectrograms from the HDF5 file and calculates frequency
+        This method loads spectrograms from the store and calculates frequency
         statistics for each time bin of each unit. It always updates the internal
         DataFrame in place with summary statistics (global min, mean, max per unit),
         and can optionally return detailed per-time-bin traces.
@@ -668,7 +668,8 @@ class FeatureProcessor:
         Parameters
         ----------
         h5_path : str or Path
-            Path to the HDF5 file containing the spectrograms dataset.
+            Path to the HDF5 file containing the spectrograms dataset, or to
+            a flat '.npy' store.
         return_traces : bool, optional
             If True, returns a dictionary with detailed per-time-bin frequency
             traces for each unit. If False (default), returns the FeatureProcessor
@@ -787,8 +788,7 @@ class FeatureProcessor:
         if "h5_index" not in self.df.columns:
             raise ValueError("DataFrame must contain 'h5_index' column.")
 
-        with h5py.File(h5_path, "r", libver="latest", swmr=True) as hf:
-            dataset = hf["spectrograms"]
+        with SpectrogramReader(h5_path) as dataset:
 
             # Iterate with progress bar
             for idx, row in tqdm(
@@ -977,7 +977,8 @@ class FeatureProcessor:
         Parameters
         ----------
         h5_path : str or Path
-            Path to the HDF5 file containing the spectrograms dataset.
+            Path to the HDF5 file containing the spectrograms dataset, or to
+            a flat '.npy' store.
         output_html : str or Path
             Path at which to save the resulting HTML file.
         thumb_size : int, optional
@@ -1005,7 +1006,7 @@ class FeatureProcessor:
         if "h5_index" not in self.df.columns:
             raise ValueError(
                 "interactive_embedding_plot requires an 'h5_index' "
-                "column to locate spectrograms in the HDF5 file."
+                "column to locate spectrograms in the store."
             )
 
         coords = self.df[["pacmap_x", "pacmap_y"]].to_numpy()
@@ -1060,8 +1061,7 @@ class FeatureProcessor:
         # Pre-render spectrogram thumbnails and encode as base64 PNGs
         print("--- Encoding spectrogram thumbnails for HTML export ---")
         thumbs: list[str] = []
-        with h5py.File(h5_path, "r", libver="latest", swmr=True) as hf:
-            dataset = hf["spectrograms"]
+        with SpectrogramReader(h5_path) as dataset:
             for _, row in tqdm(
                 self.df.iterrows(),
                 total=len(self.df),
@@ -1325,7 +1325,8 @@ class FeatureProcessor:
         Parameters
         ----------
         h5_path : str or Path
-            Path to the HDF5 file containing the spectrograms dataset.
+            Path to the HDF5 file containing the spectrograms dataset, or to
+            a flat '.npy' store.
         output_path : str or Path, optional
             Path to save the final PNG image. If None, the plot is displayed
             directly using plt.show(). The default is None.
@@ -1470,11 +1471,11 @@ class FeatureProcessor:
         ax.set_ylim(plot_ymin, plot_ymax)
         ax.axis("off")
 
-        # Open HDF5 file to load spectrograms
-        with h5py.File(h5_path, "r", libver="latest", swmr=True) as hf:
+        # Open the store to load spectrograms
+        with SpectrogramReader(h5_path) as store:
 
             def _load_spec(h5_idx):
-                spec_data = hf["spectrograms"][h5_idx]
+                spec_data = store[h5_idx]
                 return (
                     (spec_data.astype(np.float32) / 255.0)
                     if spec_data.dtype == np.uint8
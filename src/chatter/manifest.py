@@ -0,0 +1,489 @@
+"""
+chatter.manifest
+================
+
+Content-hash manifest used to make directory preprocessing incremental and
+resumable, and checkpoints that make segmentation runs resumable.
+"""
+
+# Import necessary libraries
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+# Configuration keys that change the output of preprocessing
+PREPROCESS_CONFIG_KEYS = (
+    "sr",
+    "high_pass",
+    "low_pass",
+    "target_dbfs",
+    "threshold",
+    "compressor_amount",
+    "limiter_amount",
+    "static",
+    "fade_ms",
+    "use_biodenoising",
+    "biodenoising_model",
+    "biodenoising_chunk_seconds",
+    "use_noisereduce",
+    "noise_floor",
+    "preprocess_engine",
+    "audio_backend",
+    "resampler",
+    "stream_chunk_seconds",
+    "stream_overlap_seconds",
+    "noise_profile_groups",
+    "noise_profile_seconds",
+    "noise_profile_files",
+)
+
+# Configuration keys that change the output of segmentation
+SEGMENTATION_CONFIG_KEYS = (
+    "sr",
+    "n_fft",
+    "win_length",
+    "hop_length",
+    "n_mels",
+    "fmin",
+    "fmax",
+    "target_shape",
+    "static",
+    "skip_noise",
+    "split_seconds",
+    "split_overlap_seconds",
+    "simple_noise_floor",
+    "simple_silence_threshold_db",
+    "simple_min_silence_length",
+    "simple_max_unit_length",
+    "simple_min_unit_length",
+    "pykanto_noise_floor",
+    "pykanto_top_dB",
+    "pykanto_max_dB",
+    "pykanto_dB_delta",
+    "pykanto_min_silence_length",
+    "pykanto_max_unit_length",
+    "pykanto_min_unit_length",
+    "pykanto_gauss_sigma",
+    "pykanto_silence_threshold",
+)
+
+
+def config_hash(config: Dict[str, Any], keys: Iterable[str]) -> str:
+    """
+    Hash the values of selected configuration keys.
+
+    Parameters
+    ----------
+    config : dict
+        Configuration dictionary.
+    keys : iterable of str
+        Keys whose values should contribute to the hash. Missing keys are
+        hashed as None.
+
+    Returns
+    -------
+    str
+        Hex digest identifying this combination of settings.
+    """
+    subset = {key: config.get(key) for key in sorted(keys)}
+    payload = json.dumps(subset, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf8")).hexdigest()[:16]
+
+
+def file_content_hash(path: Path, block_size: int = 1 << 20) -> str:
+    """
+    Compute a BLAKE2b digest of a file's contents, reading in blocks.
+
+    Parameters
+    ----------
+    path : Path
+        File to hash.
+    block_size : int, optional
+        Number of bytes read per iteration. The default is 1 MiB.
+
+    Returns
+    -------
+    str
+        Hex digest of the file contents.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PreprocessManifest:
+    """
+    Append-only record of which input files have been preprocessed.
+
+    Each successfully processed input file is recorded with its size,
+    modification time, optional content hash, and a hash of the
+    preprocessing-relevant configuration keys. Records are appended to a
+    JSON Lines journal and flushed immediately, so an interrupted run can
+    be resumed and only unfinished or stale files are redone. When a key
+    appears several times, the last record wins.
+
+    Attributes
+    ----------
+    path : Path
+        Location of the JSON Lines journal.
+    config_hash : str
+        Hash of the preprocessing configuration for the current run.
+    hash_contents : bool
+        Whether file contents are hashed to confirm changes when size or
+        modification time differ from the recorded values.
+    entries : dict
+        Mapping from input path (relative to the input directory) to its
+        most recent record.
+    """
+
+    # Initialize manifest
+    def __init__(self, path, config, hash_contents=False):
+        """
+        Load an existing manifest journal or start a new one.
+
+        Parameters
+        ----------
+        path : str or Path
+            Location of the JSON Lines journal.
+        config : dict
+            Configuration dictionary for the current run.
+        hash_contents : bool, optional
+            If True, store a content hash for each file and use it to decide
+            whether a file whose size or modification time changed really
+            needs to be reprocessed. The default is False.
+        """
+        self.path = Path(path)
+        self.config_hash = config_hash(config, PREPROCESS_CONFIG_KEYS)
+        self.hash_contents = hash_contents
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._n_lines = 0
+        self._fh = None
+        self._load()
+
+    # Read journal from disk
+    def _load(self):
+        """
+        Read all records from the journal, skipping a truncated final line.
+        """
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf8") as fh:
+            for line in fh:
+                self._n_lines += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a partially written last line
+                    continue
+                self.entries[record["input"]] = record
+
+    # Decide whether a file must be processed
+    def is_stale(self, input_path, key, output_path):
+        """
+        Check whether an input file needs (re)processing.
+
+        Parameters
+        ----------
+        input_path : Path
+            Absolute path to the input file.
+        key : str
+            Manifest key for the file (its path relative to the input
+            directory).
+        output_path : Path
+            Expected location of the processed output.
+
+        Returns
+        -------
+        bool
+            True if the file is new, changed, was processed with different
+            settings, or its output is missing.
+        """
+        record = self.entries.get(key)
+        if record is None or record.get("config_hash") != self.config_hash:
+            return True
+        if not Path(output_path).exists():
+            return True
+
+        # Unchanged size and modification time mean the file is up to date
+        stat = os.stat(input_path)
+        if stat.st_size == record["size"] and stat.st_mtime_ns == record["mtime_ns"]:
+            return False
+
+        # Otherwise fall back to the content hash when available
+        if self.hash_contents and stat.st_size == record["size"]:
+            if record.get("content_hash") == file_content_hash(input_path):
+                # Refresh the stored modification time to avoid rehashing
+                self.record(input_path, key, output_path, record["content_hash"])
+                return False
+        return True
+
+    # Record a processed file
+    def record(self, input_path, key, output_path, content_hash=None):
+        """
+        Append a record for a successfully processed file.
+
+        Parameters
+        ----------
+        input_path : Path
+            Absolute path to the input file.
+        key : str
+            Manifest key for the file.
+        output_path : Path
+            Location of the processed output.
+        content_hash : str, optional
+            Precomputed content hash. If None and 'hash_contents' is True,
+            the hash is computed here.
+        """
+        stat = os.stat(input_path)
+        if content_hash is None and self.hash_contents:
+            content_hash = file_content_hash(input_path)
+
+        entry = {
+            "input": key,
+            "output": str(output_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "content_hash": content_hash,
+            "config_hash": self.config_hash,
+        }
+        self.entries[key] = entry
+
+        # Append and flush so the record survives a crash of this process
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf8")
+        self._fh.write(json.dumps(entry) + "\n")
+        self._fh.flush()
+        self._n_lines += 1
+
+    # Rewrite journal without superseded records
+    def compact(self):
+        """
+        Atomically rewrite the journal with one record per file.
+        """
+        self.close()
+        if self._n_lines <= len(self.entries):
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf8") as fh:
+            for entry in self.entries.values():
+                fh.write(json.dumps(entry) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.path)
+        self._n_lines = len(self.entries)
+
+    # Close journal
+    def close(self):
+        """
+        Flush and close the journal file handle if it is open.
+        """
+        if self._fh is not None:
+            os.fsync(self._fh.fileno())
+            self._fh.close()
+            self._fh = None
+
+
+class SegmentationCheckpoint:
+    """
+    Progress record that lets an interrupted segmentation run resume.
+
+    A checkpoint is a small JSON file listing the files whose units are
+    committed, the number of committed rows of the 'spectrograms' dataset,
+    the accumulated drop statistics, and the length of a JSON Lines journal
+    holding the committed metadata rows. 'commit' appends new rows to the
+    journal and syncs it before atomically replacing the JSON file, so the
+    checkpoint on disk always describes a consistent prefix of the output.
+    Anything written after the last commit (units past 'n_units', journal
+    bytes past the recorded length) is discarded on resume.
+
+    Attributes
+    ----------
+    path : Path
+        Location of the JSON checkpoint.
+    rows_path : Path
+        Location of the metadata journal.
+    config_hash : str
+        Hash of the segmentation configuration and mode of the current run.
+    resumed : bool
+        Whether a matching checkpoint was loaded.
+    files : set of str
+        Committed files, as paths relative to the processed directory.
+    n_units : int
+        Number of committed units.
+    rows : list of dict
+        Committed metadata rows.
+    dropped : dict
+        Committed drop statistics.
+    """
+
+    # Load a matching checkpoint or start from scratch
+    def __init__(self, path, config, mode=None, resume=False):
+        """
+        Open the checkpoint of a segmentation run.
+
+        Parameters
+        ----------
+        path : str or Path
+            Location of the JSON checkpoint.
+        config : dict
+            Configuration dictionary for the current run.
+        mode : dict, optional
+            Other settings that change the output (segmentation method,
+            pre-segmentation CSV, preprocessing settings of a fused run),
+            hashed with the configuration.
+        resume : bool, optional
+            If True, load an existing checkpoint written with the same
+            settings. Otherwise, or if the settings differ, any existing
+            checkpoint is removed. The default is False.
+        """
+        self.path = Path(path)
+        self.rows_path = self.path.with_name(f"{self.path.stem}_rows.jsonl")
+        self.config_hash = config_hash(
+            dict(config, mode=mode), SEGMENTATION_CONFIG_KEYS + ("mode",)
+        )
+        self.resumed = False
+        self.files = set()
+        self.n_units = 0
+        self.rows = []
+        self.dropped = {}
+        self._rows_bytes = 0
+
+        if resume and self.path.exists():
+            self._load()
+        if not self.resumed:
+            self.remove()
+
+    # Read the checkpoint and its journal
+    def _load(self):
+        """
+        Read a checkpoint written with the current settings and cut its
+        journal back to the committed length.
+        """
+        with open(self.path, "r", encoding="utf8") as fh:
+            state = json.load(fh)
+        if state.get("config_hash") != self.config_hash:
+            print("--- Checkpoint settings differ from this run; starting over ---")
+            return
+
+        # Drop rows appended after the last commit
+        self._rows_bytes = state["rows_bytes"]
+        if self._rows_bytes:
+            with open(self.rows_path, "r+b") as fh:
+                fh.truncate(self._rows_bytes)
+                fh.seek(0)
+                self.rows = [json.loads(line) for line in fh]
+
+        self.files = set(state["files"])
+        self.n_units = state["n_units"]
+        self.dropped = state["dropped"]
+        self.resumed = True
+
+    # Record progress
+    def commit(self, n_units, files, rows, dropped):
+        """
+        Durably record newly committed files and rows.
+
+        The caller must make sure the first 'n_units' units are flushed to
+        the HDF5 file before committing.
+
+        Parameters
+        ----------
+        n_units : int
+            Number of units in the HDF5 file.
+        files : iterable of str
+            Files committed since the last call.
+        rows : list of dict
+            Metadata rows added since the last call.
+        dropped : dict
+            Drop statistics accumulated so far.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.rows_path, "ab") as fh:
+            fh.truncate(self._rows_bytes)
+            for row in rows:
+                fh.write((json.dumps(row, default=_json_scalar) + "\n").encode("utf8"))
+            fh.flush()
+            os.fsync(fh.fileno())
+            rows_bytes = fh.tell()
+
+        self.files.update(files)
+        state = {
+            "config_hash": self.config_hash,
+            "files": sorted(self.files),
+            "n_units": int(n_units),
+            "rows_bytes": rows_bytes,
+            "dropped": {k: int(v) for k, v in dropped.items()},
+        }
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf8") as fh:
+            json.dump(state, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.path)
+
+        self.rows.extend(rows)
+        self.n_units = int(n_units)
+        self._rows_bytes = rows_bytes
+
+    # Delete the checkpoint and its journal
+    def remove(self):
+        """
+        Delete the checkpoint files, once a run has finished or restarts.
+        """
+        self.path.unlink(missing_ok=True)
+        self.rows_path.unlink(missing_ok=True)
+
+
+# Convert NumPy scalars in metadata for JSON
+def _json_scalar(value):
+    """
+    Return a JSON-serializable version of a NumPy scalar or other value.
+    """
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def default_checkpoint_path(h5_path: Path) -> Path:
+    """
+    Return the segmentation checkpoint location stored next to an HDF5 file.
+
+    Parameters
+    ----------
+    h5_path : Path
+        Output HDF5 file of a segmentation run.
+
+    Returns
+    -------
+    Path
+        Sibling file '<h5 stem>_checkpoint.json'.
+    """
+    h5_path = Path(h5_path)
+    return h5_path.with_name(f"{h5_path.stem}_checkpoint.json")
+
+
+def default_manifest_path(processed_dir: Path, name: Optional[str] = None) -> Path:
+    """
+    Return the manifest location stored next to a processed directory.
+
+    Parameters
+    ----------
+    processed_dir : Path
+        Directory holding processed outputs.
+    name : str, optional
+        Manifest file name. Defaults to '<processed_dir name>_manifest.jsonl'.
+
+    Returns
+    -------
+    Path
+        Path of the manifest journal, a sibling of 'processed_dir'.
+    """
+    processed_dir = Path(processed_dir)
+    if name is None:
+        name = f"{processed_dir.name}_manifest.jsonl"
+    return processed_dir.parent / name
@@ -0,0 +1,303 @@
+"""
+chatter.noise
+=============
+
+Per-site noise profiles for stationary noise reduction.
+
+Fixed recorders have a stable noise floor, so instead of letting
+noisereduce estimate noise statistics from every file, a profile is built
+once per recorder group from the quietest stretches of a few of its
+recordings, cached on disk, and reused as the noise clip for every file in
+that group.
+"""
+
+# Import necessary libraries
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from noisereduce.spectralgate.stationary import SpectralGateStationary
+
+from .manifest import config_hash
+
+# Configuration keys that change the audio a profile is estimated from
+NOISE_PROFILE_CONFIG_KEYS = (
+    "sr",
+    "high_pass",
+    "low_pass",
+    "target_dbfs",
+    "fade_ms",
+    "use_biodenoising",
+    "biodenoising_model",
+    "biodenoising_chunk_seconds",
+    "preprocess_engine",
+    "audio_backend",
+    "resampler",
+    "noise_profile_seconds",
+    "noise_profile_files",
+)
+
+# Stationary gate settings used by 'noisereduce.reduce_noise' by default
+_GATE_DEFAULTS = dict(
+    prop_decrease=1.0,
+    chunk_size=600000,
+    padding=30000,
+    n_fft=1024,
+    win_length=None,
+    hop_length=None,
+    time_constant_s=2.0,
+    freq_mask_smooth_hz=500,
+    time_mask_smooth_ms=50,
+    tmp_folder=None,
+    use_tqdm=False,
+)
+
+
+# Map files to recorder groups
+def assign_noise_groups(files, input_dir, groups):
+    """
+    Assign each audio file to a noise profile group.
+
+    Parameters
+    ----------
+    files : iterable of Path
+        Audio files located under 'input_dir'.
+    input_dir : Path
+        Root directory of the recordings.
+    groups : None, str, or dict
+        Grouping rule. None disables noise profiles. "directory" groups
+        files by their parent directory relative to 'input_dir'. A dict maps
+        relative file or directory paths (e.g., "site_a" or
+        "site_a/rec1.wav") to group labels; the most specific match wins
+        and unmatched files are left ungrouped.
+
+    Returns
+    -------
+    dict
+        Mapping from each grouped file to its group label.
+    """
+    if groups is None:
+        return {}
+    if groups != "directory" and not isinstance(groups, dict):
+        raise ValueError(
+            f"Unknown noise_profile_groups {groups!r}; use None, 'directory', or a dict"
+        )
+
+    input_dir = Path(input_dir)
+    assigned = {}
+    for path in files:
+        relative = Path(path).relative_to(input_dir)
+        if groups == "directory":
+            assigned[path] = relative.parent.as_posix()
+            continue
+
+        # Check the file itself, then each enclosing directory
+        for candidate in (relative, *relative.parents):
+            label = groups.get(candidate.as_posix())
+            if label is not None:
+                assigned[path] = str(label)
+                break
+
+    return assigned
+
+
+# Location of a cached profile
+def noise_profile_path(profile_dir, group, config):
+    """
+    Return the cache file of a group's noise profile.
+
+    Parameters
+    ----------
+    profile_dir : str or Path
+        Directory holding cached profiles.
+    group : str
+        Group label.
+    config : dict
+        Configuration dictionary. Profiles are keyed by the values of
+        'NOISE_PROFILE_CONFIG_KEYS', so changing any of them builds a new one.
+
+    Returns
+    -------
+    Path
+        Path of the '.npy' profile.
+    """
+    safe_group = re.sub(r"[^\w.-]+", "_", group).strip("_.") or "root"
+    digest = config_hash(config, NOISE_PROFILE_CONFIG_KEYS)
+    return Path(profile_dir) / f"{safe_group}_{digest}.npy"
+
+
+# Default cache directory next to an output location
+def default_noise_profile_dir(output_path):
+    """
+    Return the profile cache stored next to an output file or directory.
+
+    Parameters
+    ----------
+    output_path : str or Path
+        Processed directory or HDF5 file the profiles are used for.
+
+    Returns
+    -------
+    Path
+        Sibling directory '<output stem>_noise_profiles'.
+    """
+    output_path = Path(output_path)
+    return output_path.parent / f"{output_path.stem}_noise_profiles"
+
+
+# Pick the quietest stretches of several signals
+def select_noise_blocks(signals, sr, seconds, block_seconds=1.0):
+    """
+    Concatenate the quietest blocks of several signals into a noise clip.
+
+    Parameters
+    ----------
+    signals : list of np.ndarray
+        Mono float audio at 'sr', as seen by the noise reduction stage.
+    sr : int
+        Sample rate in Hz.
+    seconds : float
+        Length of the clip to assemble.
+    block_seconds : float, optional
+        Length of the blocks ranked by RMS level. The default is 1.0.
+
+    Returns
+    -------
+    np.ndarray
+        Float32 noise clip of at most 'seconds' seconds, with blocks kept in
+        their original order.
+    """
+    block = max(int(block_seconds * sr), 1)
+    blocks = []
+    for signal in signals:
+        n_blocks = len(signal) // block
+        if n_blocks == 0:
+            # Keep short recordings whole rather than dropping them
+            if len(signal):
+                blocks.append(np.asarray(signal, dtype=np.float32))
+            continue
+        frames = np.asarray(signal[: n_blocks * block], dtype=np.float32)
+        blocks.extend(frames.reshape(n_blocks, block))
+
+    if not blocks:
+        raise ValueError("No audio available to estimate a noise profile")
+
+    # Rank blocks by RMS level and keep the quietest ones up to 'seconds'
+    levels = [np.sqrt(np.mean(np.square(b, dtype=np.float64))) for b in blocks]
+    budget = max(int(seconds * sr), 1)
+    chosen, total = [], 0
+    for idx in np.argsort(levels, kind="stable"):
+        if total >= budget:
+            break
+        chosen.append(idx)
+        total += len(blocks[idx])
+
+    return np.concatenate([blocks[idx] for idx in sorted(chosen)])[:budget]
+
+
+# Write a profile atomically
+def save_noise_profile(noise, path):
+    """
+    Save a noise clip so that concurrent readers never see a partial file.
+
+    Parameters
+    ----------
+    noise : np.ndarray
+        Float32 noise clip.
+    path : str or Path
+        Destination '.npy' file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+    np.save(tmp_path, np.asarray(noise, dtype=np.float32))
+    os.replace(tmp_path, path)
+
+
+# Load a profile once per process
+@lru_cache(maxsize=32)
+def load_noise_profile(path):
+    """
+    Load a cached noise clip, reusing it across calls in the same process.
+
+    Parameters
+    ----------
+    path : str
+        Path of the '.npy' profile.
+
+    Returns
+    -------
+    np.ndarray
+        Read-only float32 noise clip.
+    """
+    noise = np.load(path)
+    noise.setflags(write=False)
+    return noise
+
+
+# Noise statistics of a profile, computed once per process
+@lru_cache(maxsize=32)
+def _noise_thresholds(path, sr, n_std):
+    """
+    Compute the per-frequency noise mean and gate threshold of a profile.
+    """
+    noise = load_noise_profile(path)
+    gate = SpectralGateStationary(
+        y=noise,
+        sr=sr,
+        y_noise=noise,
+        n_std_thresh_stationary=n_std,
+        clip_noise_stationary=False,
+        n_jobs=1,
+        **_GATE_DEFAULTS,
+    )
+    return gate.mean_freq_noise, gate.noise_thresh
+
+
+# Stationary spectral gating with a cached noise profile
+def reduce_noise_with_profile(y, sr, profile_path, n_std, n_jobs=1):
+    """
+    Apply stationary noise reduction using a cached group noise profile.
+
+    Equivalent to 'noisereduce.reduce_noise(y, sr, stationary=True,
+    y_noise=profile, clip_noise_stationary=False)', but the STFT statistics
+    of the profile are computed once per process instead of once per file.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Mono float audio.
+    sr : int
+        Sample rate in Hz.
+    profile_path : str or Path
+        Path of the '.npy' profile.
+    n_std : float
+        Number of standard deviations above the noise mean at which the gate
+        opens ('n_std_thresh_stationary').
+    n_jobs : int, optional
+        Number of noisereduce workers. The default is 1.
+
+    Returns
+    -------
+    np.ndarray
+        Denoised audio with the same shape as 'y'.
+    """
+    profile_path = str(profile_path)
+    mean_freq_noise, noise_thresh = _noise_thresholds(profile_path, sr, n_std)
+
+    # A single frame of the profile keeps the gate's own statistics pass trivial
+    noise = load_noise_profile(profile_path)
+    gate = SpectralGateStationary(
+        y=y,
+        sr=sr,
+        y_noise=noise[: _GATE_DEFAULTS["n_fft"]],
+        n_std_thresh_stationary=n_std,
+        clip_noise_stationary=False,
+        n_jobs=n_jobs,
+        **_GATE_DEFAULTS,
+    )
+    gate.mean_freq_noise = mean_freq_noise
+    gate.noise_thresh = noise_thresh
+    return gate.get_traces()
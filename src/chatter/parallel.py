@@ -0,0 +1,319 @@
+"""
+chatter.parallel
+================
+
+Thread budget shared between process pool workers and the threaded
+libraries (BLAS/OpenMP, torch, numba, noisereduce) running inside them,
+and scheduling helpers that keep every worker busy until a run ends.
+"""
+
+# Import necessary libraries
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Optional imports with fallbacks
+try:
+    from threadpoolctl import threadpool_limits
+
+    THREADPOOLCTL_AVAILABLE = True
+except ImportError:
+    THREADPOOLCTL_AVAILABLE = False
+
+# Environment variables read by native thread pools when they start
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def resolve_thread_budget(
+    n_jobs: Optional[int] = -1,
+    threads_per_job: Optional[int] = None,
+    n_cores: Optional[int] = None,
+) -> Tuple[int, int]:
+    """
+    Split the available cores into worker processes and threads per process.
+
+    Parameters
+    ----------
+    n_jobs : int, optional
+        Number of worker processes. If -1 or None, use as many processes as
+        fit in 'n_cores' given 'threads_per_job'. The default is -1.
+    threads_per_job : int, optional
+        Number of threads each worker may use in native libraries. If None,
+        the cores are divided evenly between the workers. The default is
+        None.
+    n_cores : int, optional
+        Total number of cores to budget. Defaults to 'os.cpu_count()'.
+
+    Returns
+    -------
+    tuple of int
+        The resolved (n_jobs, threads_per_job), both at least 1.
+    """
+    if n_cores is None:
+        n_cores = os.cpu_count() or 1
+
+    # Fill in whichever side of the split was not given
+    if n_jobs is None or n_jobs == -1:
+        n_jobs = n_cores // threads_per_job if threads_per_job else n_cores
+    if threads_per_job is None:
+        threads_per_job = n_cores // max(n_jobs, 1)
+
+    return max(int(n_jobs), 1), max(int(threads_per_job), 1)
+
+
+def candidate_splits(n_cores: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    List (n_jobs, threads_per_job) splits that use all cores.
+
+    Parameters
+    ----------
+    n_cores : int, optional
+        Total number of cores. Defaults to 'os.cpu_count()'.
+
+    Returns
+    -------
+    list of tuple of int
+        One split for every power-of-two thread count up to 'n_cores',
+        from most processes to fewest.
+    """
+    if n_cores is None:
+        n_cores = os.cpu_count() or 1
+
+    splits = []
+    threads = 1
+    while threads <= n_cores:
+        splits.append((n_cores // threads, threads))
+        threads *= 2
+    return splits
+
+
+def limit_worker_threads(n_threads: Optional[int]) -> None:
+    """
+    Cap the threads used by native libraries in the current process.
+
+    Intended as a 'ProcessPoolExecutor' initializer. Sets the usual thread
+    environment variables (for libraries that start later), limits already
+    loaded BLAS/OpenMP pools through threadpoolctl when available, and
+    applies the same limit to torch and numba.
+
+    Parameters
+    ----------
+    n_threads : int or None
+        Maximum number of threads per library. If None, nothing is changed.
+    """
+    if not n_threads:
+        return
+    n_threads = int(n_threads)
+
+    # Pools that have not started yet read these on initialization
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(n_threads)
+
+    # Pools that are already loaded (inherited by forked workers)
+    if THREADPOOLCTL_AVAILABLE:
+        threadpool_limits(limits=n_threads)
+
+    # Torch intra-op pool used by biodenoising
+    try:
+        import torch
+
+        torch.set_num_threads(n_threads)
+    except ImportError:
+        pass
+
+    # Numba parallel regions cannot exceed the pool size set at import time
+    try:
+        import numba
+
+        numba.set_num_threads(min(n_threads, numba.config.NUMBA_NUM_THREADS))
+    except ImportError:
+        pass
+
+
+def longest_first(items: Sequence[Any], durations: Sequence[Optional[float]]) -> list:
+    """
+    Order items by decreasing duration (longest-processing-time-first).
+
+    Starting the longest tasks first keeps a few long files from running
+    alone at the end of a run while the other workers sit idle.
+
+    Parameters
+    ----------
+    items : sequence
+        Items to schedule.
+    durations : sequence of float or None
+        Expected duration of each item. Unknown durations (None) are
+        scheduled first, since they may be the longest.
+
+    Returns
+    -------
+    list
+        'items' reordered; ties keep their original order.
+    """
+    keys = [float("inf") if d is None else d for d in durations]
+    order = sorted(range(len(items)), key=lambda i: -keys[i])
+    return [items[i] for i in order]
+
+
+def split_windows(
+    n_samples: int, max_samples: int, overlap: int, align: int = 1
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Cut a signal into overlapping windows whose cores tile it exactly.
+
+    Parameters
+    ----------
+    n_samples : int
+        Length of the signal.
+    max_samples : int
+        Maximum core length of a window. Signals no longer than this give a
+        single window.
+    overlap : int
+        Context added on each side of a core.
+    align : int, optional
+        Window and core boundaries are multiples of 'align' samples (e.g.,
+        the STFT hop length, so frames line up with the whole signal). The
+        default is 1.
+
+    Returns
+    -------
+    list of tuple of int
+        (start, stop, core_start, core_stop) per window. Every sample lies in
+        exactly one core, and each window extends its core by up to
+        'overlap' samples on both sides.
+    """
+    if n_samples <= max_samples:
+        return [(0, n_samples, 0, n_samples)]
+
+    align = max(int(align), 1)
+    step = max(max_samples // align, 1) * align
+    overlap = -(-int(overlap) // align) * align
+
+    windows = []
+    for core_start in range(0, n_samples, step):
+        core_stop = min(core_start + step, n_samples)
+        windows.append(
+            (
+                max(core_start - overlap, 0),
+                min(core_stop + overlap, n_samples),
+                core_start,
+                core_stop,
+            )
+        )
+    return windows
+
+
+class TaskTimeline:
+    """
+    Record task completions to measure how long workers idle at the end.
+
+    Once the queue is empty, each worker that finishes its last task waits
+    for the slowest one. The tail idle time is the sum of those waits, in
+    worker-seconds, plus the whole run for workers that never got a task.
+
+    Parameters
+    ----------
+    n_workers : int
+        Number of workers in the pool.
+    """
+
+    def __init__(self, n_workers: int):
+        self.n_workers = max(int(n_workers), 1)
+        self.start = time.perf_counter()
+        self.completions: List[float] = []
+
+    def mark(self) -> None:
+        """
+        Record that a task has just completed.
+        """
+        self.completions.append(time.perf_counter())
+
+    def tail_idle(self) -> Tuple[float, float]:
+        """
+        Return the tail idle time and its share of the pool's time.
+
+        Returns
+        -------
+        tuple of float
+            (idle worker-seconds, fraction of n_workers * wall time).
+        """
+        if not self.completions:
+            return 0.0, 0.0
+        end = max(self.completions)
+        wall = end - self.start
+        last = sorted(self.completions)[-self.n_workers :]
+        unused = max(self.n_workers - len(self.completions), 0)
+        idle = sum(end - t for t in last) + unused * wall
+        return idle, idle / (self.n_workers * wall) if wall > 0 else 0.0
+
+    def report(self) -> str:
+        """
+        Format the tail idle time for printing.
+        """
+        idle, fraction = self.tail_idle()
+        return (
+            f"Tail idle: {idle:.1f} worker-seconds "
+            f"({100 * fraction:.1f}% of {self.n_workers} workers' time)"
+        )
+
+
+def iter_completed(
+    executor: Any,
+    tasks: Iterable[Tuple[Any, Any, tuple]],
+    max_pending: int,
+    timeline: Optional[TaskTimeline] = None,
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Submit tasks in order, keeping at most 'max_pending' in flight.
+
+    Unlike submitting fixed batches and waiting for each to finish, a new
+    task is submitted as soon as any running one completes, so workers do
+    not idle at batch boundaries and the submission order is preserved.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor
+        Pool to submit to.
+    tasks : iterable of tuple
+        (key, fn, args) triples; 'fn(*args)' is submitted and 'key' is
+        returned with its future.
+    max_pending : int
+        Maximum number of submitted tasks that have not completed.
+    timeline : TaskTimeline, optional
+        If given, every completion is recorded in it.
+
+    Yields
+    ------
+    tuple
+        (key, future) for each task, in completion order.
+    """
+    tasks = iter(tasks)
+    max_pending = max(int(max_pending), 1)
+    pending = {}
+    exhausted = False
+
+    while True:
+        # Top up the pending set
+        while not exhausted and len(pending) < max_pending:
+            try:
+                key, fn, args = next(tasks)
+            except StopIteration:
+                exhausted = True
+                break
+            pending[executor.submit(fn, *args)] = key
+
+        if not pending:
+            return
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if timeline is not None:
+                timeline.mark()
+            yield pending.pop(future), future
@@ -0,0 +1,219 @@
+"""
+chatter.runs
+============
+
+Compiled kernels for amplitude-based (simple) segmentation.
+
+Simple segmentation thresholds frame-wise RMS levels, extracts runs of
+active frames, merges runs separated by short silences, and keeps units
+within the length limits. The kernels here do all four steps in a single
+pass over the RMS array, and a batched variant processes the RMS arrays of
+many files in parallel. Results match the NumPy workflow exactly.
+"""
+
+# Import necessary libraries
+import numpy as np
+from numba import njit, prange
+
+
+# Find, merge, and filter the active runs of one RMS array
+@njit(cache=True, nogil=True)
+def _active_units(
+    rms_db, threshold, hop_length, sr, duration, min_silence, min_len, max_len, out
+):
+    """
+    Write the units of one RMS array to 'out' and return how many there are.
+
+    'out' must have at least len(rms_db) // 2 + 1 rows.
+    """
+    n_frames = len(rms_db)
+    n_units = 0
+    have_unit = False
+    unit_start = unit_end = 0.0
+
+    frame = 0
+    while frame < n_frames:
+        if not rms_db[frame] > threshold:
+            frame += 1
+            continue
+
+        # Extend the run of active frames, [frame, stop)
+        stop = frame + 1
+        while stop < n_frames and rms_db[stop] > threshold:
+            stop += 1
+        start = frame * hop_length / sr
+        end = min(stop * hop_length / sr, duration)
+        frame = stop + 1
+
+        # Merge with the current unit across a short silence
+        if have_unit and start - unit_end < min_silence:
+            unit_end = end
+            continue
+
+        # Otherwise close the current unit, keeping it if its length fits
+        if have_unit and min_len <= unit_end - unit_start <= max_len:
+            out[n_units, 0] = unit_start
+            out[n_units, 1] = unit_end
+            n_units += 1
+        unit_start, unit_end, have_unit = start, end, True
+
+    if have_unit and min_len <= unit_end - unit_start <= max_len:
+        out[n_units, 0] = unit_start
+        out[n_units, 1] = unit_end
+        n_units += 1
+    return n_units
+
+
+# Run the single-array kernel over many arrays in parallel
+@njit(cache=True, parallel=True)
+def _active_units_batch(
+    values,
+    offsets,
+    out_offsets,
+    threshold,
+    hop_length,
+    sr,
+    durations,
+    min_silence,
+    min_len,
+    max_len,
+    out,
+):
+    """
+    Find the units of concatenated RMS arrays; return units per array.
+    """
+    n_arrays = len(offsets) - 1
+    counts = np.zeros(n_arrays, dtype=np.int64)
+    for i in prange(n_arrays):
+        counts[i] = _active_units(
+            values[offsets[i] : offsets[i + 1]],
+            threshold,
+            hop_length,
+            sr,
+            durations[i],
+            min_silence,
+            min_len,
+            max_len,
+            out[out_offsets[i] : out_offsets[i + 1]],
+        )
+    return counts
+
+
+# Read the simple segmentation parameters
+def _simple_parameters(config, dtype):
+    """
+    Return (threshold, min_silence, min_len, max_len) from a configuration.
+
+    The threshold is cast to the dtype of the RMS levels, as NumPy does when
+    comparing an array with a Python float.
+    """
+    threshold = max(
+        float(config["simple_silence_threshold_db"]),
+        config.get("simple_noise_floor", -60.0),
+    )
+    return (
+        np.dtype(dtype).type(threshold),
+        float(config.get("simple_min_silence_length", 0.1)),
+        float(config.get("simple_min_unit_length", 0.0)),
+        float(config.get("simple_max_unit_length", float("inf"))),
+    )
+
+
+# Segment one file's RMS levels
+def find_active_units(rms_db, n_samples, sr, config):
+    """
+    Find units in frame-wise RMS levels with one compiled pass.
+
+    Frames louder than the larger of 'simple_silence_threshold_db' and
+    'simple_noise_floor' are active. Runs of active frames become intervals
+    in seconds (ends clipped to the audio duration), intervals separated by
+    less than 'simple_min_silence_length' are merged, and merged units
+    outside ['simple_min_unit_length', 'simple_max_unit_length'] are
+    dropped.
+
+    Parameters
+    ----------
+    rms_db : np.ndarray
+        Frame-wise RMS levels in dBFS, one value per hop.
+    n_samples : int
+        Length of the audio in samples.
+    sr : int
+        Sample rate of the audio in Hz.
+    config : dict
+        Configuration dictionary containing 'hop_length' and the 'simple_*'
+        segmentation parameters.
+
+    Returns
+    -------
+    np.ndarray
+        Onset and offset times in seconds with shape (n_units, 2).
+    """
+    rms_db = np.ascontiguousarray(rms_db)
+    threshold, min_silence, min_len, max_len = _simple_parameters(config, rms_db.dtype)
+    out = np.empty((len(rms_db) // 2 + 1, 2), dtype=np.float64)
+    n_units = _active_units(
+        rms_db,
+        threshold,
+        int(config["hop_length"]),
+        float(sr),
+        n_samples / float(sr),
+        min_silence,
+        min_len,
+        max_len,
+        out,
+    )
+    return out[:n_units].copy()
+
+
+# Segment many files' RMS levels at once
+def find_active_units_batch(rms_dbs, n_samples, sr, config):
+    """
+    Find units in the RMS levels of many files in parallel.
+
+    Equivalent to calling 'find_active_units' on each array, but the arrays
+    are processed by one compiled call whose loop over files runs on Numba's
+    thread pool.
+
+    Parameters
+    ----------
+    rms_dbs : list of np.ndarray
+        Frame-wise RMS levels in dBFS of each file, all of one dtype.
+    n_samples : sequence of int
+        Length of each file in samples.
+    sr : int
+        Sample rate of the audio in Hz.
+    config : dict
+        Configuration dictionary containing 'hop_length' and the 'simple_*'
+        segmentation parameters.
+
+    Returns
+    -------
+    list of np.ndarray
+        Onset and offset times in seconds of each file's units, with shape
+        (n_units, 2).
+    """
+    if not len(rms_dbs):
+        return []
+    lengths = np.array([len(rms_db) for rms_db in rms_dbs], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    out_offsets = np.concatenate(([0], np.cumsum(lengths // 2 + 1)))
+    values = np.concatenate(rms_dbs)
+    threshold, min_silence, min_len, max_len = _simple_parameters(config, values.dtype)
+
+    out = np.empty((out_offsets[-1], 2), dtype=np.float64)
+    counts = _active_units_batch(
+        values,
+        offsets,
+        out_offsets,
+        threshold,
+        int(config["hop_length"]),
+        float(sr),
+        np.asarray(n_samples, dtype=np.float64) / float(sr),
+        min_silence,
+        min_len,
+        max_len,
+        out,
+    )
+    return [
+        out[start : start + count].copy() for start, count in zip(out_offsets, counts)
+    ]
@@ -0,0 +1,1103 @@
+"""
+chatter.storage
+===============
+
+Writers and readers for the store of unit spectrograms.
+
+Segmentation workers return unit spectrograms one file at a time. Resizing
+the 'spectrograms' dataset for every file and storing one unit per chunk
+makes HDF5 writes small and scattered, and results that wait in the parent
+until they are written let its memory grow. 'SpectrogramWriter' accepts
+results through a bounded queue, so a producer that outruns the disk
+blocks instead of buffering, and a dedicated thread quantizes them to
+uint8 and coalesces them into large contiguous appends to a dataset whose
+capacity grows geometrically.
+
+Workers quantize their units to uint8 and hand them over in shared memory
+blocks ('SharedUnits'), so only a block name crosses the process boundary
+and the parent's only copy of the data is into HDF5.
+
+Alternatively, each worker appends its units to its own shard file
+('append_to_shard') and the parent only joins the shards at the end with
+an HDF5 virtual dataset ('build_virtual_store'), so that writing scales
+with the number of workers. Readers open the virtual dataset as an
+ordinary 'spectrograms' dataset.
+
+Both layouts use the chunk shape and compression filters set in the
+configuration ('spectrogram_chunks', 'spectrogram_filters'). Blosc filters
+come from hdf5plugin, which is imported here so that any process that
+imports chatter can read them.
+
+A store whose path ends in '.npy' is instead a flat file of raw uint8
+units ('FlatSpectrogramWriter'), which readers memory-map. 'spectrogram_writer'
+and 'SpectrogramReader' pick the backend from the path, so callers can use
+either without knowing which it is.
+"""
+
+# Import necessary libraries
+import json
+import os
+import queue
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import h5py
+import numpy as np
+
+# Optional imports with fallbacks
+try:
+    # Importing registers the plugin filters, so files written with them can
+    # be read anywhere chatter is imported
+    import hdf5plugin
+
+    HDF5PLUGIN_AVAILABLE = True
+except ImportError:
+    HDF5PLUGIN_AVAILABLE = False
+
+
+# Quantize unit spectrograms for storage
+def quantize_units(specs):
+    """
+    Convert unit spectrograms in the [0, 1] range to uint8.
+
+    Parameters
+    ----------
+    specs : list of np.ndarray or np.ndarray
+        Unit spectrograms with values in [0, 1]. uint8 units are returned
+        unchanged, stacked into one array.
+
+    Returns
+    -------
+    np.ndarray
+        uint8 array with shape (n_units, H, W).
+    """
+    arr = np.asarray(specs)
+    if arr.dtype == np.uint8:
+        return arr
+    arr = np.array(specs, dtype=np.float32)
+    return np.rint(np.clip(arr, 0.0, 1.0) * 255.0).astype(np.uint8)
+
+
+# Open a shared memory block without resource tracking
+def _shared_memory(name=None, size=0):
+    """
+    Create (name None) or attach to a shared memory block whose lifetime is
+    managed explicitly, not by the resource tracker of the creating process.
+    """
+    try:
+        return shared_memory.SharedMemory(
+            name=name, create=name is None, size=size, track=False
+        )
+    except TypeError:
+        # Python < 3.13 always tracks blocks; untrack created blocks so a
+        # worker exiting does not unlink blocks the parent has not read yet
+        block = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        if name is None:
+            resource_tracker.unregister(block._name, "shared_memory")
+        return block
+
+
+class SharedUnits:
+    """
+    uint8 unit spectrograms handed from a worker to the parent in shared memory.
+
+    Created in a worker, the object pickles to the block name and shape.
+    The parent copies the units out once with 'copy_into' or 'to_array',
+    which also frees the block; 'release' frees it unread, as does garbage
+    collection of an unread handle in the parent.
+
+    Attributes
+    ----------
+    name : str
+        Name of the shared memory block.
+    shape : tuple of int
+        Shape (n_units, H, W) of the units.
+    """
+
+    # Copy units into a new block
+    def __init__(self, units):
+        """
+        Copy quantized units into a new shared memory block.
+
+        Parameters
+        ----------
+        units : np.ndarray
+            Non-empty uint8 array with shape (n_units, H, W).
+        """
+        block = _shared_memory(size=units.nbytes)
+        np.ndarray(units.shape, dtype=np.uint8, buffer=block.buf)[:] = units
+        self.name, self.shape = block.name, tuple(units.shape)
+        self._released = False
+        block.close()
+
+    # Mark handles unpickled by the parent as owners of their block
+    def __setstate__(self, state):
+        self.__dict__.update(state, _received=True)
+
+    # Free the block of a handle dropped unread, e.g. after an error
+    def __del__(self):
+        if getattr(self, "_received", False):
+            try:
+                self.release()
+            except OSError:
+                pass
+
+    # Number of units
+    def __len__(self):
+        return self.shape[0]
+
+    # Copy the units out and free the block
+    def copy_into(self, out):
+        """
+        Copy the units into 'out' and free the block.
+
+        Parameters
+        ----------
+        out : np.ndarray
+            uint8 array with shape 'shape'.
+        """
+        block = _shared_memory(self.name)
+        try:
+            out[...] = np.ndarray(self.shape, dtype=np.uint8, buffer=block.buf)
+        finally:
+            block.close()
+            block.unlink()
+            self._released = True
+
+    # Copy the units into a new array
+    def to_array(self):
+        """
+        Return the units as a new uint8 array and free the block.
+        """
+        out = np.empty(self.shape, dtype=np.uint8)
+        self.copy_into(out)
+        return out
+
+    # Free the block without reading it
+    def release(self):
+        """
+        Free the block if it has not been read.
+        """
+        if not self._released:
+            block = _shared_memory(self.name)
+            block.close()
+            block.unlink()
+            self._released = True
+
+
+# Prepare unit spectrograms for return from a worker
+def share_units(specs, config):
+    """
+    Quantize unit spectrograms and place them in shared memory.
+
+    Parameters
+    ----------
+    specs : list of np.ndarray
+        Unit spectrograms in the [0, 1] range.
+    config : dict
+        Configuration; 'shared_memory_transfer' set to False disables shared
+        memory.
+
+    Returns
+    -------
+    SharedUnits or np.ndarray
+        Handle of the shared block, or the uint8 array itself if there are no
+        units, shared memory is disabled, or the shared memory file system
+        has less than twice the space needed free.
+    """
+    units = quantize_units(specs)
+    if not len(units) or not config.get("shared_memory_transfer", True):
+        return units
+    try:
+        if os.path.isdir("/dev/shm"):
+            stat = os.statvfs("/dev/shm")
+            if stat.f_bavail * stat.f_frsize < 2 * units.nbytes:
+                return units
+        return SharedUnits(units)
+    except OSError:
+        return units
+
+
+# Take the units of a worker result as an array
+def receive_units(specs):
+    """
+    Return worker units as an array, freeing their shared memory block.
+
+    Parameters
+    ----------
+    specs : SharedUnits, np.ndarray, or list of np.ndarray
+        Units as returned by a worker.
+
+    Returns
+    -------
+    np.ndarray
+        The units.
+    """
+    if isinstance(specs, SharedUnits):
+        return specs.to_array()
+    return np.asarray(specs)
+
+
+# Chunk shape of the spectrograms dataset
+def spectrogram_chunks(config):
+    """
+    Return the HDF5 chunk shape of the 'spectrograms' dataset.
+
+    Parameters
+    ----------
+    config : dict
+        Configuration with 'target_shape' and, optionally,
+        'spectrogram_chunks': None (16 units per chunk), an int (units per
+        chunk), or a full (units, H, W) chunk shape.
+
+    Returns
+    -------
+    tuple of int
+        Chunk shape (units, H, W).
+    """
+    target_shape = tuple(config["target_shape"])
+    chunks = config.get("spectrogram_chunks")
+    if chunks is None:
+        chunks = 16
+    if isinstance(chunks, int):
+        return (chunks, *target_shape)
+    return tuple(int(c) for c in chunks)
+
+
+# Compression filter arguments of the spectrograms dataset
+def spectrogram_filters(config):
+    """
+    Return the 'create_dataset' filter arguments of the 'spectrograms' dataset.
+
+    Parameters
+    ----------
+    config : dict
+        Configuration with, optionally, 'spectrogram_compression' (None,
+        "gzip", "lzf", or "blosc" for Blosc/LZ4 through hdf5plugin),
+        'spectrogram_compression_level' (gzip 0-9, default 4; Blosc 0-9,
+        default 5), and 'spectrogram_shuffle' (None, "byte", or "bit";
+        bit shuffling needs Blosc).
+
+    Returns
+    -------
+    dict
+        Keyword arguments for 'h5py.Group.create_dataset'.
+
+    Raises
+    ------
+    ValueError
+        If the compression or shuffle setting is unknown or unsupported.
+    ImportError
+        If Blosc is requested but hdf5plugin is not installed.
+    """
+    compression = config.get("spectrogram_compression")
+    level = config.get("spectrogram_compression_level")
+    shuffle = config.get("spectrogram_shuffle")
+    if shuffle not in (None, "byte", "bit"):
+        raise ValueError(f"Unknown spectrogram_shuffle {shuffle!r}")
+
+    if compression == "blosc":
+        if not HDF5PLUGIN_AVAILABLE:
+            raise ImportError(
+                "hdf5plugin not available. Install it to use Blosc compression."
+            )
+        modes = {
+            None: hdf5plugin.Blosc.NOSHUFFLE,
+            "byte": hdf5plugin.Blosc.SHUFFLE,
+            "bit": hdf5plugin.Blosc.BITSHUFFLE,
+        }
+        return dict(
+            hdf5plugin.Blosc(
+                cname="lz4",
+                clevel=5 if level is None else int(level),
+                shuffle=modes[shuffle],
+            )
+        )
+
+    if shuffle == "bit":
+        raise ValueError("spectrogram_shuffle 'bit' requires Blosc compression")
+    filters = {"shuffle": shuffle == "byte"}
+    if compression == "gzip":
+        filters.update(
+            compression="gzip", compression_opts=4 if level is None else int(level)
+        )
+    elif compression == "lzf":
+        filters.update(compression="lzf")
+    elif compression is not None:
+        raise ValueError(f"Unknown spectrogram_compression {compression!r}")
+    return filters
+
+
+class SpectrogramWriter:
+    """
+    Append unit spectrograms to an HDF5 file from a background thread.
+
+    'append' assigns each unit its row ('h5_index') immediately and queues
+    the data; once 'max_queue' results are waiting, it blocks until the
+    writer catches up. The writer thread quantizes results to uint8 and
+    writes them in contiguous blocks of at least 'write_units' units (or
+    whatever is left when the writer is flushed or closed). The dataset
+    capacity doubles as needed and is trimmed to the number of units on
+    close.
+
+    The file is opened without HDF5 file locking, so worker processes
+    forked while it is open do not keep it locked after it is closed. An
+    existing file can be reopened to continue an interrupted run
+    ('keep_units').
+
+    Attributes
+    ----------
+    h5_path : Path
+        Location of the HDF5 file.
+    n_units : int
+        Number of units appended so far.
+    """
+
+    # Create the file and start the writer thread
+    def __init__(self, h5_path, config, max_queue=8, write_units=1024, keep_units=None):
+        """
+        Create the HDF5 file and its empty 'spectrograms' dataset.
+
+        Parameters
+        ----------
+        h5_path : str or Path
+            Location of the HDF5 file, which is overwritten unless
+            'keep_units' is given.
+        config : dict
+            Configuration with 'target_shape' and, optionally,
+            'spectrogram_chunks' (see 'spectrogram_chunks') and compression
+            settings (see 'spectrogram_filters').
+        max_queue : int, optional
+            Maximum number of results waiting for the writer. The default
+            is 8.
+        write_units : int, optional
+            Units collected before a write. The default is 1024.
+        keep_units : int, optional
+            If given, reopen an existing file, keep its first 'keep_units'
+            units, discard any units after them, and append from there.
+            The default is None.
+        """
+        self.h5_path = Path(h5_path)
+        self.max_queue = max(int(max_queue), 1)
+        self.write_units = max(int(write_units), 1)
+
+        self._unit_shape = tuple(config["target_shape"])
+        self._unit_bytes = int(np.prod(self._unit_shape))
+        if keep_units is None:
+            keep_units = 0
+            self._create(config)
+        else:
+            self._reopen(keep_units)
+        self.n_units = keep_units
+
+        # Writer state, owned by the writer thread
+        self._written = keep_units
+        self._kept = keep_units
+        self._error = None
+        self._n_writes = 0
+        self._write_seconds = 0.0
+
+        # Queue depth seen by 'append', owned by the caller
+        self._depth_total = 0
+        self._depth_max = 0
+        self._n_appends = 0
+        self._start = time.perf_counter()
+
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._thread = threading.Thread(
+            target=self._run, name="SpectrogramWriter", daemon=True
+        )
+        self._thread.start()
+
+    # Create the file
+    def _create(self, config):
+        """
+        Create the HDF5 file and its empty, chunked 'spectrograms' dataset.
+        """
+        self._file = h5py.File(self.h5_path, "w", libver="latest", locking=False)
+        self._dataset = self._file.create_dataset(
+            "spectrograms",
+            shape=(0, *self._unit_shape),
+            maxshape=(None, *self._unit_shape),
+            dtype=np.uint8,
+            chunks=spectrogram_chunks(config),
+            **spectrogram_filters(config),
+        )
+
+    # Reopen an existing file
+    def _reopen(self, keep_units):
+        """
+        Reopen the HDF5 file and cut its dataset back to 'keep_units' units.
+        """
+        self._file = h5py.File(self.h5_path, "a", libver="latest", locking=False)
+        self._dataset = self._file["spectrograms"]
+        shape = self._dataset.shape
+        if shape[1:] != self._unit_shape or shape[0] < keep_units:
+            self._file.close()
+            raise ValueError(
+                f"Cannot keep {keep_units} units of {self._unit_shape} in "
+                f"{self.h5_path}, which holds {shape}"
+            )
+        self._dataset.resize(keep_units, axis=0)
+
+    # Write a block after the units written so far
+    def _store(self, block):
+        """
+        Write a uint8 block at row '_written', growing the dataset
+        geometrically.
+        """
+        end = self._written + len(block)
+        capacity = self._dataset.shape[0]
+        if end > capacity:
+            self._dataset.resize(
+                max(end, 2 * capacity, self._dataset.chunks[0]), axis=0
+            )
+        self._dataset[self._written : end] = block
+
+    # Make written units durable
+    def _sync(self):
+        self._file.flush()
+
+    # Trim and close the file
+    def _finish(self, complete):
+        """
+        Close the file, first trimming the dataset to the written units if
+        writing completed without errors.
+        """
+        try:
+            if complete:
+                self._dataset.resize(self._written, axis=0)
+        finally:
+            self._file.close()
+
+    # Context manager entry
+    def __enter__(self):
+        return self
+
+    # Context manager exit
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Queue units for writing
+    def append(self, specs):
+        """
+        Queue unit spectrograms and return the row of the first one.
+
+        Parameters
+        ----------
+        specs : list of np.ndarray or np.ndarray
+            Unit spectrograms in the [0, 1] range, already quantized uint8
+            units with shape (n_units, H, W), or a 'SharedUnits' handle,
+            whose block the writer frees.
+
+        Returns
+        -------
+        int
+            Row of the first unit; the others follow consecutively.
+        """
+        self._raise_error()
+        start = self.n_units
+        self.n_units += len(specs)
+
+        depth = self._queue.qsize()
+        self._depth_total += depth
+        self._depth_max = max(self._depth_max, depth)
+        self._n_appends += 1
+
+        self._queue.put(specs)
+        return start
+
+    # Wait until every queued unit is in the file
+    def flush(self):
+        """
+        Block until all appended units are written and flushed to disk.
+        """
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+        self._raise_error()
+
+    # Stop the writer and finalize the file
+    def close(self):
+        """
+        Write the remaining units, trim the dataset, and close the file.
+        """
+        if self._file is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            self._finish(self._error is None)
+        finally:
+            self._file = None
+        self._raise_error()
+
+    # Re-raise a failure from the writer thread
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError(
+                f"Writing spectrograms to {self.h5_path} failed"
+            ) from self._error
+
+    # Writer thread loop
+    def _run(self):
+        """
+        Collect queued results and write them in contiguous blocks.
+        """
+        pending, n_pending = [], 0
+        while True:
+            item = self._queue.get()
+            is_data = item is not None and not isinstance(item, threading.Event)
+            if is_data:
+                if self._error is not None:
+                    if isinstance(item, SharedUnits):
+                        item.release()
+                elif len(item):
+                    try:
+                        if not isinstance(item, SharedUnits):
+                            item = quantize_units(item)
+                        pending.append(item)
+                        n_pending += len(item)
+                    except Exception as e:
+                        self._error = e
+                if n_pending < self.write_units:
+                    continue
+
+            # Write when enough units are pending, or on flush and close
+            if self._error is None:
+                try:
+                    if pending:
+                        self._write(pending)
+                    if isinstance(item, threading.Event):
+                        self._sync()
+                except Exception as e:
+                    self._error = e
+            pending, n_pending = [], 0
+
+            if item is None:
+                return
+            if not is_data:
+                item.set()
+
+    # Append a block of quantized units
+    def _write(self, pending):
+        """
+        Write quantized results after the units written so far.
+        """
+        start_time = time.perf_counter()
+        try:
+            if len(pending) == 1 and isinstance(pending[0], np.ndarray):
+                block = pending[0]
+            else:
+                # Gather results, copying shared blocks out once
+                n_units = sum(len(units) for units in pending)
+                block = np.empty((n_units, *self._unit_shape), dtype=np.uint8)
+                offset = 0
+                for units in pending:
+                    if isinstance(units, SharedUnits):
+                        units.copy_into(block[offset : offset + len(units)])
+                    else:
+                        block[offset : offset + len(units)] = units
+                    offset += len(units)
+        finally:
+            for units in pending:
+                if isinstance(units, SharedUnits):
+                    units.release()
+
+        self._store(block)
+        self._written += len(block)
+        self._n_writes += 1
+        self._write_seconds += time.perf_counter() - start_time
+
+    # Summarize throughput and queue depth
+    def report(self):
+        """
+        Format writer throughput and queue depth for printing.
+        """
+        n_bytes = (self._written - self._kept) * self._unit_bytes
+        rate = n_bytes / self._write_seconds / 1e6 if self._write_seconds else 0.0
+        wall = time.perf_counter() - self._start
+        mean_depth = self._depth_total / self._n_appends if self._n_appends else 0.0
+        return (
+            f"Writer: {self._written - self._kept} units in {self._n_writes} writes, "
+            f"{rate:.1f} MB/s while writing ({self._write_seconds:.1f} s of "
+            f"{wall:.1f} s); queue depth mean {mean_depth:.1f}, "
+            f"max {self._depth_max} of {self.max_queue}"
+        )
+
+
+# Size of the .npy header of a flat store, so that data starts aligned
+_FLAT_HEADER_BYTES = 128
+
+
+# Whether a path names a flat store
+def is_flat_store(path):
+    """
+    Return True if 'path' names a flat memory-mapped store (a '.npy' file).
+    """
+    return Path(path).suffix.lower() == ".npy"
+
+
+# Location of the JSON header of a flat store
+def _flat_header_path(path):
+    path = Path(path)
+    return path.with_name(f"{path.name}.json")
+
+
+# Fixed-length .npy header
+def _npy_header(shape):
+    """
+    Return a version 1.0 .npy header of '_FLAT_HEADER_BYTES' bytes for a
+    C-ordered uint8 array.
+    """
+    text = f"{{'descr': '|u1', 'fortran_order': False, 'shape': {tuple(shape)}, }}"
+    header_len = _FLAT_HEADER_BYTES - 10
+    text = text.ljust(header_len - 1) + "\n"
+    if len(text) != header_len:
+        raise ValueError(f"Shape {tuple(shape)} does not fit the .npy header")
+    return (
+        b"\x93NUMPY\x01\x00" + header_len.to_bytes(2, "little") + text.encode("latin1")
+    )
+
+
+# Read the JSON header of a flat store
+def _read_flat_header(path):
+    with open(_flat_header_path(path), "r", encoding="utf8") as fh:
+        return json.load(fh)
+
+
+class FlatSpectrogramWriter(SpectrogramWriter):
+    """
+    Append unit spectrograms to a flat, memory-mappable '.npy' file.
+
+    Units are raw uint8 bytes after a fixed-size .npy header, so the file
+    can be memory-mapped by readers ('SpectrogramReader') or opened with
+    'np.load'. A JSON header next to it ('<name>.json') records the number
+    of units durably written and is replaced atomically on every flush, so
+    a store is readable, and resumable, while it is being written. Queueing
+    and batching work as in 'SpectrogramWriter'.
+
+    Attributes
+    ----------
+    h5_path : Path
+        Location of the '.npy' file.
+    n_units : int
+        Number of units appended so far.
+    """
+
+    # Create the file
+    def _create(self, config):
+        """
+        Create an empty store.
+        """
+        self._file = open(self.h5_path, "w+b")
+        self._file.write(_npy_header((0, *self._unit_shape)))
+        self._write_header(0)
+
+    # Reopen an existing file
+    def _reopen(self, keep_units):
+        """
+        Reopen the store and cut it back to 'keep_units' units.
+        """
+        header = _read_flat_header(self.h5_path)
+        shape = (header["n_units"], *header["unit_shape"])
+        if shape[1:] != self._unit_shape or shape[0] < keep_units:
+            raise ValueError(
+                f"Cannot keep {keep_units} units of {self._unit_shape} in "
+                f"{self.h5_path}, which holds {shape}"
+            )
+        self._file = open(self.h5_path, "r+b")
+        self._file.truncate(_FLAT_HEADER_BYTES + keep_units * self._unit_bytes)
+
+    # Write a block after the units written so far
+    def _store(self, block):
+        self._file.seek(_FLAT_HEADER_BYTES + self._written * self._unit_bytes)
+        self._file.write(np.ascontiguousarray(block).data)
+
+    # Make written units durable and visible to readers
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._write_header(self._written)
+
+    # Finalize the .npy header and close the file
+    def _finish(self, complete):
+        """
+        Close the file, first recording its final shape if writing
+        completed without errors.
+        """
+        try:
+            if complete:
+                self._file.truncate(
+                    _FLAT_HEADER_BYTES + self._written * self._unit_bytes
+                )
+                self._file.seek(0)
+                self._file.write(_npy_header((self._written, *self._unit_shape)))
+                self._sync()
+        finally:
+            self._file.close()
+
+    # Replace the JSON header atomically
+    def _write_header(self, n_units):
+        """
+        Record that the first 'n_units' units are written.
+        """
+        path = _flat_header_path(self.h5_path)
+        header = {
+            "format": "chatter-spectrograms",
+            "version": 1,
+            "dtype": "uint8",
+            "offset": _FLAT_HEADER_BYTES,
+            "unit_shape": list(self._unit_shape),
+            "n_units": int(n_units),
+        }
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf8") as fh:
+            json.dump(header, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+
+
+# Writer for the backend a path names
+def spectrogram_writer(path, config, **kwargs):
+    """
+    Return a writer for a spectrogram store, chosen by its file name.
+
+    Parameters
+    ----------
+    path : str or Path
+        Store location: a '.npy' file for a flat memory-mapped store,
+        anything else for HDF5.
+    config : dict
+        Configuration passed to the writer.
+    **kwargs
+        Other arguments of 'SpectrogramWriter'.
+
+    Returns
+    -------
+    SpectrogramWriter or FlatSpectrogramWriter
+        The writer, with its file open.
+    """
+    if is_flat_store(path):
+        return FlatSpectrogramWriter(path, config, **kwargs)
+    return SpectrogramWriter(path, config, **kwargs)
+
+
+class SpectrogramReader:
+    """
+    Read-only access to the units of a spectrogram store of either backend.
+
+    Indexing returns uint8 units as NumPy arrays. An HDF5 store is read
+    through its 'spectrograms' dataset; a flat store is memory-mapped, so
+    reads are zero-copy views of the page cache, which is shared by every
+    process reading the same file.
+
+    Attributes
+    ----------
+    path : Path
+        Location of the store.
+    data : h5py.Dataset or np.memmap
+        The units, with shape (n_units, H, W).
+    """
+
+    # Open the store
+    def __init__(self, path):
+        """
+        Open a spectrogram store for reading.
+
+        Parameters
+        ----------
+        path : str or Path
+            HDF5 file with a 'spectrograms' dataset, or a flat '.npy' store.
+        """
+        self.path = Path(path)
+        self._file = None
+        if is_flat_store(self.path):
+            header = _read_flat_header(self.path)
+            shape = (header["n_units"], *header["unit_shape"])
+            if shape[0]:
+                self.data = np.memmap(
+                    self.path, np.uint8, "r", offset=header["offset"], shape=shape
+                )
+            else:
+                self.data = np.zeros(shape, dtype=np.uint8)
+        else:
+            self._file = h5py.File(self.path, "r", libver="latest", swmr=True)
+            self.data = self._file["spectrograms"]
+
+    # Context manager entry
+    def __enter__(self):
+        return self
+
+    # Context manager exit
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Number of units
+    def __len__(self):
+        return len(self.data)
+
+    # Read units
+    def __getitem__(self, idx):
+        return self.data[idx]
+
+    # Shape of the stored units
+    @property
+    def shape(self):
+        return self.data.shape
+
+    # Data type of the stored units
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    # Release the store
+    def close(self):
+        """
+        Close the HDF5 file or drop the memory map.
+        """
+        self.data = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# Append units to a worker's shard file
+def append_to_shard(shard_path, specs, config):
+    """
+    Append unit spectrograms to a shard file, creating it if needed.
+
+    Parameters
+    ----------
+    shard_path : str or Path
+        Shard file, written by one process at a time.
+    specs : list of np.ndarray or np.ndarray
+        Non-empty unit spectrograms in the [0, 1] range, or uint8 units.
+    config : dict
+        Configuration with 'target_shape' and, optionally,
+        'spectrogram_chunks' (see 'spectrogram_chunks') and compression
+        settings (see 'spectrogram_filters').
+
+    Returns
+    -------
+    int
+        Row of the first unit in the shard; the others follow consecutively.
+    """
+    units = quantize_units(specs)
+    with h5py.File(shard_path, "a", libver="latest", locking=False) as hf:
+        if "spectrograms" not in hf:
+            hf.create_dataset(
+                "spectrograms",
+                shape=(0, *units.shape[1:]),
+                maxshape=(None, *units.shape[1:]),
+                dtype=np.uint8,
+                chunks=spectrogram_chunks(config),
+                **spectrogram_filters(config),
+            )
+        dataset = hf["spectrograms"]
+        start = dataset.shape[0]
+        dataset.resize(start + len(units), axis=0)
+        dataset[start:] = units
+    return start
+
+
+# Shard files of a sharded store
+def _shard_files(shard_dir):
+    """
+    Return the shard files in a directory, sorted by name.
+    """
+    return sorted(Path(shard_dir).glob("shard-*.h5"))
+
+
+# Cut shards back to their committed units
+def truncate_shards(shard_dir, lengths):
+    """
+    Discard units past the committed length of each shard.
+
+    Parameters
+    ----------
+    shard_dir : str or Path
+        Directory of the shard files.
+    lengths : dict
+        Committed number of units per shard file name; shards not listed
+        are emptied.
+    """
+    for path in _shard_files(shard_dir):
+        with h5py.File(path, "a", libver="latest", locking=False) as hf:
+            if "spectrograms" in hf:
+                hf["spectrograms"].resize(lengths.get(path.name, 0), axis=0)
+
+
+# Join shard files into one virtual dataset
+def build_virtual_store(h5_path, shard_dir, config):
+    """
+    Write an HDF5 file whose 'spectrograms' dataset concatenates the shards.
+
+    The virtual dataset refers to the shards by paths relative to 'h5_path',
+    so the file and its shard directory can be moved together. Global rows
+    follow the shards in name order.
+
+    Parameters
+    ----------
+    h5_path : str or Path
+        Location of the virtual dataset file, which is overwritten.
+    shard_dir : str or Path
+        Directory of the shard files.
+    config : dict
+        Configuration with 'target_shape'.
+
+    Returns
+    -------
+    dict
+        Global row of the first unit of each shard, by shard file name.
+    """
+    h5_path = Path(h5_path)
+    target_shape = tuple(config["target_shape"])
+    sources, offsets, n_units = [], {}, 0
+    for path in _shard_files(shard_dir):
+        with h5py.File(path, "r", libver="latest", locking=False) as hf:
+            n = hf["spectrograms"].shape[0] if "spectrograms" in hf else 0
+        name = os.path.relpath(path, h5_path.parent)
+        sources.append(h5py.VirtualSource(name, "spectrograms", (n, *target_shape)))
+        offsets[path.name] = n_units
+        n_units += n
+
+    tmp_path = h5_path.with_name(f"{h5_path.name}.{os.getpid()}.tmp")
+    with h5py.File(tmp_path, "w", libver="latest", locking=False) as hf:
+        if n_units:
+            layout = h5py.VirtualLayout((n_units, *target_shape), dtype=np.uint8)
+            for source, offset in zip(sources, offsets.values()):
+                if source.shape[0]:
+                    layout[offset : offset + source.shape[0]] = source
+            hf.create_virtual_dataset("spectrograms", layout, fillvalue=0)
+        else:
+            hf.create_dataset("spectrograms", (0, *target_shape), dtype=np.uint8)
+    os.replace(tmp_path, h5_path)
+    return offsets
+
+
+# Shard directory of a sharded store
+def default_shard_dir(h5_path):
+    """
+    Return the shard directory stored next to a sharded store's HDF5 file.
+
+    Parameters
+    ----------
+    h5_path : str or Path
+        Virtual dataset file of the store.
+
+    Returns
+    -------
+    Path
+        Sibling directory '<h5 stem>_shards'.
+    """
+    h5_path = Path(h5_path)
+    return h5_path.with_name(f"{h5_path.stem}_shards")
+
+
+class ShardedStore:
+    """
+    Sharded counterpart of 'SpectrogramWriter'.
+
+    Workers append units to their own shard files with 'append_to_shard'
+    and report each unit's (shard file name, row); the parent records these
+    locations with 'record'. On a clean close, the shards are joined into a
+    virtual 'spectrograms' dataset at 'h5_path' and 'offsets' gives the
+    global row of each shard's first unit, from which final 'h5_index'
+    values follow.
+
+    Attributes
+    ----------
+    h5_path : Path
+        Location of the virtual dataset file.
+    shard_dir : Path
+        Directory of the shard files.
+    n_units : int
+        Number of units recorded so far.
+    offsets : dict or None
+        Global row of the first unit of each shard, set on close.
+    """
+
+    # Prepare the shard directory
+    def __init__(self, h5_path, config, shard_lengths=None):
+        """
+        Prepare an empty shard directory, or keep existing shards.
+
+        Parameters
+        ----------
+        h5_path : str or Path
+            Location of the virtual dataset file, written on close.
+        config : dict
+            Configuration with 'target_shape'.
+        shard_lengths : dict, optional
+            If given, keep existing shards, cut back to these numbers of
+            units by shard file name (see 'truncate_shards'), to continue
+            an interrupted run. Otherwise existing shards are deleted.
+        """
+        self.h5_path = Path(h5_path)
+        self.shard_dir = default_shard_dir(self.h5_path)
+        self.config = config
+        self.offsets = None
+        self._start = time.perf_counter()
+
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        if shard_lengths is None:
+            for path in _shard_files(self.shard_dir):
+                path.unlink()
+            shard_lengths = {}
+        else:
+            truncate_shards(self.shard_dir, shard_lengths)
+        self._kept = self.n_units = sum(shard_lengths.values())
+
+    # Context manager entry
+    def __enter__(self):
+        return self
+
+    # Context manager exit
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    # Record the locations of units written by a worker
+    def record(self, metadata, locations):
+        """
+        Store each unit's shard location in its metadata.
+
+        Parameters
+        ----------
+        metadata : list of dict
+            Metadata for each unit; 'h5_shard' and 'h5_shard_row' are added
+            in place.
+        locations : list of tuple
+            (shard file name, row) of each unit, as returned by the worker.
+        """
+        for meta_item, (shard, row) in zip(metadata, locations):
+            meta_item["h5_shard"], meta_item["h5_shard_row"] = shard, int(row)
+        self.n_units += len(metadata)
+
+    # Workers close their shard after every task
+    def flush(self):
+        """
+        Do nothing; recorded units are already in closed shard files.
+        """
+
+    # Join the shards
+    def close(self):
+        """
+        Write the virtual dataset joining the shards.
+        """
+        self.offsets = build_virtual_store(self.h5_path, self.shard_dir, self.config)
+
+    # Summarize the store
+    def report(self):
+        """
+        Format the size of the store for printing.
+        """
+        return (
+            f"Store: {self.n_units - self._kept} units written by workers to "
+            f"{len(self.offsets or ())} shard files in "
+            f"{time.perf_counter() - self._start:.1f} s, joined by a virtual dataset"
+        )
@@ -16,6 +16,7 @@ warnings.filterwarnings(
 import os  # noqa: E402
 import sys  # noqa: E402
 import contextlib  # noqa: E402
+from functools import lru_cache  # noqa: E402
 from typing import Any, Generator, Iterator, Sequence, Tuple  # noqa: E402
 
 import numpy as np  # noqa: E402
@@ -117,6 +118,71 @@ def downsample_spectrogram(
     return resize(spec, target_shape, anti_aliasing=True, preserve_range=True)
 
 
+# Linear operators equivalent to 'downsample_spectrogram' along each axis
+@lru_cache(maxsize=32)
+def resize_operators(
+    input_shape: Tuple[int, int], target_shape: Tuple[int, int]
+) -> Tuple[NDArray[np.float32], NDArray[np.float32]]:
+    """
+    Build the matrices that apply 'downsample_spectrogram' as matrix products.
+
+    Anti-aliased resizing in skimage (Gaussian smoothing followed by linear
+    interpolation) is linear and acts on each axis separately, so for a
+    fixed input shape it equals 'rows @ spec @ cols.T'. Each operator is
+    obtained by resizing an identity matrix along one axis and is cached.
+
+    Parameters
+    ----------
+    input_shape : tuple of int
+        Shape (height, width) of the spectrograms to resize.
+    target_shape : tuple of int
+        Desired output shape given as (target_height, target_width).
+
+    Returns
+    -------
+    tuple of np.ndarray
+        Read-only float32 operators 'rows' with shape (target_height, height)
+        and 'cols' with shape (target_width, width).
+    """
+    height, width = input_shape
+    target_height, target_width = target_shape
+    rows = resize(
+        np.eye(height), (target_height, height), anti_aliasing=True, preserve_range=True
+    )
+    cols = resize(
+        np.eye(width), (width, target_width), anti_aliasing=True, preserve_range=True
+    ).T
+    rows, cols = rows.astype(np.float32), cols.astype(np.float32)
+    rows.flags.writeable = False
+    cols.flags.writeable = False
+    return rows, cols
+
+
+def downsample_spectrograms(
+    specs: NDArray[np.floating], target_shape: Tuple[int, int]
+) -> NDArray[np.float32]:
+    """
+    Downsample a batch of equally sized spectrograms to a target shape.
+
+    Equivalent to applying 'downsample_spectrogram' to each spectrogram, up
+    to float32 rounding, but computed as two batched matrix products.
+
+    Parameters
+    ----------
+    specs : np.ndarray
+        Spectrograms with shape (n, height, width).
+    target_shape : tuple of int
+        Desired output shape given as (target_height, target_width).
+
+    Returns
+    -------
+    np.ndarray
+        Float32 array with shape (n, target_height, target_width).
+    """
+    rows, cols = resize_operators(tuple(specs.shape[1:]), tuple(target_shape))
+    return rows @ np.asarray(specs, dtype=np.float32) @ cols.T
+
+
 def chunker(seq: Sequence[Any], size: int) -> Generator[Sequence[Any], None, None]:
     """
     Generate successive fixed-size chunks from a sequence for batch processing.
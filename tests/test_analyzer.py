@@ -29,3 +29,282 @@ def test_preprocess_directory_smoke(tiny_config, random_audio_file, tmp_path):
     expected = out_dir / random_audio_file.name
     assert expected.exists()
     assert expected.stat().st_size > 0
+
+
+def test_analyzer_reuses_worker_pool_until_config_changes(tiny_config):
+    from chatter.data import _worker_config
+
+    with Analyzer(tiny_config, n_jobs=1) as analyzer:
+        # Workers hold the configuration installed by the initializer
+        with analyzer._executor() as pool:
+            first = pool
+            assert pool.submit(_worker_config, None).result()["sr"] == tiny_config["sr"]
+        with analyzer._executor() as pool:
+            assert pool is first
+
+        # Changing the configuration rebuilds the pool with the new settings
+        analyzer.config["target_dbfs"] = -12
+        with analyzer._executor() as pool:
+            assert pool is not first
+            assert pool.submit(_worker_config, None).result()["target_dbfs"] == -12
+
+    assert analyzer._pool is None
+
+
+def test_segmentation_sweep_matches_full_runs(tiny_config, tmp_path):
+    import numpy as np
+    from scipy.io import wavfile
+
+    # Chirps of varying length and level in background noise
+    rng = np.random.default_rng(0)
+    sr = tiny_config["sr"]
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    for name in ("a.wav", "b.wav"):
+        y = 0.005 * rng.standard_normal(3 * sr)
+        for onset in np.arange(0.1, 2.8, 0.25):
+            n, start = int(rng.uniform(0.03, 0.5) * sr), int(onset * sr)
+            y[start : start + n] += rng.uniform(0.05, 0.5) * np.sin(
+                2 * np.pi * rng.uniform(2000, 5000) * np.arange(n) / sr
+            )
+        wavfile.write(processed / name, sr, y[: 3 * sr].astype(np.float32))
+
+    grid = {"pykanto_noise_floor": [-40, -65], "pykanto_max_dB": [-30, -20]}
+    with Analyzer(tiny_config, n_jobs=1) as analyzer:
+        sweep = analyzer.sweep_segmentation(processed, grid)
+        assert len(sweep) == 4 and sweep["n_files"].tolist() == [2] * 4
+        assert sweep["n_units"].iloc[0] > 0
+
+        # Each setting reports what a full segmentation run would produce
+        for i, row in sweep.iterrows():
+            analyzer.config.update(
+                pykanto_noise_floor=row["pykanto_noise_floor"],
+                pykanto_max_dB=row["pykanto_max_dB"],
+            )
+            units = analyzer.segment_and_create_spectrograms(
+                processed, tmp_path / f"units{i}.h5", tmp_path / f"units{i}.csv"
+            )
+            assert row["n_units"] == len(units)
+            if not len(units):
+                continue
+            durations = np.sort((units["offset"] - units["onset"]).to_numpy())
+            assert np.allclose(np.sort(row["durations"]), durations, atol=1e-5)
+
+        with pytest.raises(ValueError):
+            analyzer.sweep_segmentation(processed, {"simple_noise_floor": [-60]})
+
+
+@pytest.mark.parametrize(
+    "sharded, suffix", [(False, ".h5"), (True, ".h5"), (False, ".npy")]
+)
+def test_interrupted_segmentation_resumes_from_checkpoint(
+    tiny_config, tmp_path, monkeypatch, sharded, suffix
+):
+    import numpy as np
+    import pandas as pd
+    from scipy.io import wavfile
+    from chatter.manifest import SegmentationCheckpoint
+    from chatter.storage import SpectrogramReader
+
+    rng = np.random.default_rng(1)
+    sr = tiny_config["sr"]
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    for name in ("a.wav", "b.wav", "c.wav"):
+        y = 0.001 * rng.standard_normal(2 * sr)
+        for onset in np.arange(0.1, 1.8, 0.3):
+            n, start = int(0.1 * sr), int(onset * sr)
+            y[start : start + n] += 0.3 * np.sin(2 * np.pi * 3000 * np.arange(n) / sr)
+        wavfile.write(processed / name, sr, y.astype(np.float32))
+
+    config = dict(tiny_config, checkpoint_seconds=0, spectrogram_shards=sharded)
+    with Analyzer(config, n_jobs=1) as analyzer:
+        expected = analyzer.segment_and_create_spectrograms(
+            processed, tmp_path / "full.h5", tmp_path / "full.csv", simple=True
+        )
+        assert len(expected) and not (tmp_path / "full_checkpoint.json").exists()
+
+        # Crash after the third file is written but before it is committed
+        commit, committed = SegmentationCheckpoint.commit, []
+
+        def crash_on_third(self, n_units, files, *args):
+            committed.extend(files)
+            if len(committed) == 3:
+                raise KeyboardInterrupt
+            commit(self, n_units, files, *args)
+
+        monkeypatch.setattr(SegmentationCheckpoint, "commit", crash_on_third)
+        h5_path, csv_path = tmp_path / f"units{suffix}", tmp_path / "units.csv"
+        with pytest.raises(KeyboardInterrupt):
+            analyzer.segment_and_create_spectrograms(
+                processed, h5_path, csv_path, simple=True
+            )
+        with open(tmp_path / "units_checkpoint_rows.jsonl", "a") as fh:
+            fh.write('{"source_file": "torn')
+
+        # Only the uncommitted file is redone, and the output is unchanged
+        committed.clear()
+        units = analyzer.segment_and_create_spectrograms(
+            processed, h5_path, csv_path, simple=True, resume=True
+        )
+        assert len(committed) == 1 and len(units) == len(expected)
+        assert not (tmp_path / "units_checkpoint.json").exists()
+
+        # Files may complete in another order, which only permutes rows
+        key = ["source_file", "unit_index"]
+        units, expected = units.sort_values(key), expected.sort_values(key)
+        pd.testing.assert_frame_equal(
+            units.drop(columns="h5_index").reset_index(drop=True),
+            expected.drop(columns="h5_index").reset_index(drop=True),
+        )
+        assert sorted(units["h5_index"]) == list(range(len(units)))
+        with (
+            SpectrogramReader(h5_path) as got,
+            SpectrogramReader(tmp_path / "full.h5") as want,
+        ):
+            assert np.array_equal(
+                got[:][units["h5_index"].to_numpy()],
+                want[:][expected["h5_index"].to_numpy()],
+            )
+
+
+def test_sharded_store_reads_like_single_file(tiny_config, tmp_path):
+    import h5py
+    import numpy as np
+    from scipy.io import wavfile
+    from chatter.data import SpectrogramDataset
+
+    rng = np.random.default_rng(2)
+    sr = tiny_config["sr"]
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    for name in ("a.wav", "b.wav", "c.wav"):
+        y = 0.001 * rng.standard_normal(2 * sr)
+        for onset in np.arange(0.1, 1.8, 0.3):
+            n, start = int(rng.uniform(0.05, 0.2) * sr), int(onset * sr)
+            y[start : start + n] += 0.3 * np.sin(2 * np.pi * 3000 * np.arange(n) / sr)
+        wavfile.write(processed / name, sr, y.astype(np.float32))
+
+    with Analyzer(tiny_config, n_jobs=2) as analyzer:
+        single = analyzer.segment_and_create_spectrograms(
+            processed, tmp_path / "single.h5", tmp_path / "single.csv", simple=True
+        )
+    config = dict(tiny_config, spectrogram_shards=True)
+    with Analyzer(config, n_jobs=2) as analyzer:
+        sharded = analyzer.segment_and_create_spectrograms(
+            processed,
+            tmp_path / "out" / "units.h5",
+            tmp_path / "units.csv",
+            simple=True,
+        )
+    assert len(list((tmp_path / "out" / "units_shards").glob("shard-*.h5"))) >= 1
+
+    # Same units and spectrograms, possibly in another row order
+    key = ["source_file", "unit_index"]
+    single, sharded = single.sort_values(key), sharded.sort_values(key)
+    assert single[key].values.tolist() == sharded[key].values.tolist()
+    assert sorted(sharded["h5_index"]) == list(range(len(sharded)))
+    with h5py.File(tmp_path / "single.h5", "r") as hf:
+        expected = hf["spectrograms"][:][single["h5_index"].to_numpy()]
+
+    # The store and its shards can be moved together
+    (tmp_path / "out").rename(tmp_path / "moved")
+    dataset = SpectrogramDataset(tmp_path / "moved" / "units.h5", sharded["h5_index"])
+    got = np.stack([dataset[i][0].numpy() for i in range(len(dataset))])
+    assert np.array_equal(np.rint(got * 255).astype(np.uint8), expected)
+
+
+def test_seeked_clip_matches_slice_of_whole_file(tiny_config, tmp_path):
+    import numpy as np
+    import soundfile as sf
+    from chatter.audio import load_audio
+
+    # Stereo 16 kHz file, resampled to the configured 22.05 kHz
+    t = np.arange(3 * 16000) / 16000
+    y = np.stack([np.sin(2 * np.pi * 440 * t), np.sin(2 * np.pi * 660 * t)], axis=1)
+    sf.write(tmp_path / "a.wav", 0.4 * y, 16000, subtype="PCM_16")
+    sr = tiny_config["sr"]
+
+    with Analyzer(tiny_config, n_jobs=1) as analyzer:
+        clip, clip_sr = analyzer._load_clip(tmp_path / "a.wav", 1.0, 0.5)
+    full, _ = load_audio(tmp_path / "a.wav", sr=sr)
+    expected = full[:, sr : sr + sr // 2].mean(axis=0)
+
+    # Only the resampler's edges differ from slicing the whole file
+    assert clip_sr == sr and clip.shape == expected.shape
+    assert np.allclose(clip[200:-200], expected[200:-200], atol=1e-5)
+
+
+def test_fused_pipeline_shards_splits_and_resumes(tiny_config, tmp_path, monkeypatch):
+    import numpy as np
+    import pandas as pd
+    from scipy.io import wavfile
+    from chatter.manifest import SegmentationCheckpoint
+    from chatter.storage import SpectrogramReader
+
+    # Two short files and one long enough to be split into windows
+    rng = np.random.default_rng(3)
+    sr = tiny_config["sr"]
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    for name, seconds in (("a.wav", 2), ("b.wav", 2), ("long.wav", 7)):
+        y = 0.001 * rng.standard_normal(seconds * sr)
+        for onset in np.arange(0.1, seconds - 0.2, 0.3):
+            n, start = int(0.1 * sr), int(onset * sr)
+            y[start : start + n] += 0.3 * np.sin(2 * np.pi * 3000 * np.arange(n) / sr)
+        wavfile.write(raw / name, sr, y.astype(np.float32))
+
+    config = dict(
+        tiny_config,
+        preprocess_engine="numpy",
+        use_noisereduce=False,
+        split_seconds=2.0,
+        checkpoint_seconds=0,
+    )
+    with Analyzer(config, n_jobs=2) as analyzer:
+        analyzer.preprocess_directory(raw, tmp_path / "processed")
+        expected = analyzer.segment_and_create_spectrograms(
+            tmp_path / "processed", tmp_path / "two.h5", tmp_path / "two.csv"
+        )
+
+    # Crash after the second file is written but before it is committed
+    commit, committed = SegmentationCheckpoint.commit, []
+
+    def crash_on_second(self, n_units, files, *args):
+        committed.extend(files)
+        if len(committed) == 2:
+            raise KeyboardInterrupt
+        commit(self, n_units, files, *args)
+
+    monkeypatch.setattr(SegmentationCheckpoint, "commit", crash_on_second)
+    h5_path, csv_path = tmp_path / "out" / "units.h5", tmp_path / "units.csv"
+    with Analyzer(dict(config, spectrogram_shards=True), n_jobs=2) as analyzer:
+        with pytest.raises(KeyboardInterrupt):
+            analyzer.preprocess_and_segment(raw, h5_path, csv_path)
+
+        # Only the uncommitted files are redone
+        def count(self, n_units, files, *args):
+            committed.extend(files)
+            commit(self, n_units, files, *args)
+
+        monkeypatch.setattr(SegmentationCheckpoint, "commit", count)
+        committed.clear()
+        units = analyzer.preprocess_and_segment(raw, h5_path, csv_path, resume=True)
+    assert len(committed) == 2 and not list((tmp_path / "out").glob("tmp*"))
+    assert not (tmp_path / "out" / "units_checkpoint.json").exists()
+
+    # Same units and spectrograms as the two-step workflow, up to the
+    # preprocessing dither flipping the last bit of a few samples
+    key = ["source_file", "unit_index"]
+    units, expected = units.sort_values(key), expected.sort_values(key)
+    pd.testing.assert_frame_equal(
+        units.drop(columns="h5_index").reset_index(drop=True),
+        expected.drop(columns="h5_index").reset_index(drop=True),
+    )
+    with (
+        SpectrogramReader(h5_path) as got,
+        SpectrogramReader(tmp_path / "two.h5") as want,
+    ):
+        got = got[:][units["h5_index"].to_numpy()].astype(int)
+        want = want[:][expected["h5_index"].to_numpy()].astype(int)
+        assert got.shape == want.shape and np.abs(got - want).max() <= 1
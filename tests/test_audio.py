@@ -0,0 +1,56 @@
+import numpy as np
+import soundfile as sf
+from pydub import AudioSegment
+
+from chatter.audio import (
+    load_audio,
+    load_audio_segment,
+    open_seekable,
+    read_segment_slice,
+    write_pcm_wav,
+)
+
+
+def test_soundfile_backend_decodes_exactly_and_saturates(tmp_path):
+    # Lossless input decodes to the exact PCM samples in-process
+    rng = np.random.default_rng(0)
+    pcm = (0.3 * rng.standard_normal((44100, 2)) * 32767).astype(np.int16)
+    sf.write(tmp_path / "a.flac", pcm, 44100)
+    audio = load_audio_segment(tmp_path / "a.flac")
+    assert (audio.frame_rate, audio.channels, audio.sample_width) == (44100, 2, 2)
+    samples = np.array(audio.get_array_of_samples()).reshape(-1, 2)
+    assert np.array_equal(samples, pcm)
+
+    # Resampling to a target rate gives round(n * target / native) samples
+    y, sr = load_audio(tmp_path / "a.flac", sr=22050)
+    assert sr == 22050 and y.shape == (2, 22050)
+    assert y.dtype == np.float32 and np.abs(y).max() <= 1.0
+
+    # Lossy overshoots saturate instead of wrapping around
+    loud = np.clip(rng.standard_normal((22050, 1)), -1, 1).astype(np.float32)
+    sf.write(tmp_path / "b.ogg", loud, 22050, subtype="VORBIS")
+    decoded, _ = sf.read(tmp_path / "b.ogg", dtype="float32")
+    samples = np.array(load_audio_segment(tmp_path / "b.ogg").get_array_of_samples())
+    over = decoded > 1.0
+    assert over.any() and np.all(samples[over] == 32767)
+
+
+def test_seek_slices_match_audiosegment_export(tmp_path):
+    rng = np.random.default_rng(1)
+    for name, sr, subtype in [("a.wav", 44100, "PCM_24"), ("b.flac", 22050, "PCM_16")]:
+        x = np.clip(0.4 * rng.standard_normal((int(sr * 4.3337), 2)), -1, 1)
+        sf.write(tmp_path / name, x, sr, subtype=subtype)
+        audio = AudioSegment.from_file(tmp_path / name)
+
+        # Slices, including one past the end, are written byte-for-byte alike
+        with open_seekable(tmp_path / name) as f:
+            for start_ms, end_ms in [(0, 1000), (1234, 3210), (4000, 6000)]:
+                audio[start_ms:end_ms].export(tmp_path / "ref.wav", format="wav")
+                clip = read_segment_slice(f, start_ms, end_ms)
+                write_pcm_wav(tmp_path / "new.wav", clip, f.samplerate)
+                ref = (tmp_path / "ref.wav").read_bytes()
+                assert (tmp_path / "new.wav").read_bytes() == ref
+
+    # Formats without exact seeking are decoded whole instead
+    sf.write(tmp_path / "c.ogg", x, 22050, subtype="VORBIS")
+    assert open_seekable(tmp_path / "c.ogg") is None
@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+from scipy.io import wavfile
+
+from chatter.catalog import AudioCatalog, resolve_audio_files
+
+
+def test_catalog_walk_and_incremental_update(tmp_path):
+    root = tmp_path / "data"
+    (root / "site_a" / "day1").mkdir(parents=True)
+    (root / "site_b").mkdir()
+    wavfile.write(root / "site_a" / "day1" / "1.wav", 8000, np.zeros(8000, np.int16))
+    wavfile.write(root / "site_b" / "2.WAV", 16000, np.zeros((4000, 2), np.int16))
+    (root / "site_b" / "notes.txt").write_text("not audio")
+
+    catalog = AudioCatalog.build(root, tmp_path / "catalog.h5")
+    assert [f.relative_to(root).as_posix() for f in catalog.files] == [
+        "site_a/day1/1.wav",
+        "site_b/2.WAV",
+    ]
+    info = catalog.info(root / "site_b" / "2.WAV")
+    assert (info.samplerate, info.channels, info.frames) == (16000, 2, 4000)
+    assert info.duration == 0.25
+
+    # A reopened catalog is used without touching the directory
+    reopened = AudioCatalog(root, tmp_path / "catalog.h5")
+    assert resolve_audio_files(reopened)[1] == catalog.files
+    assert resolve_audio_files(root)[1] == catalog.files
+
+    # Only new or changed files have their headers read again
+    wavfile.write(root / "site_a" / "day1" / "1.wav", 8000, np.zeros(800, np.int16))
+    stat = (root / "site_a" / "day1" / "1.wav").stat()
+    os.utime(root / "site_a" / "day1" / "1.wav", ns=(stat.st_atime_ns, 1))
+    (root / "site_b" / "2.WAV").unlink()
+    wavfile.write(root / "3.flac.wav", 8000, np.zeros(80, np.int16))
+    assert reopened.update() == (2, 1)
+    assert reopened.info("site_a/day1/1.wav").frames == 800
+    assert len(AudioCatalog(root, tmp_path / "catalog.h5")) == 2
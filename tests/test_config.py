@@ -13,3 +13,9 @@ def test_make_config_allows_overrides():
     # User overrides should take effect
     cfg = make_config({"sr": 16000})
     assert cfg["sr"] == 16000
+
+
+def test_make_config_warns_when_streaming_overrides_engine():
+    # Streamed files always use the NumPy engine
+    with pytest.warns(UserWarning, match="NumPy engine"):
+        make_config({"stream_chunk_seconds": 60})
@@ -0,0 +1,378 @@
+import numpy as np
+import pytest
+from pydub import AudioSegment
+
+from chatter.audio import _audiosegment_to_float
+from chatter.data import preprocess_audio_array, preprocess_audio_data
+
+
+def test_numpy_engine_matches_pydub_engine(tiny_config):
+    # Stereo 44.1 kHz int16 input exercises fade, downmix, resample and filters
+    rng = np.random.default_rng(0)
+    sr_in = 44100
+    t = np.arange(sr_in) / sr_in
+    sig = 0.3 * np.sin(2 * np.pi * 3000 * t) + 0.02 * rng.standard_normal(sr_in)
+    samples = (np.stack([sig, 0.8 * sig], axis=1) * 32767).astype(np.int16)
+    audio = AudioSegment(
+        samples.tobytes(), frame_rate=sr_in, sample_width=2, channels=2
+    )
+    config = dict(tiny_config, high_pass=500, use_noisereduce=False)
+
+    np.random.seed(0)
+    expected = preprocess_audio_data(audio, config)
+    np.random.seed(0)
+    result = preprocess_audio_array(_audiosegment_to_float(audio), sr_in, config)
+
+    # Same length and dtype; differences limited to intermediate quantization
+    assert result.dtype == np.int16
+    assert result.shape == expected.shape
+    rms_diff = np.sqrt(np.mean((result.astype(float) - expected) ** 2)) / 32767
+    assert 20 * np.log10(rms_diff) < -60
+
+
+@pytest.mark.parametrize("extra", [0, 17, 30])
+def test_streaming_preprocessing_matches_in_memory(tiny_config, tmp_path, extra):
+    import soundfile as sf
+    from chatter.data import preprocess_file_streaming
+
+    # Three-second stereo file streamed in half-second chunks, with lengths
+    # that pydub's millisecond rounding trims (17) or pads (30)
+    rng = np.random.default_rng(1)
+    sr_in = 44100
+    t = np.arange(3 * sr_in + extra) / sr_in
+    sig = 0.3 * np.sin(2 * np.pi * 3000 * t) + 0.02 * rng.standard_normal(t.size)
+    data = np.stack([sig, 0.8 * sig], axis=1).astype(np.float32)
+    src = tmp_path / "long.wav"
+    sf.write(src, data, sr_in, subtype="PCM_16")
+    config = dict(
+        tiny_config,
+        high_pass=500,
+        use_noisereduce=False,
+        stream_chunk_seconds=0.5,
+        stream_overlap_seconds=0.1,
+    )
+
+    y, _ = sf.read(src, dtype="float32", always_2d=True)
+    expected = preprocess_audio_array(y.T, sr_in, config)
+    n_written = preprocess_file_streaming(src, str(tmp_path / "out.wav"), config)
+    result, sr = sf.read(tmp_path / "out.wav", dtype="int16")
+
+    # Same length and rate; differences limited to float rounding
+    assert sr == config["sr"]
+    assert n_written == result.size == expected.size
+    assert np.abs(result.astype(int) - expected).max() <= 8
+    assert not (tmp_path / "out.stream.f32").exists()
+
+
+def test_batched_biodenoising_matches_chunk_by_chunk(tiny_config, monkeypatch):
+    import torch
+
+    import chatter.data as data
+
+    # Stub model at half the rate that reverses and scales each chunk, so
+    # its output shows where every chunk starts and ends
+    class StubModel(torch.nn.Module):
+        sample_rate = tiny_config["sr"] // 2
+        chin = 1
+
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+
+        def forward(self, x):
+            self.batches.append(tuple(x.shape))
+            return 2.0 * x.flip(-1)
+
+    def stub_convert_audio(wav, from_samplerate, to_samplerate, channels):
+        if to_samplerate < from_samplerate:
+            return wav[..., ::2]
+        return wav.repeat_interleave(2, dim=-1)
+
+    model = StubModel()
+    monkeypatch.setattr(data, "_get_biodenoising_model", lambda name: model)
+    monkeypatch.setattr(data, "convert_audio", stub_convert_audio)
+
+    # Two signals of 4 and 2 whole 0.1 s chunks plus unequal final chunks
+    rng = np.random.default_rng(2)
+    chunk = int(0.1 * model.sample_rate)
+    signals = [
+        rng.standard_normal(2 * n).astype(np.float32)
+        for n in (4 * chunk + 300, 2 * chunk + 41)
+    ]
+    config = dict(
+        tiny_config, biodenoising_chunk_seconds=0.1, biodenoising_batch_size=4
+    )
+    results = data._biodenoise_batch(signals, config)
+
+    # Whole chunks of both signals share batches of at most 4
+    assert sorted(model.batches) == [
+        (1, 1, 41),
+        (1, 1, 300),
+        (2, 1, chunk),
+        (4, 1, chunk),
+    ]
+
+    # Same output as running the model on one chunk at a time
+    for y, result in zip(signals, results):
+        wav = stub_convert_audio(torch.from_numpy(y).unsqueeze(0), 2, 1, 1)
+        out = torch.cat(
+            [model(c.unsqueeze(0))[0] for c in torch.split(wav, chunk, dim=-1)], dim=-1
+        )
+        expected = stub_convert_audio(out, 1, 2, 1).squeeze(0).numpy()
+        assert result.dtype == np.float32 and result.shape == y.shape
+        assert np.array_equal(result, expected)
+
+
+def test_grouped_worker_reports_per_file_results(tiny_config, tmp_path):
+    import soundfile as sf
+    from chatter.data import _preprocess_files_worker, _preprocess_wav_worker
+
+    # Two valid files around an undecodable one, denoised as one group
+    rng = np.random.default_rng(2)
+    for name, seconds in (("a", 0.5), ("c", 1.0)):
+        sf.write(
+            tmp_path / f"{name}.wav",
+            0.2 * rng.standard_normal(int(seconds * 44100)),
+            44100,
+        )
+    (tmp_path / "b.wav").write_bytes(b"not audio")
+    jobs = [(tmp_path / f"{n}.wav", tmp_path / "out" / f"{n}.wav") for n in "abc"]
+    config = dict(tiny_config, preprocess_engine="numpy", use_noisereduce=False)
+
+    assert _preprocess_files_worker(jobs, config) == [True, False, True]
+
+    # Grouping does not change the output beyond dither noise
+    assert _preprocess_wav_worker(jobs[2][0], tmp_path / "single.wav", config)
+    grouped, _ = sf.read(jobs[2][1], dtype="int16")
+    single, _ = sf.read(tmp_path / "single.wav", dtype="int16")
+    assert np.abs(grouped.astype(int) - single).max() <= 1
+
+
+def test_fused_worker_matches_two_step_workflow(tiny_config, tmp_path):
+    import soundfile as sf
+    from pathlib import Path
+    from chatter.data import (
+        _preprocess_and_segment_worker,
+        _preprocess_files_worker,
+        _process_file_for_segmentation_worker,
+    )
+
+    # Short chirps over quiet noise give a handful of simple units
+    rng = np.random.default_rng(3)
+    y = 0.0001 * rng.standard_normal(3 * 44100)
+    n = int(0.1 * 44100)
+    chirp = 0.5 * np.sin(2 * np.pi * 3000 * np.arange(n) / 44100) * np.hanning(n)
+    for k in range(4):
+        y[int((0.4 + 0.6 * k) * 44100) :][:n] += chirp
+    sf.write(tmp_path / "raw.flac", y, 44100)
+    config = dict(tiny_config, use_noisereduce=False, simple_silence_threshold_db=-20)
+
+    # Two-step: write a WAV, then segment it from disk
+    wav_path = tmp_path / "processed" / "raw.wav"
+    np.random.seed(0)
+    assert _preprocess_files_worker([(tmp_path / "raw.flac", wav_path)], config)
+    expected = _process_file_for_segmentation_worker(
+        wav_path, Path("raw.wav"), config, simple=True
+    )
+
+    # Fused: segment the preprocessed audio in memory without writing it
+    jobs = [(tmp_path / "raw.flac", Path("raw.wav"), None)]
+    np.random.seed(0)
+    [(metadata, specs, drops, ok)] = _preprocess_and_segment_worker(
+        jobs, config, simple=True
+    )
+
+    assert ok and len(metadata) == len(expected[0]) > 0
+    assert metadata == expected[0]
+    assert np.array_equal(np.array(specs), np.array(expected[1]))
+
+
+@pytest.mark.parametrize(
+    "simple, static", [(True, True), (True, False), (False, True), (False, False)]
+)
+def test_split_segmentation_matches_whole_file(tiny_config, tmp_path, simple, static):
+    import soundfile as sf
+    from pathlib import Path
+    from chatter.data import (
+        _power_reference_worker,
+        _process_file_for_segmentation_worker,
+        _pykanto_image_segments_worker,
+        _pykanto_window_image_worker,
+        _segment_window_worker,
+        _stitch_window_results,
+    )
+    from chatter.parallel import split_windows
+
+    # Loud chirps for 2 s, then quiet ones, every 0.35 s so that several
+    # land near window boundaries
+    sr = tiny_config["sr"]
+    rng = np.random.default_rng(4)
+    y = 0.0005 * rng.standard_normal(8 * sr)
+    n = int(0.1 * sr)
+    chirp = np.sin(2 * np.pi * 3000 * np.arange(n) / sr) * np.hanning(n)
+    for start in np.arange(0.2, 7.8, 0.35):
+        y[int(start * sr) :][:n] += (0.8 if start < 2 else 0.05) * chirp
+    path = tmp_path / "long.wav"
+    sf.write(path, y, sr, subtype="PCM_16")
+    config = dict(tiny_config, simple_silence_threshold_db=-40, static=static)
+
+    expected = _process_file_for_segmentation_worker(
+        path, Path("long.wav"), config, simple=simple
+    )
+    windows = split_windows(len(y), 2 * sr, sr // 2, align=config["hop_length"])
+    reference = _power_reference_worker(path, config, simple, block_frames=100)
+
+    # Pykanto units are found on the file's image, built window by window
+    segments = None
+    if not simple:
+        image_path = tmp_path / "image.npy"
+        np.lib.format.open_memmap(
+            image_path,
+            mode="w+",
+            dtype=np.uint8,
+            shape=(reference.n_frames, config["n_mels"]),
+        )
+        for w in windows:
+            assert _pykanto_window_image_worker(path, w, image_path, config, reference)
+        segments = _pykanto_image_segments_worker(image_path, config, reference)
+    metadata, specs, drops = _stitch_window_results(
+        [
+            _segment_window_worker(
+                path, Path("long.wav"), w, config, simple, reference, segments
+            )
+            for w in windows
+        ]
+    )
+
+    # Units, their numbering (with gaps where units are dropped, as without
+    # static noise for pykanto), and their spectrograms are those of the
+    # whole file; simple units are found in window time, up to rounding
+    assert len(windows) > 3 and len(metadata) == len(expected[0]) > 10
+    assert drops == dict(expected[2], no_units=0)
+    assert [m["unit_index"] for m in metadata] == [m["unit_index"] for m in expected[0]]
+    onsets = np.array([[m["onset"], m["offset"]] for m in metadata])
+    want = np.array([[m["onset"], m["offset"]] for m in expected[0]])
+    if simple:
+        assert np.allclose(onsets, want)
+    else:
+        assert np.array_equal(onsets, want)
+    assert np.allclose(np.array(specs), np.array(expected[1]), atol=1e-5)
+
+
+def test_time_to_frames_at_frame_boundaries(tiny_config):
+    from chatter.data import _time_to_frames
+
+    # Times of whole frames, offset as in windows, land on their frame
+    sr, hop = tiny_config["sr"], tiny_config["hop_length"]
+    frames = np.arange(0, 5000, 7)
+    times = frames * hop / sr
+    assert np.array_equal(_time_to_frames(times, tiny_config), frames)
+    offset = 1000 * hop / sr
+    assert np.array_equal(
+        _time_to_frames((times + offset) - offset, tiny_config), frames
+    )
+
+    # One sample before a boundary is still in the previous frame
+    assert np.array_equal(
+        _time_to_frames(times[1:] - 1 / sr, tiny_config), frames[1:] - 1
+    )
+
+
+def test_birdnet_windows():
+    from chatter.data import _birdnet_windows
+
+    # 7.6 s at 48 kHz: two full windows plus a padded 1.6 s remainder
+    y = np.ones(int(7.6 * 48000), dtype=np.float32)
+    windows = _birdnet_windows(y)
+    assert windows.shape == (3, 144000)
+    assert windows[2, : int(1.6 * 48000)].all() and not windows[2, -1]
+    assert _birdnet_windows(y[: int(4.4 * 48000)]).shape == (1, 144000)
+
+
+def test_spectrogram_frames_are_reused_after_skip(tiny_config):
+    import librosa
+
+    from chatter.data import _mel_power, compute_spectrogram
+
+    rng = np.random.default_rng(0)
+    sr, hop, n_fft = tiny_config["sr"], tiny_config["hop_length"], tiny_config["n_fft"]
+    y = (0.1 * rng.standard_normal(sr)).astype(np.float32)
+
+    # Cached window and filterbank give librosa's mel spectrogram exactly
+    mel = librosa.feature.melspectrogram(
+        y=y,
+        sr=sr,
+        n_fft=n_fft,
+        win_length=tiny_config["win_length"],
+        hop_length=hop,
+        pad_mode="constant",
+        n_mels=tiny_config["n_mels"],
+        fmin=tiny_config["fmin"],
+        fmax=tiny_config["fmax"],
+    )
+    expected = librosa.power_to_db(mel, ref=np.max)
+    assert np.array_equal(compute_spectrogram(y, sr, tiny_config), expected)
+
+    # Past the edge frames, a suffix starting on a frame is a column slice
+    skip_frames, edge = 40, n_fft // (2 * hop)
+    full = _mel_power(y, sr, tiny_config)
+    suffix = _mel_power(y[skip_frames * hop :], sr, tiny_config)
+    assert np.allclose(
+        full[:, skip_frames + edge :], suffix[:, edge:], rtol=1e-4, atol=1e-8
+    )
+
+
+def test_batched_unit_spectrograms_match_per_unit_path(tiny_config):
+    from skimage.transform import resize
+
+    from chatter.data import slice_and_process_spectrograms
+    from chatter.utils import normalize_spec, pad_center_zero
+
+    rng = np.random.default_rng(0)
+    sr, hop = tiny_config["sr"], tiny_config["hop_length"]
+    full = rng.uniform(-90, 0, (tiny_config["n_mels"], 400)).astype(np.float32)
+    full[:, 100:110] = -20.0  # constant unit
+    full[3, 205] = np.nan  # non-finite values
+    full[5, 210] = -np.inf
+
+    frames = np.array([[10, 30], [50, 52], [100, 110], [200, 230], [300, 390]])
+    segments = frames * hop / sr + 1e-6
+    specs, valid, drops = slice_and_process_spectrograms(
+        full, segments, tiny_config, 40 * hop / sr, 5 * hop / sr
+    )
+
+    assert valid == [0, 3]
+    assert drops == {"max_length": 1, "min_length": 1, "empty": 1}
+    for i, spec in zip(valid, specs):
+        start, end = frames[i]
+        padded = pad_center_zero(normalize_spec(full[:, start:end].copy()), 40)
+        expected = resize(
+            padded, tiny_config["target_shape"], anti_aliasing=True, preserve_range=True
+        )
+        assert spec.dtype == np.float32
+        assert np.allclose(spec, expected, atol=1e-5)
+
+
+def test_tiled_pykanto_segmentation_matches_untiled(tiny_config):
+    from chatter.data import compute_spectrogram, segment_file
+
+    # Chirps of varying length and level in background noise
+    rng = np.random.default_rng(0)
+    sr = tiny_config["sr"]
+    y = 0.005 * rng.standard_normal(4 * sr)
+    for onset in np.arange(0.1, 3.8, 0.23):
+        n = int(rng.uniform(0.04, 0.15) * sr)
+        start = int(onset * sr)
+        t = np.arange(n) / sr
+        y[start : start + n] += rng.uniform(0.1, 0.5) * np.sin(
+            2 * np.pi * rng.uniform(2000, 5000) * t
+        )
+    spec = compute_spectrogram(y.astype(np.float32), sr, tiny_config)
+
+    expected = segment_file(spec, tiny_config)
+    assert len(expected) > 5
+    for tile_seconds, threads in ((0.05, 1), (0.7, 3)):
+        config = dict(
+            tiny_config, segment_tile_seconds=tile_seconds, threads_per_job=threads
+        )
+        assert np.array_equal(segment_file(spec, config), expected)
@@ -0,0 +1,103 @@
+import h5py
+import numpy as np
+import pytest
+from scipy.io import wavfile
+
+from chatter.analyzer import Analyzer
+from chatter.data import _detection_columns
+from chatter.detections import DetectionStore
+
+LABELS = ["Haemorhous mexicanus_House Finch", "Turdus migratorius_American Robin"]
+
+
+def test_detection_store_round_trip_and_selection(tmp_path):
+    audio = tmp_path / "audio"
+    (audio / "site").mkdir(parents=True)
+    for name in ("a.wav", "b.wav"):
+        wavfile.write(audio / "site" / name, 8000, np.zeros(8000, dtype=np.int16))
+
+    # Window 0: finch 0.9; window 1: robin 0.6; window 2: finch 0.3
+    scores = np.array([[0.9, 0.05], [0.02, 0.6], [0.3, 0.0]])
+    columns = _detection_columns(scores, 0.1)
+    assert columns["label"].tolist() == [0, 1, 0]
+    assert columns["start"].tolist() == [0.0, 3.0, 6.0]
+
+    store = DetectionStore(tmp_path / "det.h5", min_confidence=0.1)
+    store.open(LABELS)
+    store.add_file("h1", 3, columns)
+    store.add_path("site/a.wav", audio / "site" / "a.wav", "h1")
+    store.add_path("site/b.wav", audio / "site" / "b.wav", "h1")
+    store.close()
+
+    # Reopening restores the indexes; unchanged paths are known
+    store = DetectionStore(tmp_path / "det.h5", min_confidence=0.5)
+    assert store.min_confidence == 0.1 and store.labels == LABELS
+    assert store.known_hash("h1") and not store.known_hash("h2")
+    assert store.known_path("site/a.wav", audio / "site" / "a.wav")
+    wavfile.write(audio / "site" / "a.wav", 8000, np.zeros(4000, dtype=np.int16))
+    assert not store.known_path("site/a.wav", audio / "site" / "a.wav")
+
+    finches = store.select("House Finch", 0.2)
+    assert finches == {
+        "site/a.wav": [(0.0, 3.0), (6.0, 9.0)],
+        "site/b.wav": [(0.0, 3.0), (6.0, 9.0)],
+    }
+    assert store.select("House Finch", 0.5)["site/a.wav"] == [(0.0, 3.0)]
+    assert store.select("American Robin", 0.7) == {}
+    with pytest.raises(ValueError):
+        store.select("House Finch", 0.05)
+
+    # Detections written without their file row are dropped on open
+    with h5py.File(tmp_path / "det.h5", "a") as hf:
+        for name in ("file", "start", "end", "label", "confidence"):
+            hf[f"detections/{name}"].resize(4, axis=0)
+        hf["detections/file"][3] = 1
+    store = DetectionStore(tmp_path / "det.h5")
+    with h5py.File(tmp_path / "det.h5", "r") as hf:
+        assert hf["detections/file"].shape == (3,)
+
+
+def test_export_species_clips_from_store(tmp_path, tiny_config):
+    audio = tmp_path / "audio"
+    audio.mkdir()
+    sr = 8000
+    wavfile.write(audio / "rec.wav", sr, np.zeros(12 * sr, dtype=np.int16))
+
+    scores = np.array([[0.9, 0.0], [0.8, 0.4], [0.0, 0.0], [0.0, 0.7]])
+    store = DetectionStore(tmp_path / "det.h5")
+    store.open(LABELS)
+    store.add_file("h1", 4, _detection_columns(scores, 0.1))
+    store.add_path("rec.wav", audio / "rec.wav", "h1")
+    store.close()
+
+    with Analyzer(tiny_config, n_jobs=1) as analyzer:
+        analyzer.export_species_clips(
+            tmp_path / "det.h5",
+            audio,
+            tmp_path / "clips",
+            ["House Finch", "American Robin"],
+            confidence_threshold={"House Finch": 0.5, "American Robin": 0.5},
+            buffer_seconds=0.5,
+        )
+
+    # Adjacent finch windows merge into one clip; one robin window remains
+    clips = sorted(p.name for p in (tmp_path / "clips").iterdir())
+    assert clips == [
+        "rec_American_Robin_1_8.50s-12.00s.wav",
+        "rec_House_Finch_1_0.00s-6.50s.wav",
+    ]
+
+
+def test_detection_worker_keeps_the_store_floor(tiny_config, monkeypatch):
+    import chatter.data
+    from chatter.data import _detect_species_files_worker
+
+    scores = np.array([[0.9, 0.05], [0.2, 0.6]])
+    monkeypatch.setattr(chatter.data, "_birdnet_scores", lambda paths, config: [scores])
+    config = dict(tiny_config, birdnet_min_confidence=0.3)
+
+    # A store created at a lower floor keeps detections below the config's
+    ((_, columns),) = _detect_species_files_worker(["a.wav"], config, 0.1)
+    assert columns["confidence"].tolist() == pytest.approx([0.9, 0.2, 0.6])
+    ((_, columns),) = _detect_species_files_worker(["a.wav"], config)
+    assert columns["confidence"].tolist() == pytest.approx([0.9, 0.6])
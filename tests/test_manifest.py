@@ -0,0 +1,33 @@
+from chatter.manifest import PreprocessManifest
+
+
+def test_manifest_detects_new_changed_and_reconfigured_files(tiny_config, tmp_path):
+    # One input file with an existing output
+    src = tmp_path / "raw.wav"
+    src.write_bytes(b"abc")
+    out = tmp_path / "processed" / "raw.wav"
+    out.parent.mkdir()
+    out.write_bytes(b"processed")
+    manifest_path = tmp_path / "processed_manifest.jsonl"
+
+    # New files are stale until recorded
+    manifest = PreprocessManifest(manifest_path, tiny_config)
+    assert manifest.is_stale(src, "raw.wav", out)
+    manifest.record(src, "raw.wav", out)
+    manifest.close()
+
+    # A reloaded manifest with the same settings skips the file
+    manifest = PreprocessManifest(manifest_path, tiny_config)
+    assert not manifest.is_stale(src, "raw.wav", out)
+
+    # Changing a preprocessing-relevant key invalidates the record
+    changed = dict(tiny_config, target_dbfs=-12)
+    assert PreprocessManifest(manifest_path, changed).is_stale(src, "raw.wav", out)
+
+    # So does switching to streamed preprocessing, which estimates noise per chunk
+    changed = dict(tiny_config, stream_chunk_seconds=60)
+    assert PreprocessManifest(manifest_path, changed).is_stale(src, "raw.wav", out)
+
+    # Changing the file contents invalidates the record
+    src.write_bytes(b"abcd")
+    assert manifest.is_stale(src, "raw.wav", out)
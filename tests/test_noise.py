@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import noisereduce
+import numpy as np
+
+from chatter.noise import (
+    assign_noise_groups,
+    reduce_noise_with_profile,
+    save_noise_profile,
+    select_noise_blocks,
+)
+
+
+def test_profile_gate_matches_reduce_noise_with_y_noise(tmp_path):
+    rng = np.random.default_rng(0)
+    sr = 22050
+    noise = (0.01 * rng.standard_normal(3 * sr)).astype(np.float32)
+    t = np.arange(2 * sr) / sr
+    y = (
+        0.2 * np.sin(2 * np.pi * 3000 * t) + 0.01 * rng.standard_normal(t.size)
+    ).astype(np.float32)
+    save_noise_profile(noise, tmp_path / "site.npy")
+
+    expected = noisereduce.reduce_noise(
+        y=y,
+        sr=sr,
+        stationary=True,
+        y_noise=noise,
+        n_std_thresh_stationary=1.5,
+        clip_noise_stationary=False,
+    )
+    result = reduce_noise_with_profile(y, sr, tmp_path / "site.npy", 1.5)
+
+    assert np.allclose(result, expected, atol=1e-6)
+
+
+def test_noise_groups_and_quiet_block_selection():
+    root = Path("/data")
+    files = [root / "a" / "1.wav", root / "a" / "2.wav", root / "b" / "x" / "3.wav"]
+
+    assert assign_noise_groups(files, root, None) == {}
+    assert assign_noise_groups(files, root, "directory") == {
+        files[0]: "a",
+        files[1]: "a",
+        files[2]: "b/x",
+    }
+    # The most specific mapping wins; unmatched files stay ungrouped
+    groups = assign_noise_groups(files, root, {"a": "site1", "a/2.wav": "site2"})
+    assert groups == {files[0]: "site1", files[1]: "site2"}
+
+    # Only the quietest blocks are kept, in their original order
+    sr = 100
+    loud, quiet = np.ones(sr), 0.01 * np.ones(sr)
+    clip = select_noise_blocks([np.concatenate([loud, quiet, loud, quiet])], sr, 2)
+    assert clip.shape == (2 * sr,) and np.allclose(clip, 0.01)
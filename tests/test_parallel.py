@@ -0,0 +1,35 @@
+from chatter.parallel import (
+    TaskTimeline,
+    candidate_splits,
+    longest_first,
+    resolve_thread_budget,
+    split_windows,
+)
+
+
+def test_thread_budget_fills_cores_without_oversubscribing():
+    # Either side of the split is derived from the other
+    assert resolve_thread_budget(-1, None, n_cores=16) == (16, 1)
+    assert resolve_thread_budget(4, None, n_cores=16) == (4, 4)
+    assert resolve_thread_budget(-1, 4, n_cores=16) == (4, 4)
+    assert resolve_thread_budget(32, None, n_cores=16) == (32, 1)
+
+    # Candidate splits always use every core
+    assert candidate_splits(8) == [(8, 1), (4, 2), (2, 4), (1, 8)]
+
+
+def test_longest_first_windows_and_tail_idle():
+    # Unknown durations go first, then longest to shortest, ties stable
+    assert longest_first("abcd", [1.0, None, 5.0, 1.0]) == ["b", "c", "a", "d"]
+
+    # Cores tile the signal on aligned boundaries; windows add the overlap
+    windows = split_windows(1000, 300, 50, align=64)
+    assert [w[2:] for w in windows] == [(0, 256), (256, 512), (512, 768), (768, 1000)]
+    assert windows[1][:2] == (192, 576) and windows[-1][1] == 1000
+    assert split_windows(100, 300, 50) == [(0, 100, 0, 100)]
+
+    # Two workers: the one finishing at t=1 idles until the end at t=3
+    timeline = TaskTimeline(2)
+    timeline.start = 0.0
+    timeline.completions = [1.0, 1.0, 3.0]
+    assert timeline.tail_idle() == (2.0, 2.0 / 6.0)
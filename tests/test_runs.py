@@ -0,0 +1,72 @@
+import numpy as np
+
+from chatter.runs import find_active_units, find_active_units_batch
+
+
+def reference_units(rms_db, n_samples, sr, config):
+    """
+    NumPy and Python workflow that simple segmentation used before.
+    """
+    hop = config["hop_length"]
+    threshold = max(
+        float(config["simple_silence_threshold_db"]), config["simple_noise_floor"]
+    )
+    active = np.where(rms_db > threshold)[0]
+    if not len(active):
+        return np.zeros((0, 2))
+    breaks = np.where(np.diff(active) > 1)[0]
+    frames = np.vstack(
+        [
+            active[np.concatenate(([0], breaks + 1))],
+            active[np.concatenate((breaks, [len(active) - 1]))] + 1,
+        ]
+    ).T
+    intervals = frames.astype(float) * hop / float(sr)
+    intervals[:, 1] = np.minimum(intervals[:, 1], n_samples / float(sr))
+
+    merged = [list(intervals[0])]
+    for start, end in intervals[1:]:
+        if start - merged[-1][1] < config["simple_min_silence_length"]:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    kept = [
+        [start, end]
+        for start, end in merged
+        if config["simple_min_unit_length"]
+        <= end - start
+        <= config["simple_max_unit_length"]
+    ]
+    return np.array(kept, dtype=float).reshape(-1, 2)
+
+
+def test_compiled_units_match_reference(tiny_config):
+    rng = np.random.default_rng(0)
+    sr, hop = tiny_config["sr"], tiny_config["hop_length"]
+
+    rms_dbs, n_samples = [], []
+    for i in range(40):
+        n = int(rng.integers(0, 2000))
+        rms_dbs.append(rng.normal(-45, 8, n).astype(np.float32))
+        n_samples.append(max(n * hop - int(rng.integers(0, 3 * hop)), 0))
+
+    for threshold, min_silence, min_len, max_len in [
+        (-40.0, 0.001, 0.03, 0.4),
+        (-47.3, 0.02, 0.0, 5.0),
+        (-52.1, 0.0, 0.01, 0.05),
+    ]:
+        config = dict(
+            tiny_config,
+            simple_silence_threshold_db=threshold,
+            simple_min_silence_length=min_silence,
+            simple_min_unit_length=min_len,
+            simple_max_unit_length=max_len,
+        )
+        expected = [
+            reference_units(rms_db, n, sr, config)
+            for rms_db, n in zip(rms_dbs, n_samples)
+        ]
+        for rms_db, n, units in zip(rms_dbs, n_samples, expected):
+            assert np.array_equal(find_active_units(rms_db, n, sr, config), units)
+        batched = find_active_units_batch(rms_dbs, n_samples, sr, config)
+        assert all(np.array_equal(a, b) for a, b in zip(batched, expected))
@@ -0,0 +1,124 @@
+import h5py
+import numpy as np
+import pytest
+
+from chatter.storage import SpectrogramWriter, quantize_units
+
+
+def test_writer_coalesces_appends_and_trims(tiny_config, tmp_path):
+    rng = np.random.default_rng(0)
+    config = dict(tiny_config, target_shape=(4, 5), spectrogram_chunks=3)
+    results = [rng.uniform(-0.1, 1.1, (n, 4, 5)) for n in (2, 0, 7, 1, 5)]
+
+    with SpectrogramWriter(tmp_path / "s.h5", config, write_units=6) as writer:
+        starts = [writer.append(list(specs)) for specs in results]
+        writer.flush()
+        with h5py.File(tmp_path / "s.h5", "r", locking=False) as hf:
+            # Capacity grows geometrically ahead of the data
+            assert hf["spectrograms"].shape[0] >= 15
+        writer.append(quantize_units(results[0]))
+    assert starts == [0, 2, 2, 9, 10]
+    assert writer.n_units == 17
+
+    with h5py.File(tmp_path / "s.h5", "r") as hf:
+        data = hf["spectrograms"]
+        assert data.shape == (17, 4, 5) and data.chunks == (3, 4, 5)
+        expected = np.concatenate([quantize_units(r) for r in results + results[:1]])
+        assert np.array_equal(data[:], expected)
+
+    # Writer failures surface in the caller
+    writer = SpectrogramWriter(tmp_path / "t.h5", config, write_units=1)
+    writer.append([np.zeros((3, 3))])
+    with pytest.raises(RuntimeError):
+        writer.close()
+
+
+def test_shared_units_outlive_worker_and_are_freed(tiny_config, tmp_path):
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from chatter.storage import SharedUnits, receive_units, share_units
+
+    rng = np.random.default_rng(1)
+    config = dict(tiny_config, target_shape=(4, 5))
+    results = [list(rng.uniform(0, 1, (n, 4, 5))) for n in (3, 0, 4)]
+
+    # Blocks created in a worker stay readable after the worker exits
+    with ProcessPoolExecutor(1) as executor:
+        shared = list(executor.map(share_units, results, [config] * 3))
+    assert [type(s) for s in shared] == [SharedUnits, np.ndarray, SharedUnits]
+    assert os.path.exists(f"/dev/shm/{shared[0].name}")
+
+    assert np.array_equal(receive_units(shared[0]), quantize_units(results[0]))
+    with SpectrogramWriter(tmp_path / "s.h5", config) as writer:
+        for s in shared[1:]:
+            writer.append(s)
+    with h5py.File(tmp_path / "s.h5", "r") as hf:
+        assert np.array_equal(hf["spectrograms"][:], quantize_units(results[2]))
+
+    # Every block is unlinked once read
+    assert not any(os.path.exists(f"/dev/shm/{s.name}") for s in shared[::2])
+    assert isinstance(
+        share_units(results[0], dict(config, shared_memory_transfer=False)), np.ndarray
+    )
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {"spectrogram_compression": "gzip", "spectrogram_compression_level": 9},
+        {"spectrogram_compression": "lzf", "spectrogram_shuffle": "byte"},
+        {"spectrogram_compression": "blosc", "spectrogram_shuffle": "bit"},
+    ],
+)
+def test_compressed_store_round_trips(tiny_config, tmp_path, settings):
+    from chatter.data import SpectrogramDataset
+    from chatter.storage import HDF5PLUGIN_AVAILABLE, spectrogram_filters
+
+    if settings["spectrogram_compression"] == "blosc" and not HDF5PLUGIN_AVAILABLE:
+        pytest.skip("hdf5plugin not installed")
+    config = dict(tiny_config, target_shape=(8, 8), spectrogram_chunks=4, **settings)
+    units = quantize_units(np.random.default_rng(2).uniform(0, 0.2, (10, 8, 8)))
+
+    with SpectrogramWriter(tmp_path / "s.h5", config) as writer:
+        writer.append(units)
+    with h5py.File(tmp_path / "s.h5", "r") as hf:
+        assert hf["spectrograms"].compression is not None
+        assert hf["spectrograms"].chunks == (4, 8, 8)
+    dataset = SpectrogramDataset(tmp_path / "s.h5", range(10))
+    assert np.array_equal(np.rint(dataset[3][0].numpy() * 255), units[3])
+
+    with pytest.raises(ValueError):
+        spectrogram_filters(dict(config, spectrogram_compression="zstd"))
+    with pytest.raises(ValueError):
+        spectrogram_filters(
+            {"spectrogram_compression": "gzip", "spectrogram_shuffle": "bit"}
+        )
+
+
+def test_flat_store_memory_maps_like_hdf5(tiny_config, tmp_path):
+    from chatter.data import SpectrogramDataset
+    from chatter.storage import SpectrogramReader, spectrogram_writer
+
+    config = dict(tiny_config, target_shape=(4, 5))
+    units = quantize_units(np.random.default_rng(3).uniform(0, 1, (12, 4, 5)))
+
+    with spectrogram_writer(tmp_path / "s.h5", config) as writer:
+        writer.append(units)
+    with spectrogram_writer(tmp_path / "s.npy", config, write_units=4) as writer:
+        writer.append(units[:7])
+        writer.flush()
+        # Flushed units are readable while writing continues
+        with SpectrogramReader(tmp_path / "s.npy") as reader:
+            assert np.array_equal(reader[:], units[:7])
+        writer.append(units[7:])
+    assert np.array_equal(np.load(tmp_path / "s.npy"), units)
+    with SpectrogramReader(tmp_path / "s.npy") as reader:
+        assert isinstance(reader.data, np.memmap) and reader.shape == (12, 4, 5)
+    h5, flat = (SpectrogramDataset(tmp_path / n, [9, 2]) for n in ("s.h5", "s.npy"))
+    assert all(h5[i].equal(flat[i]) for i in range(2))
+
+    # Reopening keeps a prefix, as when resuming from a checkpoint
+    with spectrogram_writer(tmp_path / "s.npy", config, keep_units=5) as writer:
+        writer.append(units[:2])
+    expected = np.concatenate([units[:5], units[:2]])
+    assert np.array_equal(np.load(tmp_path / "s.npy"), expected)